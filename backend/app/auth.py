@@ -25,6 +25,8 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwk, jwt
 
+from app.services import instrumentation, metrics
+
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
@@ -63,6 +65,7 @@ def _expected_issuer() -> str:
 
 async def _get_jwks() -> Dict[str, Any]:
     global _jwks_cache
+    metrics.cache_lookup("jwks", bool(_jwks_cache))
     if _jwks_cache:
         return _jwks_cache
     if not _jwks_url():
@@ -146,6 +149,7 @@ async def verify_token(
         if expected and claims.get("iss") != expected:
             raise JWTError(f"Invalid issuer: {claims.get('iss')!r}")
 
+        instrumentation.tag_role(_metrics_role(claims))
         return claims
 
     except JWTError as exc:
@@ -190,6 +194,16 @@ def get_keycloak_roles(claims: Dict[str, Any]) -> list[str]:
     return claims.get("realm_access", {}).get("roles", [])
 
 
+# Most privileged first; a teacher who is also a parent is counted as a teacher
+_METRICS_ROLES = ("teacher", "parent", "guardian", "student", "child")
+
+
+def _metrics_role(claims: Dict[str, Any]) -> str:
+    """The single role a request is labelled with in /metrics."""
+    roles = get_keycloak_roles(claims)
+    return next((role for role in _METRICS_ROLES if role in roles), "user")
+
+
 def require_role(role: str):
     """
     Dependency factory that requires a specific Keycloak realm role.
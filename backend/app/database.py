@@ -7,8 +7,13 @@ import asyncpg
 import json
 import logging
 import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Tuple
+
+from app.services import metrics
+from app.services.instrumentation import instrument_module
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +22,9 @@ _pool: Optional[asyncpg.Pool] = None
 # Fields that need ISO string → datetime conversion when passed to update functionsss
 _TIMESTAMP_FIELDS = {"last_session_date", "created_at", "completed_at", "started_at", "updated_at"}
 
+# pg_advisory_xact_lock key serializing the boot migrations of the workers
+_MIGRATION_LOCK = 0x45595241
+
 
 # ─── Connection Pool ──────────────────────────────────────────────────────────
 
@@ -31,18 +39,20 @@ async def _init_connection(conn: asyncpg.Connection) -> None:
     )
 
 
-async def init_db() -> None:
-    """Create the connection pool and run schema migrations."""
-    global _pool
+def _database_url() -> str:
     database_url = os.getenv("DATABASE_URL", "")
     if not database_url:
         raise RuntimeError("DATABASE_URL environment variable is not set")
 
     # asyncpg needs postgres:// scheme (Railway uses postgresql://)
-    database_url = database_url.replace("postgresql://", "postgres://", 1)
+    return database_url.replace("postgresql://", "postgres://", 1)
+
 
+async def init_db() -> None:
+    """Create the connection pool and run schema migrations."""
+    global _pool
     _pool = await asyncpg.create_pool(
-        database_url,
+        _database_url(),
         min_size=2,
         max_size=10,
         init=_init_connection,
@@ -65,10 +75,86 @@ async def get_pool() -> asyncpg.Pool:
     return _pool
 
 
-async def _run_migrations() -> None:
-    """Create all tables and indexes if they don't exist."""
+# The connection of the transaction() open in the current task, if any
+_transaction_conn: ContextVar[Optional[asyncpg.Connection]] = ContextVar("db_transaction", default=None)
+
+
+@asynccontextmanager
+async def _connection() -> AsyncIterator[asyncpg.Connection]:
+    """The current transaction's connection, or a pooled one for this call."""
+    conn = _transaction_conn.get()
+    if conn is not None:
+        yield conn
+        return
     pool = await get_pool()
     async with pool.acquire() as conn:
+        yield conn
+
+
+@asynccontextmanager
+async def transaction() -> AsyncIterator[asyncpg.Connection]:
+    """Run the query functions called inside the block in one transaction.
+
+    They share one connection, so don't run them concurrently (gather) in
+    the block. Nested blocks become savepoints.
+    """
+    async with _connection() as conn:
+        async with conn.transaction():
+            token = _transaction_conn.set(conn)
+            try:
+                yield conn
+            finally:
+                _transaction_conn.reset(token)
+
+
+async def listen(channel: str, callback: Callable[[str], None]) -> asyncpg.Connection:
+    """Open a dedicated connection (outside the pool) that LISTENs on channel.
+
+    callback gets each notification's payload. The caller owns the connection
+    and closes it; a dropped connection stops delivery, so watch it with
+    add_termination_listener.
+    """
+    conn = await asyncpg.connect(_database_url())
+    await conn.add_listener(channel, lambda _conn, _pid, _channel, payload: callback(payload))
+    return conn
+
+
+def pool_stats() -> Dict[str, int]:
+    """Connection counts of the pool in this worker (all zero before init_db)."""
+    if _pool is None:
+        return {"size": 0, "idle": 0, "in_use": 0, "max": 0, "waiters": 0}
+    size, idle = _pool.get_size(), _pool.get_idle_size()
+    # asyncpg has no public waiter count; acquire() blocks on the pool's internal
+    # asyncio.Queue, whose pending getters are the coroutines waiting for a connection
+    getters = getattr(getattr(_pool, "_queue", None), "_getters", ())
+    return {
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        "max": _pool.get_max_size(),
+        "waiters": sum(1 for waiter in getters if not waiter.done()),
+    }
+
+
+metrics.gauge(
+    "eyeradar_db_pool_connections", "asyncpg pool connections by state", ("state",),
+    callback=lambda: {(state,): float(n) for state, n in pool_stats().items()},
+)
+
+
+async def _run_migrations() -> None:
+    """Create all tables and indexes if they don't exist.
+
+    Every worker runs this on boot, at the same time: the whole script is one
+    transaction under an advisory lock, so the workers take turns and the
+    later ones find the tables and skip the backfills.
+    """
+    async with _connection() as conn, conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", _MIGRATION_LOCK)
+        new_area_stats, new_student_badges, new_points_balances = await conn.fetchrow(
+            "SELECT to_regclass('student_area_stats') IS NULL, to_regclass('student_badges') IS NULL, "
+            "to_regclass('points_balances') IS NULL"
+        )
         await conn.execute("""
             -- ── Users (Keycloak-linked accounts) ───────────────────────────
             CREATE TABLE IF NOT EXISTS users (
@@ -137,6 +223,23 @@ async def _run_migrations() -> None:
             CREATE INDEX IF NOT EXISTS idx_sessions_completed ON exercise_sessions(completed_at DESC)
                 WHERE status = 'completed';
 
+            -- ── Completed-session counters per deficit area (badge rules) ──
+            CREATE TABLE IF NOT EXISTS student_area_stats (
+                student_id   TEXT NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+                deficit_area TEXT NOT NULL,
+                sessions     INTEGER NOT NULL DEFAULT 0,
+                accuracy_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                PRIMARY KEY (student_id, deficit_area)
+            );
+
+            -- ── Badge awards (append-only; students.badges lists the same ids)
+            CREATE TABLE IF NOT EXISTS student_badges (
+                student_id TEXT NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+                badge_id   TEXT NOT NULL,
+                earned_at  TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (student_id, badge_id)
+            );
+
             -- ── Adventure maps ───────────────────────────────────────────────
             CREATE TABLE IF NOT EXISTS adventure_maps (
                 id           TEXT PRIMARY KEY,
@@ -178,6 +281,33 @@ async def _run_migrations() -> None:
             CREATE UNIQUE INDEX IF NOT EXISTS idx_purchases_unique
                 ON user_purchases(student_id, item_id);
 
+            -- Tell the workers' shop caches about catalog and ownership changes
+            CREATE OR REPLACE FUNCTION notify_shop_catalog() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('shop_changed', 'catalog');
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE OR REPLACE FUNCTION notify_shop_owned() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    PERFORM pg_notify('shop_changed', 'owned:' || OLD.student_id);
+                ELSE
+                    PERFORM pg_notify('shop_changed', 'owned:' || NEW.student_id);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS shop_items_notify ON shop_items;
+            CREATE TRIGGER shop_items_notify AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON shop_items
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_shop_catalog();
+
+            DROP TRIGGER IF EXISTS user_purchases_notify ON user_purchases;
+            CREATE TRIGGER user_purchases_notify AFTER INSERT OR UPDATE OR DELETE ON user_purchases
+                FOR EACH ROW EXECUTE FUNCTION notify_shop_owned();
+
             -- ── Avatar state per student ──────────────────────────────────────
             CREATE TABLE IF NOT EXISTS student_avatar (
                 student_id    TEXT PRIMARY KEY REFERENCES students(id) ON DELETE CASCADE,
@@ -198,9 +328,28 @@ async def _run_migrations() -> None:
 
             CREATE INDEX IF NOT EXISTS idx_ledger_student ON points_ledger(student_id);
 
+            -- Append order (entries of one transaction share created_at) and the
+            -- student's balance after each entry
+            ALTER TABLE points_ledger ADD COLUMN IF NOT EXISTS seq BIGINT;
+            ALTER TABLE points_ledger ADD COLUMN IF NOT EXISTS balance_after INTEGER;
+            CREATE SEQUENCE IF NOT EXISTS points_ledger_seq OWNED BY points_ledger.seq;
+            ALTER TABLE points_ledger ALTER COLUMN seq SET DEFAULT nextval('points_ledger_seq');
+            CREATE INDEX IF NOT EXISTS idx_ledger_student_seq ON points_ledger(student_id, seq);
+
+            -- ── Running balance per student (the ledger summed up to last_seq) ─
+            CREATE TABLE IF NOT EXISTS points_balances (
+                student_id TEXT PRIMARY KEY REFERENCES students(id) ON DELETE CASCADE,
+                balance    INTEGER NOT NULL,
+                entries    INTEGER NOT NULL,
+                last_seq   BIGINT,
+                updated_at TIMESTAMPTZ DEFAULT NOW()
+            );
+
             -- Add new student identity columns on existing databases.
             ALTER TABLE students ADD COLUMN IF NOT EXISTS keycloak_id TEXT UNIQUE;
             ALTER TABLE students ADD COLUMN IF NOT EXISTS login_username TEXT;
+            -- IANA name; streak days are counted in it (NULL: DEFAULT_TIMEZONE)
+            ALTER TABLE students ADD COLUMN IF NOT EXISTS timezone TEXT;
 
             -- ── Subscriptions (Stripe) ────────────────────────────────────────
             CREATE TABLE IF NOT EXISTS subscriptions (
@@ -262,7 +411,26 @@ async def _run_migrations() -> None:
 
             CREATE INDEX IF NOT EXISTS idx_content_history_student
                 ON content_history(student_id, content_type);
+
+            CREATE INDEX IF NOT EXISTS idx_content_history_recent
+                ON content_history(student_id, content_type, used_at DESC);
         """)
+        if new_area_stats:
+            await _rebuild_area_stats(conn)
+        if new_student_badges:
+            # Earlier awards: dated by the first completed session that reported them
+            await conn.execute("""
+                INSERT INTO student_badges (student_id, badge_id, earned_at)
+                SELECT s.id, b.badge_id,
+                       (SELECT MIN(e.completed_at) FROM exercise_sessions e
+                        WHERE e.student_id = s.id AND e.badges_earned ? b.badge_id)
+                FROM students s
+                CROSS JOIN LATERAL jsonb_array_elements_text(COALESCE(s.badges, '[]'::jsonb)) AS b(badge_id)
+                ON CONFLICT DO NOTHING
+            """)
+        if new_points_balances:
+            await _open_points_ledger(conn)
+            await _rebuild_points_balances(conn)
 
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
@@ -295,14 +463,13 @@ def _row_to_dict(row: asyncpg.Record) -> Dict[str, Any]:
 
 
 async def create_student(student_data: Dict[str, Any]) -> Dict[str, Any]:
-    pool = await get_pool()
     created_at = _to_dt(student_data.get("created_at")) or datetime.utcnow()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """
             INSERT INTO students
-                (id, created_by, keycloak_id, login_username, name, age, grade, language, interests, diagnostic, current_levels, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                (id, created_by, keycloak_id, login_username, name, age, grade, language, interests, diagnostic, current_levels, created_at, timezone)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
             """,
             student_data["id"],
             student_data.get("created_by"),
@@ -316,20 +483,19 @@ async def create_student(student_data: Dict[str, Any]) -> Dict[str, Any]:
             student_data.get("diagnostic", {}),
             student_data.get("current_levels", {}),
             created_at,
+            student_data.get("timezone"),
         )
     return await get_student(student_data["id"])
 
 
 async def get_student(student_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow("SELECT * FROM students WHERE id = $1", student_id)
     return _row_to_dict(row) if row else None
 
 
 async def get_student_by_keycloak_id(keycloak_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM students WHERE keycloak_id = $1",
             keycloak_id,
@@ -338,8 +504,7 @@ async def get_student_by_keycloak_id(keycloak_id: str) -> Optional[Dict[str, Any
 
 
 async def get_all_students() -> List[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         rows = await conn.fetch("SELECT * FROM students ORDER BY created_at DESC")
     return [_row_to_dict(r) for r in rows]
 
@@ -356,19 +521,17 @@ async def update_student(student_id: str, data: Dict[str, Any]) -> Optional[Dict
     if not filtered:
         return await get_student(student_id)
 
-    pool = await get_pool()
     set_clauses = [f"{k} = ${i + 1}" for i, k in enumerate(filtered)]
     params = list(filtered.values()) + [student_id]
     query = f"UPDATE students SET {', '.join(set_clauses)} WHERE id = ${len(params)}"
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(query, *params)
     return await get_student(student_id)
 
 
 async def delete_student(student_id: str) -> bool:
     """Delete a student and all cascaded records (sessions, maps, purchases, ledger)."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         result = await conn.execute("DELETE FROM students WHERE id = $1", student_id)
     return result == "DELETE 1"
 
@@ -380,8 +543,7 @@ async def save_assessment(student_id: str, assessment: Dict[str, Any]) -> Option
         severity = info.get("severity", 3) if isinstance(info, dict) else 3
         current_levels[area] = max(1, 6 - severity)
 
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             "UPDATE students SET assessment = $1, current_levels = $2 WHERE id = $3",
             assessment,
@@ -395,9 +557,8 @@ async def save_assessment(student_id: str, assessment: Dict[str, Any]) -> Option
 
 
 async def create_session(session_data: Dict[str, Any]) -> Dict[str, Any]:
-    pool = await get_pool()
     started_at = _to_dt(session_data.get("started_at")) or datetime.utcnow()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """
             INSERT INTO exercise_sessions
@@ -420,8 +581,7 @@ async def create_session(session_data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def get_session(session_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM exercise_sessions WHERE id = $1", session_id
         )
@@ -433,8 +593,7 @@ async def get_student_sessions(
     deficit_area: Optional[str] = None,
     limit: int = 50,
 ) -> List[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         if deficit_area:
             rows = await conn.fetch(
                 """SELECT * FROM exercise_sessions
@@ -462,21 +621,35 @@ async def update_session(session_id: str, data: Dict[str, Any]) -> Optional[Dict
     if not filtered:
         return await get_session(session_id)
 
-    pool = await get_pool()
     set_clauses = [f"{k} = ${i + 1}" for i, k in enumerate(filtered)]
     params = list(filtered.values()) + [session_id]
     query = f"UPDATE exercise_sessions SET {', '.join(set_clauses)} WHERE id = ${len(params)}"
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(query, *params)
     return await get_session(session_id)
 
 
+async def claim_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """Mark an in-progress session completed; None if it is not in progress.
+
+    The row lock makes concurrent claims of one session wait for each other,
+    so exactly one caller gets the row back.
+    """
+    async with _connection() as conn:
+        row = await conn.fetchrow(
+            """UPDATE exercise_sessions SET status = 'completed'
+               WHERE id = $1 AND status = 'in_progress'
+               RETURNING *""",
+            session_id,
+        )
+    return _row_to_dict(row) if row else None
+
+
 # ─── Analytics ────────────────────────────────────────────────────────────────
 
 
 async def get_student_stats(student_id: str) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             """
             SELECT
@@ -494,8 +667,7 @@ async def get_student_stats(student_id: str) -> Dict[str, Any]:
 
 
 async def get_deficit_area_stats(student_id: str, deficit_area: str) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             """
             SELECT
@@ -517,8 +689,7 @@ async def get_recent_accuracy_trend(
     deficit_area: str,
     limit: int = 10,
 ) -> List[float]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         rows = await conn.fetch(
             """
             SELECT accuracy FROM exercise_sessions
@@ -532,13 +703,184 @@ async def get_recent_accuracy_trend(
     return [r["accuracy"] for r in reversed(rows)]
 
 
+# ─── Streaks ──────────────────────────────────────────────────────────────────
+
+# Students without a timezone of their own count streak days in this one
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "UTC")
+
+# The streak after practising today: unchanged if already practised today
+# (local date), one longer if last practised yesterday, otherwise restarted.
+_NEXT_STREAK = """
+    CASE
+        WHEN last_session_date IS NULL THEN 1
+        WHEN (last_session_date AT TIME ZONE COALESCE(timezone, $2))::date
+             = (NOW() AT TIME ZONE COALESCE(timezone, $2))::date THEN GREATEST(COALESCE(current_streak, 0), 1)
+        WHEN (last_session_date AT TIME ZONE COALESCE(timezone, $2))::date
+             = (NOW() AT TIME ZONE COALESCE(timezone, $2))::date - 1 THEN COALESCE(current_streak, 0) + 1
+        ELSE 1
+    END
+"""
+
+
+async def update_streak(student_id: str) -> Optional[Tuple[int, int]]:
+    """Count today's practice towards the streak; (current, longest), or None if no student."""
+    async with _connection() as conn:
+        row = await conn.fetchrow(
+            f"""
+            UPDATE students
+            SET current_streak = {_NEXT_STREAK},
+                longest_streak = GREATEST(COALESCE(longest_streak, 0), {_NEXT_STREAK}),
+                last_session_date = NOW()
+            WHERE id = $1
+            RETURNING current_streak, longest_streak
+            """,
+            student_id,
+            DEFAULT_TIMEZONE,
+        )
+    return (row["current_streak"], row["longest_streak"]) if row else None
+
+
+async def recompute_streaks() -> int:
+    """Rebuild every student's streaks from their completed sessions; returns students updated.
+
+    One pass over exercise_sessions: distinct local practice days per student,
+    grouped into runs of consecutive days (day minus its row number is constant
+    within a run). The current streak is the latest run if it reaches
+    yesterday or today, else 0.
+    """
+    async with _connection() as conn:
+        result = await conn.execute(
+            """
+            WITH days AS (
+                SELECT DISTINCT e.student_id,
+                       (e.completed_at AT TIME ZONE COALESCE(s.timezone, $1))::date AS day
+                FROM exercise_sessions e JOIN students s ON s.id = e.student_id
+                WHERE e.status = 'completed' AND e.completed_at IS NOT NULL
+            ), runs AS (
+                SELECT student_id, COUNT(*) AS length, MAX(day) AS last_day
+                FROM (SELECT student_id, day,
+                             day - ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY day)::int AS run
+                      FROM days) numbered
+                GROUP BY student_id, run
+            ), totals AS (
+                SELECT student_id, MAX(length) AS longest,
+                       (ARRAY_AGG(length ORDER BY last_day DESC))[1] AS latest_length,
+                       MAX(last_day) AS last_day
+                FROM runs GROUP BY student_id
+            ), last_practice AS (
+                SELECT student_id, MAX(completed_at) AS at
+                FROM exercise_sessions WHERE status = 'completed' GROUP BY student_id
+            )
+            UPDATE students s
+            SET longest_streak = t.longest,
+                current_streak = CASE
+                    WHEN t.last_day >= (NOW() AT TIME ZONE COALESCE(s.timezone, $1))::date - 1
+                    THEN t.latest_length ELSE 0 END,
+                last_session_date = l.at
+            FROM totals t JOIN last_practice l USING (student_id)
+            WHERE s.id = t.student_id
+            """,
+            DEFAULT_TIMEZONE,
+        )
+    return int(result.split()[-1])
+
+
+# ─── Badge Counters ───────────────────────────────────────────────────────────
+
+
+async def _rebuild_area_stats(conn: asyncpg.Connection) -> None:
+    await conn.execute(
+        """
+        INSERT INTO student_area_stats (student_id, deficit_area, sessions, accuracy_sum)
+        SELECT student_id, deficit_area, COUNT(*), COALESCE(SUM(accuracy), 0)
+        FROM exercise_sessions WHERE status = 'completed'
+        GROUP BY student_id, deficit_area
+        ON CONFLICT (student_id, deficit_area) DO UPDATE
+            SET sessions = EXCLUDED.sessions, accuracy_sum = EXCLUDED.accuracy_sum
+        """
+    )
+
+
+async def rebuild_area_stats() -> None:
+    """Recount student_area_stats from exercise_sessions (after bulk imports)."""
+    async with _connection() as conn:
+        await _rebuild_area_stats(conn)
+
+
+async def record_completed_session(student_id: str, deficit_area: str, accuracy: float) -> Dict[str, Any]:
+    """Count a completed session and return the student's counters including it.
+
+    Returns area_sessions, area_accuracy_sum, completed_sessions and
+    areas_played (distinct areas with a completed session).
+    """
+    async with _connection() as conn:
+        row = await conn.fetchrow(
+            """
+            WITH area AS (
+                INSERT INTO student_area_stats AS s (student_id, deficit_area, sessions, accuracy_sum)
+                VALUES ($1, $2, 1, $3)
+                ON CONFLICT (student_id, deficit_area) DO UPDATE
+                    SET sessions = s.sessions + 1, accuracy_sum = s.accuracy_sum + EXCLUDED.accuracy_sum
+                RETURNING sessions, accuracy_sum
+            ), other AS (
+                -- The statement's snapshot: the other areas, before this insert
+                SELECT COALESCE(SUM(sessions), 0) AS sessions, COUNT(*) AS areas
+                FROM student_area_stats WHERE student_id = $1 AND deficit_area <> $2
+            )
+            SELECT area.sessions AS area_sessions, area.accuracy_sum AS area_accuracy_sum,
+                   other.sessions + area.sessions AS completed_sessions, other.areas + 1 AS areas_played
+            FROM area, other
+            """,
+            student_id,
+            deficit_area,
+            accuracy,
+        )
+    return dict(row)
+
+
+async def award_student_badges(student_id: str, badge_ids: List[str]) -> List[str]:
+    """Record badge awards; returns the ids that were new, in the given order.
+
+    Concurrent completions can't duplicate or lose an award: each one
+    inserts with ON CONFLICT DO NOTHING, and only the rows it actually
+    inserted are appended to students.badges.
+    """
+    async with _connection() as conn:
+        rows = await conn.fetch(
+            """
+            WITH added AS (
+                INSERT INTO student_badges (student_id, badge_id)
+                SELECT $1, badge_id FROM unnest($2::text[]) AS badge_id
+                ON CONFLICT DO NOTHING
+                RETURNING badge_id
+            ), listed AS (
+                UPDATE students SET badges = COALESCE(badges, '[]'::jsonb) || (SELECT jsonb_agg(badge_id) FROM added)
+                WHERE id = $1 AND EXISTS (SELECT 1 FROM added)
+            )
+            SELECT badge_id FROM added
+            """,
+            student_id,
+            badge_ids,
+        )
+    added = {r["badge_id"] for r in rows}
+    return [bid for bid in badge_ids if bid in added]
+
+
+async def get_student_badges(student_id: str) -> Dict[str, Optional[datetime]]:
+    """badge id -> earned_at for every badge the student has."""
+    async with _connection() as conn:
+        rows = await conn.fetch(
+            "SELECT badge_id, earned_at FROM student_badges WHERE student_id = $1", student_id
+        )
+    return {r["badge_id"]: r["earned_at"] for r in rows}
+
+
 # ─── Adventure Map CRUD ───────────────────────────────────────────────────────
 
 
 async def create_adventure_map(data: Dict[str, Any]) -> Dict[str, Any]:
-    pool = await get_pool()
     now = datetime.utcnow()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """
             INSERT INTO adventure_maps
@@ -559,8 +901,7 @@ async def create_adventure_map(data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def get_adventure_map(adventure_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM adventure_maps WHERE id = $1", adventure_id
         )
@@ -568,8 +909,7 @@ async def get_adventure_map(adventure_id: str) -> Optional[Dict[str, Any]]:
 
 
 async def get_student_adventure(student_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             """
             SELECT * FROM adventure_maps
@@ -582,8 +922,7 @@ async def get_student_adventure(student_id: str) -> Optional[Dict[str, Any]]:
 
 
 async def get_all_adventure_statuses() -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         rows = await conn.fetch(
             "SELECT student_id, id, title, worlds, status FROM adventure_maps WHERE status = 'active'"
         )
@@ -603,8 +942,7 @@ async def get_all_adventure_statuses() -> Dict[str, Any]:
 
 
 async def get_student_adventures(student_id: str) -> List[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         rows = await conn.fetch(
             "SELECT * FROM adventure_maps WHERE student_id = $1 ORDER BY updated_at DESC",
             student_id,
@@ -618,18 +956,16 @@ async def update_adventure_map(
     filtered = {k: v for k, v in data.items() if v is not None}
     filtered["updated_at"] = datetime.utcnow()
 
-    pool = await get_pool()
     set_clauses = [f"{k} = ${i + 1}" for i, k in enumerate(filtered)]
     params = list(filtered.values()) + [adventure_id]
     query = f"UPDATE adventure_maps SET {', '.join(set_clauses)} WHERE id = ${len(params)}"
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(query, *params)
     return await get_adventure_map(adventure_id)
 
 
 async def delete_adventure_map(adventure_id: str) -> bool:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         result = await conn.execute(
             "DELETE FROM adventure_maps WHERE id = $1", adventure_id
         )
@@ -640,8 +976,7 @@ async def delete_adventure_map(adventure_id: str) -> bool:
 
 
 async def get_shop_items(category: Optional[str] = None) -> List[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         if category:
             rows = await conn.fetch(
                 "SELECT * FROM shop_items WHERE is_active = TRUE AND category = $1 ORDER BY cost",
@@ -656,67 +991,68 @@ async def get_shop_items(category: Optional[str] = None) -> List[Dict[str, Any]]
 
 async def get_student_purchases(student_id: str) -> List[str]:
     """Return list of item IDs owned by a student."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         rows = await conn.fetch(
-            "SELECT item_id FROM user_purchases WHERE student_id = $1", student_id
+            "SELECT item_id FROM user_purchases WHERE student_id = $1 ORDER BY item_id", student_id
         )
     return [r["item_id"] for r in rows]
 
 
 async def purchase_item(student_id: str, item_id: str) -> Dict[str, Any]:
-    """Deduct points and record purchase + ledger entry atomically."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        item = await conn.fetchrow(
-            "SELECT * FROM shop_items WHERE id = $1 AND is_active = TRUE", item_id
-        )
-        if not item:
-            raise ValueError("Item not found")
-
-        student = await conn.fetchrow(
-            "SELECT total_points FROM students WHERE id = $1", student_id
-        )
-        if not student:
-            raise ValueError("Student not found")
-
-        if student["total_points"] < item["cost"]:
-            raise ValueError("Insufficient points")
-
-        existing = await conn.fetchrow(
-            "SELECT id FROM user_purchases WHERE student_id = $1 AND item_id = $2",
+    """Deduct points and record purchase, ledger entry and balance in one statement.
+
+    The student row is locked first (FOR UPDATE sees the latest committed
+    balance), so concurrent purchases queue on it: each checks the balance
+    it will debit, and the unique (student, item) index lets only one of
+    them own the item. Returns item_id, points_spent and remaining_points.
+    """
+    async with _connection() as conn:
+        row = await conn.fetchrow(
+            """
+            WITH item AS (
+                SELECT id, cost FROM shop_items WHERE id = $2 AND is_active = TRUE
+            ), student AS (
+                SELECT total_points FROM students WHERE id = $1 FOR UPDATE
+            ), bought AS (
+                INSERT INTO user_purchases (student_id, item_id, points_spent)
+                SELECT $1, item.id, item.cost FROM item, student
+                WHERE student.total_points >= item.cost
+                ON CONFLICT (student_id, item_id) DO NOTHING
+                RETURNING item_id, points_spent, nextval('points_ledger_seq') AS seq
+            ), debit AS (
+                UPDATE students SET total_points = total_points - bought.points_spent
+                FROM bought
+                WHERE id = $1 AND total_points >= bought.points_spent
+                RETURNING total_points
+            ), balance AS (
+                INSERT INTO points_balances AS p (student_id, balance, entries, last_seq)
+                SELECT $1, -points_spent, 1, seq FROM bought
+                ON CONFLICT (student_id) DO UPDATE
+                    SET balance = p.balance + EXCLUDED.balance, entries = p.entries + 1,
+                        last_seq = EXCLUDED.last_seq, updated_at = NOW()
+                RETURNING balance
+            ), ledger AS (
+                INSERT INTO points_ledger (student_id, amount, reason, item_id, seq, balance_after)
+                SELECT $1, -points_spent, 'shop_purchase', item_id, seq, balance.balance FROM bought, balance
+            )
+            SELECT (SELECT cost FROM item) AS cost,
+                   (SELECT total_points FROM student) AS balance,
+                   (SELECT total_points FROM debit) AS remaining
+            """,
             student_id,
             item_id,
         )
-        if existing:
-            raise ValueError("Item already owned")
-
-        async with conn.transaction():
-            await conn.execute(
-                "UPDATE students SET total_points = total_points - $1 WHERE id = $2",
-                item["cost"],
-                student_id,
-            )
-            await conn.execute(
-                "INSERT INTO user_purchases (student_id, item_id, points_spent) VALUES ($1, $2, $3)",
-                student_id,
-                item_id,
-                item["cost"],
-            )
-            await conn.execute(
-                """INSERT INTO points_ledger (student_id, amount, reason, item_id)
-                   VALUES ($1, $2, 'shop_purchase', $3)""",
-                student_id,
-                -item["cost"],
-                item_id,
-            )
-
-    return dict(item)
+    if row["cost"] is None:
+        raise ValueError("Item not found")
+    if row["balance"] is None:
+        raise ValueError("Student not found")
+    if row["remaining"] is None:
+        raise ValueError("Insufficient points" if row["balance"] < row["cost"] else "Item already owned")
+    return {"item_id": item_id, "points_spent": row["cost"], "remaining_points": row["remaining"]}
 
 
 async def get_student_avatar(student_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM student_avatar WHERE student_id = $1", student_id
         )
@@ -726,8 +1062,7 @@ async def get_student_avatar(student_id: str) -> Optional[Dict[str, Any]]:
 async def upsert_student_avatar(
     student_id: str, avatar_config: Dict[str, Any]
 ) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """
             INSERT INTO student_avatar (student_id, avatar_config, updated_at)
@@ -746,6 +1081,62 @@ async def upsert_student_avatar(
 
 
 # ─── Points Ledger ────────────────────────────────────────────────────────────
+#
+# Every change to a student's points is a points_ledger row; students.total_points
+# and points_balances are running sums of it, kept up in the same statement
+# that appends the rows. Appends lock the student rows first (in id order), so
+# a student's entries get seq and balance_after in the order they were applied.
+
+
+async def append_points_ledger(
+    entries: List[Tuple[str, int, str, Optional[str], Optional[str]]]
+) -> Dict[str, int]:
+    """Append (student_id, amount, reason, session_id, item_id) entries in one statement.
+
+    Updates points_balances and students.total_points with them and returns
+    student id -> new balance. Entries for students that no longer exist
+    are skipped.
+    """
+    if not entries:
+        return {}
+    student_ids, amounts, reasons, session_ids, item_ids = (list(col) for col in zip(*entries))
+    async with _connection() as conn:
+        rows = await conn.fetch(
+            """
+            WITH batch AS (
+                SELECT b.*, SUM(b.amount) OVER (PARTITION BY b.student_id ORDER BY b.n) AS running
+                FROM unnest($1::text[], $2::int[], $3::text[], $4::text[], $5::text[]) WITH ORDINALITY
+                     AS b(student_id, amount, reason, session_id, item_id, n)
+            ), locked AS (
+                SELECT id FROM students WHERE id = ANY($1::text[]) ORDER BY id FOR UPDATE
+            ), numbered AS (
+                SELECT b.*, nextval('points_ledger_seq') AS seq
+                FROM batch b JOIN locked l ON l.id = b.student_id
+                ORDER BY b.n
+            ), totals AS (
+                SELECT student_id, SUM(amount) AS amount, COUNT(*) AS entries, MAX(seq) AS last_seq
+                FROM numbered GROUP BY student_id
+            ), balances AS (
+                INSERT INTO points_balances AS p (student_id, balance, entries, last_seq)
+                SELECT student_id, amount, entries, last_seq FROM totals
+                ON CONFLICT (student_id) DO UPDATE
+                    SET balance = p.balance + EXCLUDED.balance, entries = p.entries + EXCLUDED.entries,
+                        last_seq = EXCLUDED.last_seq, updated_at = NOW()
+                RETURNING student_id, balance
+            ), ledger AS (
+                INSERT INTO points_ledger (student_id, amount, reason, session_id, item_id, seq, balance_after)
+                SELECT n.student_id, n.amount, n.reason, n.session_id, n.item_id, n.seq,
+                       p.balance - t.amount + n.running
+                FROM numbered n JOIN totals t USING (student_id) JOIN balances p USING (student_id)
+            ), synced AS (
+                UPDATE students s SET total_points = p.balance
+                FROM balances p WHERE s.id = p.student_id
+            )
+            SELECT student_id, balance FROM balances
+            """,
+            student_ids, amounts, reasons, session_ids, item_ids,
+        )
+    return {r["student_id"]: r["balance"] for r in rows}
 
 
 async def add_points_ledger_entry(
@@ -754,18 +1145,117 @@ async def add_points_ledger_entry(
     reason: str,
     session_id: Optional[str] = None,
     item_id: Optional[str] = None,
-) -> None:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """INSERT INTO points_ledger (student_id, amount, reason, session_id, item_id)
-               VALUES ($1, $2, $3, $4, $5)""",
-            student_id,
-            amount,
-            reason,
-            session_id,
-            item_id,
-        )
+) -> Optional[int]:
+    """Append one entry; returns the student's new balance (None if the student is gone)."""
+    balances = await append_points_ledger([(student_id, amount, reason, session_id, item_id)])
+    return balances.get(student_id)
+
+
+async def _open_points_ledger(conn: asyncpg.Connection) -> None:
+    """Make the existing ledger complete before balances are derived from it.
+
+    Session points used to go straight to students.total_points; each
+    student's unrecorded difference becomes one 'opening_balance' entry dated
+    before their first recorded one. Then existing rows are numbered in time
+    order. Runs under the migration lock, and a student who already has an
+    opening balance never gets a second one.
+    """
+    await conn.execute(
+        """
+        INSERT INTO points_ledger (student_id, amount, reason, created_at)
+        SELECT s.id, COALESCE(s.total_points, 0) - COALESCE(l.total, 0), 'opening_balance',
+               LEAST(COALESCE(s.created_at, NOW()), COALESCE(l.first_at, NOW()))
+        FROM students s
+        LEFT JOIN (SELECT student_id, SUM(amount) AS total, MIN(created_at) AS first_at
+                   FROM points_ledger GROUP BY student_id) l ON l.student_id = s.id
+        WHERE COALESCE(s.total_points, 0) <> COALESCE(l.total, 0)
+          AND NOT EXISTS (SELECT 1 FROM points_ledger p
+                          WHERE p.student_id = s.id AND p.reason = 'opening_balance')
+        """
+    )
+    await conn.execute(
+        """
+        UPDATE points_ledger l SET seq = r.n
+        FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY created_at, id) AS n FROM points_ledger) r
+        WHERE l.id = r.id
+        """
+    )
+    await conn.execute(
+        "SELECT setval('points_ledger_seq', COALESCE((SELECT MAX(seq) FROM points_ledger), 0) + 1, false)"
+    )
+
+
+async def _rebuild_points_balances(conn: asyncpg.Connection) -> None:
+    # One pass over the ledger: each entry's running balance in seq order;
+    # only rows whose stored value differs are written
+    await conn.execute(
+        """
+        UPDATE points_ledger l SET balance_after = r.running
+        FROM (SELECT id, SUM(amount) OVER (PARTITION BY student_id ORDER BY seq) AS running
+              FROM points_ledger) r
+        WHERE l.id = r.id AND l.balance_after IS DISTINCT FROM r.running
+        """
+    )
+    await conn.execute(
+        """
+        INSERT INTO points_balances (student_id, balance, entries, last_seq)
+        SELECT student_id, SUM(amount), COUNT(*), MAX(seq) FROM points_ledger GROUP BY student_id
+        ON CONFLICT (student_id) DO UPDATE
+            SET balance = EXCLUDED.balance, entries = EXCLUDED.entries,
+                last_seq = EXCLUDED.last_seq, updated_at = NOW()
+        WHERE (points_balances.balance, points_balances.entries, points_balances.last_seq)
+              IS DISTINCT FROM (EXCLUDED.balance, EXCLUDED.entries, EXCLUDED.last_seq)
+        """
+    )
+    await conn.execute(
+        """
+        DELETE FROM points_balances b
+        WHERE NOT EXISTS (SELECT 1 FROM points_ledger l WHERE l.student_id = b.student_id)
+        """
+    )
+    await conn.execute(
+        """
+        UPDATE students s SET total_points = COALESCE(b.balance, 0)
+        FROM students s2 LEFT JOIN points_balances b ON b.student_id = s2.id
+        WHERE s.id = s2.id AND s.total_points IS DISTINCT FROM COALESCE(b.balance, 0)
+        """
+    )
+
+
+async def rebuild_points_balances() -> None:
+    """Recompute balance_after, points_balances and students.total_points from the ledger.
+
+    Point movements and other student writes wait until it finishes; plain
+    reads carry on.
+    """
+    async with _connection() as conn:
+        async with conn.transaction():
+            await conn.execute("LOCK TABLE students, points_balances, points_ledger IN EXCLUSIVE MODE")
+            await _rebuild_points_balances(conn)
+
+
+async def iter_points_audit(prefetch: int = 5_000) -> AsyncIterator[asyncpg.Record]:
+    """Every student's ledger entries in seq order, from one consistent snapshot.
+
+    Yields (student_id, total_points, balance, entries, last_seq, seq, amount,
+    balance_after) rows ordered by student; a student without entries gets
+    one row with NULL entry columns. Streams through a server-side cursor, so
+    memory stays bounded by `prefetch` however large the ledger is.
+    """
+    async with _connection() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            async for row in conn.cursor(
+                """
+                SELECT s.id AS student_id, s.total_points, b.balance, b.entries, b.last_seq,
+                       l.seq, l.amount, l.balance_after
+                FROM students s
+                LEFT JOIN points_balances b ON b.student_id = s.id
+                LEFT JOIN points_ledger l ON l.student_id = s.id
+                ORDER BY s.id, l.seq
+                """,
+                prefetch=prefetch,
+            ):
+                yield row
 
 
 # ─── Users & Auth ─────────────────────────────────────────────────────────────
@@ -774,8 +1264,7 @@ async def add_points_ledger_entry(
 async def get_or_create_user(
     keycloak_id: str, email: str, full_name: str
 ) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM users WHERE keycloak_id = $1", keycloak_id
         )
@@ -804,8 +1293,7 @@ async def get_or_create_user(
 
 
 async def get_user_by_keycloak_id(keycloak_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM users WHERE keycloak_id = $1", keycloak_id
         )
@@ -813,8 +1301,7 @@ async def get_user_by_keycloak_id(keycloak_id: str) -> Optional[Dict[str, Any]]:
 
 
 async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM users WHERE LOWER(email) = LOWER($1)",
             email,
@@ -823,8 +1310,7 @@ async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
 
 
 async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM users WHERE id = $1",
             user_id,
@@ -833,8 +1319,7 @@ async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
 
 
 async def link_parent_student(parent_id: str, student_id: str) -> None:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """INSERT INTO parent_student (parent_id, student_id)
                VALUES ($1, $2) ON CONFLICT DO NOTHING""",
@@ -844,8 +1329,7 @@ async def link_parent_student(parent_id: str, student_id: str) -> None:
 
 
 async def get_parent_students(parent_id: str) -> List[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         rows = await conn.fetch(
             """SELECT s.* FROM students s
                JOIN parent_student ps ON ps.student_id = s.id
@@ -857,8 +1341,7 @@ async def get_parent_students(parent_id: str) -> List[Dict[str, Any]]:
 
 
 async def get_parent_student_count(parent_id: str) -> int:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         count = await conn.fetchval(
             "SELECT COUNT(*) FROM parent_student WHERE parent_id = $1",
             parent_id,
@@ -867,8 +1350,7 @@ async def get_parent_student_count(parent_id: str) -> int:
 
 
 async def parent_has_student(parent_id: str, student_id: str) -> bool:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             """SELECT 1 FROM parent_student
                WHERE parent_id = $1 AND student_id = $2""",
@@ -882,8 +1364,7 @@ async def parent_has_student(parent_id: str, student_id: str) -> bool:
 
 
 async def get_user_subscription(user_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM subscriptions WHERE user_id = $1", user_id
         )
@@ -893,8 +1374,7 @@ async def get_user_subscription(user_id: str) -> Optional[Dict[str, Any]]:
 async def get_subscription_by_stripe_subscription_id(
     stripe_subscription_id: str,
 ) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM subscriptions WHERE stripe_subscription_id = $1",
             stripe_subscription_id,
@@ -903,8 +1383,7 @@ async def get_subscription_by_stripe_subscription_id(
 
 
 async def upsert_subscription(user_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """
             INSERT INTO subscriptions (user_id, stripe_customer_id, stripe_subscription_id,
@@ -934,8 +1413,7 @@ async def upsert_subscription(user_id: str, data: Dict[str, Any]) -> Dict[str, A
 
 
 async def increment_child_slots(user_id: str, increment: int = 1) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """UPDATE subscriptions
                SET child_slots = GREATEST(1, COALESCE(child_slots, 1) + $2),
@@ -955,8 +1433,7 @@ async def increment_child_slots(user_id: str, increment: int = 1) -> Dict[str, A
 
 
 async def create_onboarding_session(data: Dict[str, Any]) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             """
             INSERT INTO onboarding_sessions (
@@ -993,8 +1470,7 @@ async def create_onboarding_session(data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def get_onboarding_session(onboarding_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM onboarding_sessions WHERE id = $1",
             onboarding_id,
@@ -1005,8 +1481,7 @@ async def get_onboarding_session(onboarding_id: str) -> Optional[Dict[str, Any]]
 async def get_onboarding_by_checkout_session_id(
     checkout_session_id: str,
 ) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM onboarding_sessions WHERE stripe_checkout_session_id = $1",
             checkout_session_id,
@@ -1034,15 +1509,13 @@ async def update_onboarding_session(
         f"UPDATE onboarding_sessions SET {', '.join(set_clauses)} "
         f"WHERE id = ${len(params)}"
     )
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(query, *params)
     return await get_onboarding_session(onboarding_id)
 
 
 async def create_password_reset_token(data: Dict[str, Any]) -> Dict[str, Any]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             """
             INSERT INTO password_reset_tokens
@@ -1059,8 +1532,7 @@ async def create_password_reset_token(data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def get_password_reset_token(token_id: str) -> Optional[Dict[str, Any]]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         row = await conn.fetchrow(
             "SELECT * FROM password_reset_tokens WHERE id = $1",
             token_id,
@@ -1069,8 +1541,7 @@ async def get_password_reset_token(token_id: str) -> Optional[Dict[str, Any]]:
 
 
 async def consume_password_reset_token(token_id: str) -> None:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             "UPDATE password_reset_tokens SET consumed_at = NOW() WHERE id = $1",
             token_id,
@@ -1083,8 +1554,7 @@ async def consume_password_reset_token(token_id: str) -> None:
 async def get_recent_content_hashes(
     student_id: str, content_type: str, limit: int = 50
 ) -> List[str]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         rows = await conn.fetch(
             """SELECT content_hash FROM content_history
                WHERE student_id = $1 AND content_type = $2
@@ -1094,13 +1564,86 @@ async def get_recent_content_hashes(
     return [r["content_hash"] for r in rows]
 
 
+async def get_recent_content_by_type(
+    student_id: str, content_types: List[str], limit: int = 50
+) -> Dict[str, List[str]]:
+    """Newest-first content hashes per content type, up to `limit` each, in one query."""
+    async with _connection() as conn:
+        rows = await conn.fetch(
+            """SELECT content_type, content_hash FROM (
+                   SELECT content_type, content_hash, used_at, ROW_NUMBER() OVER (
+                       PARTITION BY content_type ORDER BY used_at DESC
+                   ) AS rn
+                   FROM content_history
+                   WHERE student_id = $1 AND content_type = ANY($2::text[])
+               ) ranked
+               WHERE rn <= $3
+               ORDER BY content_type, used_at DESC""",
+            student_id, content_types, limit,
+        )
+    result: Dict[str, List[str]] = {ctype: [] for ctype in content_types}
+    for r in rows:
+        result[r["content_type"]].append(r["content_hash"])
+    return result
+
+
 async def record_content_usage(
     student_id: str, content_type: str, content_hash: str
 ) -> None:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _connection() as conn:
         await conn.execute(
             """INSERT INTO content_history (student_id, content_type, content_hash)
                VALUES ($1, $2, $3)""",
             student_id, content_type, content_hash,
         )
+
+
+async def record_content_usage_batch(
+    rows: List[Tuple[str, str, str, datetime]]
+) -> int:
+    """Insert many (student_id, content_type, content_hash, used_at) rows in one statement.
+
+    Rows for students that no longer exist are skipped instead of failing the batch.
+    """
+    if not rows:
+        return 0
+    student_ids, content_types, hashes, used_at = (list(col) for col in zip(*rows))
+    async with _connection() as conn:
+        result = await conn.execute(
+            """INSERT INTO content_history (student_id, content_type, content_hash, used_at)
+               SELECT u.student_id, u.content_type, u.content_hash, u.used_at
+               FROM unnest($1::text[], $2::text[], $3::text[], $4::timestamptz[])
+                    AS u(student_id, content_type, content_hash, used_at)
+               WHERE EXISTS (SELECT 1 FROM students s WHERE s.id = u.student_id)""",
+            student_ids, content_types, hashes, used_at,
+        )
+    return int(result.split()[-1])
+
+
+async def prune_content_history(student_ids: List[str], keep: int) -> int:
+    """Delete all but the newest `keep` rows per (student, content type) for the given students."""
+    if not student_ids:
+        return 0
+    async with _connection() as conn:
+        result = await conn.execute(
+            """DELETE FROM content_history ch
+               USING (
+                   SELECT id FROM (
+                       SELECT id, ROW_NUMBER() OVER (
+                           PARTITION BY student_id, content_type ORDER BY used_at DESC
+                       ) AS rn
+                       FROM content_history
+                       WHERE student_id = ANY($1::text[])
+                   ) ranked
+                   WHERE rn > $2
+               ) old
+               WHERE ch.id = old.id""",
+            student_ids, keep,
+        )
+    return int(result.split()[-1])
+
+
+# ─── Instrumentation ──────────────────────────────────────────────────────────
+
+# Time every public query function as a "db" span (see app.services.instrumentation)
+instrument_module(globals(), "db", exclude={"init_db", "close_db", "get_pool", "listen"})
@@ -0,0 +1,13 @@
+"""
+HTTP caching helpers shared by the routers that answer revalidations.
+"""
+
+from fastapi import Request
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names etag (weak or strong), or is "*"."""
+    tags = request.headers.get("if-none-match")
+    if not tags:
+        return False
+    return any(tag.strip().removeprefix("W/") in (etag, "*") for tag in tags.split(","))
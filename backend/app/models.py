@@ -2,10 +2,11 @@
 Pydantic data models for the EyeRadar Dyslexia Exercise System.
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Optional, List, Dict, Any
 from enum import Enum
 from datetime import datetime
+from zoneinfo import available_timezones
 
 
 # ─── Enums ────────────────────────────────────────────────────────────────────
@@ -51,6 +52,17 @@ class EyeRadarAssessment(BaseModel):
 # ─── Student Models ──────────────────────────────────────────────────────────
 
 
+def _check_timezone(value: Optional[str]) -> Optional[str]:
+    if value is not None and value not in _TIMEZONES:
+        raise ValueError(f"Unknown timezone: {value}")
+    return value
+
+
+_TIMEZONES = available_timezones()
+# IANA name such as "Europe/Athens"; streak days are counted in it
+TimeZoneName = Annotated[Optional[str], AfterValidator(_check_timezone)]
+
+
 class StudentCreate(BaseModel):
     name: str = Field(min_length=1, max_length=100)
     age: int = Field(ge=4, le=18)
@@ -58,6 +70,7 @@ class StudentCreate(BaseModel):
     language: str = "en"
     interests: List[str] = []
     diagnostic: Optional[Dict[str, Any]] = None
+    timezone: TimeZoneName = None
 
 
 class StudentUpdate(BaseModel):
@@ -67,6 +80,7 @@ class StudentUpdate(BaseModel):
     language: Optional[str] = None
     interests: Optional[List[str]] = None
     diagnostic: Optional[Dict[str, Any]] = None
+    timezone: TimeZoneName = None
 
 
 class Student(BaseModel):
@@ -87,6 +101,7 @@ class Student(BaseModel):
     badges: List[str] = []
     level: int = 1
     xp: int = 0
+    timezone: Optional[str] = None
     created_at: datetime
 
 
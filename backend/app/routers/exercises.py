@@ -28,9 +28,10 @@ from app.services.gamification_service import (
     calculate_session_points,
     calculate_level_info,
     update_streak,
-    check_and_award_badges,
+    award_session_badges,
 )
 from app.services.exercise_agent import exercise_agent
+from app.services.tts_prefetch import prefetcher as tts_prefetcher
 
 logger = logging.getLogger(__name__)
 
@@ -114,7 +115,10 @@ async def start_session(
         lang=student_lang,
         student_age=student.get("age"),
         student_id=data.student_id,
+        dyslexia_profile=diag,
     )
+    # Synthesize what the games will speak while the student starts; the keys go into extra_data
+    await tts_prefetcher.annotate(items, student_lang)
 
     session_data = {
         "id": str(uuid.uuid4()),
@@ -207,62 +211,71 @@ async def complete_session(
     if session["status"] != "in_progress":
         raise HTTPException(status_code=400, detail="Session is not in progress")
 
-    results = session.get("results", [])
-    total_items = session.get("total_items", 0)
-    correct_count = sum(1 for r in results if r.get("is_correct"))
-    accuracy = correct_count / total_items if total_items > 0 else 0
-
-    response_times = [r.get("response_time_ms", 0) for r in results if r.get("response_time_ms")]
-    avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-
-    # Calculate points
-    points = calculate_session_points(correct_count, total_items, accuracy)
-
-    # Update student points and XP
-    student = await db.get_student(session["student_id"])
-    if student:
-        new_points = student.get("total_points", 0) + points
-        new_xp = student.get("xp", 0) + points
-        level_info = calculate_level_info(new_xp)
-
-        # Update current level for the deficit area
-        current_levels = student.get("current_levels", {})
-        deficit_area = session.get("deficit_area", "")
-        if accuracy > 0.85:
-            current_levels[deficit_area] = min(10, current_levels.get(deficit_area, 1) + 1)
-        elif accuracy < 0.50:
-            current_levels[deficit_area] = max(1, current_levels.get(deficit_area, 1) - 1)
-
-        await db.update_student(session["student_id"], {
-            "total_points": new_points,
-            "xp": new_xp,
-            "level": level_info.level,
-            "current_levels": current_levels,
-        })
-
-        # Update streak
-        await update_streak(session["student_id"])
-
-        # Check badges
-        badges_earned = await check_and_award_badges(
-            session["student_id"],
-            {"accuracy": accuracy, "points": points},
-        )
-    else:
-        badges_earned = []
-
-    # Update session
-    update_data = {
-        "completed_at": datetime.utcnow().isoformat(),
-        "correct_count": correct_count,
-        "accuracy": round(accuracy, 4),
-        "avg_response_time_ms": round(avg_response_time, 2),
-        "points_earned": points,
-        "badges_earned": badges_earned,
-        "status": "completed",
-    }
-
-    result = await db.update_session(session_id, update_data)
+    # Student totals, streak, badges and the session itself change together
+    async with db.transaction():
+        # Claim the session first: badge counters and points are incremented in
+        # place, so a concurrent complete of the same session must not count it twice
+        session = await db.claim_session(session_id)
+        if not session:
+            raise HTTPException(status_code=400, detail="Session is not in progress")
+
+        results = session.get("results", [])
+        total_items = session.get("total_items", 0)
+        correct_count = sum(1 for r in results if r.get("is_correct"))
+        accuracy = correct_count / total_items if total_items > 0 else 0
+
+        response_times = [r.get("response_time_ms", 0) for r in results if r.get("response_time_ms")]
+        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+
+        # Calculate points
+        points = calculate_session_points(correct_count, total_items, accuracy)
+
+        # Update student points (through the ledger) and XP
+        student = await db.get_student(session["student_id"])
+        if student:
+            balances = await db.append_points_ledger(
+                [(student["id"], points, "session_complete", session_id, None)]
+            )
+            new_points = balances.get(student["id"], student.get("total_points", 0) + points)
+            new_xp = student.get("xp", 0) + points
+            level_info = calculate_level_info(new_xp)
+
+            # Update current level for the deficit area
+            current_levels = student.get("current_levels", {})
+            deficit_area = session.get("deficit_area", "")
+            if accuracy > 0.85:
+                current_levels[deficit_area] = min(10, current_levels.get(deficit_area, 1) + 1)
+            elif accuracy < 0.50:
+                current_levels[deficit_area] = max(1, current_levels.get(deficit_area, 1) - 1)
+
+            await db.update_student(session["student_id"], {
+                "xp": new_xp,
+                "level": level_info.level,
+                "current_levels": current_levels,
+            })
+
+            # Update streak
+            current_streak, _ = await update_streak(session["student_id"])
+
+            # Count the session and check the badges it affects
+            badges_earned = await award_session_badges(
+                student, deficit_area, round(accuracy, 4), new_points, level_info.level, current_streak,
+            )
+        else:
+            badges_earned = []
+
+        # Update session
+        update_data = {
+            "completed_at": datetime.utcnow().isoformat(),
+            "correct_count": correct_count,
+            "accuracy": round(accuracy, 4),
+            "avg_response_time_ms": round(avg_response_time, 2),
+            "points_earned": points,
+            "badges_earned": badges_earned,
+            "status": "completed",
+        }
+
+        result = await db.update_session(session_id, update_data)
     return result
 
 
@@ -2,15 +2,17 @@
 Gamification endpoints: points, levels, badges, streaks, shop.
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
 from app.auth import verify_token, verify_student_access
+from app.http_cache import not_modified
 from app.models import GamificationSummary, Badge
-from app.services.gamification_service import get_gamification_summary
+from app.services.gamification_service import get_gamification_summary, get_student_badge_view
 from app.services.gamification_badges import get_all_badges
+from app.services.shop_catalog import Body, catalog
 from app import database as db
 
 router = APIRouter()
@@ -40,11 +42,7 @@ async def get_student_badges(
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    earned = set(student.get("badges", []))
-    all_badges = get_all_badges()
-    for badge in all_badges:
-        badge.earned = badge.id in earned
-    return all_badges
+    return await get_student_badge_view(student)
 
 
 @router.get("/badges/all", response_model=list[Badge])
@@ -56,14 +54,49 @@ async def list_all_badges():
 # ─── Shop ─────────────────────────────────────────────────────────────────────
 
 
+def _json_body(request: Request, body: Body) -> Response:
+    """A prepared JSON body, or 304 when the client already has this ETag."""
+    # Clients revalidate every time; the ETag makes that a 304 until the data changes
+    headers = {"ETag": body.etag, "Cache-Control": "private, no-cache"}
+    if not_modified(request, body.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body.content, media_type="application/json", headers=headers)
+
+
+@router.get("/shop")
+async def get_shop(request: Request, category: Optional[str] = Query(None)):
+    """List the active shop items, optionally of one category."""
+    snapshot = await catalog.snapshot()
+    return _json_body(request, snapshot.body(category))
+
+
+@router.get("/{student_id}/shop")
+async def get_student_shop(
+    student_id: str,
+    request: Request,
+    category: Optional[str] = Query(None),
+    claims: Dict[str, Any] = Depends(verify_token),
+):
+    """Shop items plus the IDs this student owns, in one response."""
+    await verify_student_access(claims, student_id)
+    items, owned = (await catalog.snapshot()).body(category), (await catalog.owned(student_id)).body
+    body = Body(
+        b'{"items":' + items.content + b',"owned":' + owned.content + b"}",
+        items.etag[:-1] + "-" + owned.etag[1:],
+    )
+    return _json_body(request, body)
+
+
 @router.get("/{student_id}/purchases", response_model=List[str])
 async def get_purchases(
     student_id: str,
+    request: Request,
     claims: Dict[str, Any] = Depends(verify_token),
 ):
     """Return item IDs owned by this student."""
     await verify_student_access(claims, student_id)
-    return await db.get_student_purchases(student_id)
+    owned = await catalog.owned(student_id)
+    return _json_body(request, owned.body)
 
 
 class PurchaseRequest(BaseModel):
@@ -84,12 +117,9 @@ async def purchase_shop_item(
     """Buy a shop item — deducts points atomically."""
     await verify_student_access(claims, student_id)
     try:
-        await db.purchase_item(student_id, body.item_id)
+        purchase = await db.purchase_item(student_id, body.item_id)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
-    student = await db.get_student(student_id)
-    return PurchaseResponse(
-        item_id=body.item_id,
-        remaining_points=student["total_points"] if student else 0,
-    )
+    catalog.forget_owned(student_id)
+    return PurchaseResponse(item_id=body.item_id, remaining_points=purchase["remaining_points"])
@@ -108,6 +108,7 @@ async def create_student(
         "interests": data.interests,
         "diagnostic": data.diagnostic or {},
         "current_levels": {},
+        "timezone": data.timezone,
         "created_at": datetime.utcnow().isoformat(),
     }
     result = await db.create_student(student_data)
@@ -216,6 +217,7 @@ async def create_parent_student(
         "interests": data.interests,
         "diagnostic": data.diagnostic or {},
         "current_levels": {},
+        "timezone": data.timezone,
         "created_at": datetime.utcnow().isoformat(),
     }
     result = await db.create_student(student_data)
@@ -313,6 +315,7 @@ async def upsert_student(
         "interests": data.interests,
         "diagnostic": data.diagnostic or {},
         "current_levels": {},
+        "timezone": data.timezone,
         "created_at": datetime.utcnow().isoformat(),
     }
     return await db.create_student(student_data)
@@ -1,83 +1,173 @@
 """
-Text-to-Speech endpoint using Microsoft Edge neural voices.
+Text-to-Speech endpoints using Microsoft Edge neural voices.
 Supports English (en) and Greek (el) with high-quality voices.
+
+Clips are requested by text, by the cache key an exercise item carries in
+extra_data["tts_keys"] (see app.services.tts_prefetch), or many at once
+through /batch.
 """
 
-import io
-import hashlib
+import asyncio
+import json
 import logging
-from pathlib import Path
-from typing import Any, Dict, Optional
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
-import edge_tts
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
 from app.auth import verify_token
+from app.http_cache import not_modified
+from app.services import tts_bundle
+from app.services.tts_cache import cache, cache_key
+from app.services.tts_prefetch import prefetcher
+from app.services.tts_synthesis import DEFAULT_RATE, Synthesis, clip, synthesis, voice_for
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-VOICE_MAP = {
-    "en": "en-US-AriaNeural",
-    "en-US": "en-US-AriaNeural",
-    "en-GB": "en-GB-SoniaNeural",
-    "el": "el-GR-AthinaNeural",
-    "el-GR": "el-GR-AthinaNeural",
-}
-
-CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".tts_cache"
-CACHE_DIR.mkdir(exist_ok=True)
+AUDIO_HEADERS = {"Cache-Control": "public, max-age=86400"}
+MAX_BATCH = 100                                                      # clips per /batch request
+BATCH_CONCURRENCY = int(os.getenv("TTS_BATCH_CONCURRENCY", "8"))     # clips fetched at once per batch
 
 
-def _cache_key(text: str, lang: str, rate: str) -> str:
-    raw = f"{text}|{lang}|{rate}"
-    return hashlib.sha256(raw.encode()).hexdigest()
+async def _send(first: bytes, audio: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    try:
+        yield first
+        async for data in audio:
+            yield data
+    finally:
+        await audio.aclose()
 
 
 @router.get("")
 async def synthesize_speech(
+    request: Request,
     text: str = Query(..., min_length=1, max_length=500),
     lang: str = Query("el", description="Language code: en, el, en-US, el-GR"),
     rate: Optional[str] = Query(None, description="Speed adjustment e.g. -10% or +20%"),
     _claims: Dict[str, Any] = Depends(verify_token),
 ):
     """Generate speech audio from text using Microsoft Edge neural voices."""
-    voice = VOICE_MAP.get(lang, VOICE_MAP.get(lang.split("-")[0], "en-US-AriaNeural"))
-    speed = rate or "+0%"
+    voice = voice_for(lang)
+    speed = rate or DEFAULT_RATE
+
+    key = cache_key(text, voice, speed)
+
+    async def start() -> Synthesis:
+        return synthesis(key, text, voice, speed)
+
+    return await _serve(request, key, start)
+
 
-    cache_file = CACHE_DIR / f"{_cache_key(text, voice, speed)}.mp3"
-    if cache_file.exists():
-        return FileResponse(
-            path=str(cache_file),
-            media_type="audio/mpeg",
-            headers={"Cache-Control": "public, max-age=86400"},
-        )
+@router.get("/clip/{key}")
+async def get_clip(
+    request: Request,
+    key: str = Path(..., pattern="^[0-9a-f]{64}$"),
+    _claims: Dict[str, Any] = Depends(verify_token),
+):
+    """A clip by the cache key handed out in an exercise item's tts_keys."""
+    return await _serve(request, key, lambda: prefetcher.claim(key))
+
+
+async def _serve(request: Request, key: str, start: Callable[[], Awaitable[Optional[Synthesis]]]):
+    """The bundled or cached clip, or the synthesis start() returns streamed as it runs; 404 if none."""
+    bundled = tts_bundle.get(key)
+    if bundled is not None:
+        # The key names the clip's content, so it is the ETag
+        headers = {**AUDIO_HEADERS, "ETag": f'"{key[:32]}"'}
+        if not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        # A view into the mapped archive: no file open, no stat, no copy
+        return Response(bundled, media_type="audio/mpeg", headers=headers)
+    if await cache.get(key) is not None:
+        headers = {**AUDIO_HEADERS, "ETag": f'"{key[:32]}"'}
+        if not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        # Opened before any header is sent: a clip another worker evicted is synthesized again
+        cached = await cache.read(key)
+        if cached is not None:
+            return Response(cached, media_type="audio/mpeg", headers=headers)
 
+    current = await start()
+    if current is None:
+        return JSONResponse(status_code=404, content={"detail": "Clip not found"})
+    # Headers go out with the first chunk, so a synthesis that fails before it still gets a 500
+    audio = current.audio()
     try:
-        communicate = edge_tts.Communicate(text, voice, rate=speed)
-        buffer = io.BytesIO()
-        async for chunk in communicate.stream():
-            if chunk["type"] == "audio":
-                buffer.write(chunk["data"])
-
-        audio_bytes = buffer.getvalue()
-
-        try:
-            cache_file.write_bytes(audio_bytes)
-        except Exception:
-            pass
-
-        from fastapi.responses import StreamingResponse
-        return StreamingResponse(
-            io.BytesIO(audio_bytes),
-            media_type="audio/mpeg",
-            headers={"Cache-Control": "public, max-age=86400"},
-        )
-    except Exception as exc:
-        logger.error("TTS generation failed: %s", exc)
-        from fastapi.responses import JSONResponse
-        return JSONResponse(
-            status_code=500,
-            content={"detail": "TTS generation failed"},
-        )
+        first = await audio.__anext__()
+    except Exception:
+        await audio.aclose()
+        return JSONResponse(status_code=500, content={"detail": "TTS generation failed"})
+    return StreamingResponse(_send(first, audio), media_type="audio/mpeg", headers=AUDIO_HEADERS)
+
+
+# ─── Batch ───────────────────────────────────────────────────────────────────
+
+class ClipRequest(BaseModel):
+    text: str = Field(min_length=1, max_length=500)
+    lang: str = Field(default="el", max_length=8)
+    rate: Optional[str] = Field(default=None, max_length=8)
+
+
+class BatchRequest(BaseModel):
+    clips: List[ClipRequest] = Field(min_length=1, max_length=MAX_BATCH)
+
+
+@router.post("/batch")
+async def synthesize_batch(
+    body: BatchRequest,
+    _claims: Dict[str, Any] = Depends(verify_token),
+):
+    """Many clips in one response: a JSON manifest line, then the clips back to back.
+
+    The manifest, {"clips": [{"key", "offset", "length"} or {"key", "error"}]}
+    in request order, ends at the first newline; offsets count from the byte
+    after it. Clips are fetched concurrently, BATCH_CONCURRENCY at a time, and
+    cached, so each key also works with /clip/{key}.
+    """
+    jobs: Dict[str, Tuple[str, str, str]] = {}
+    keys = []
+    for requested in body.clips:
+        voice, speed = voice_for(requested.lang), requested.rate or DEFAULT_RATE
+        key = cache_key(requested.text, voice, speed)
+        jobs.setdefault(key, (requested.text, voice, speed))
+        keys.append(key)
+
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def fetch(key: str, text: str, voice: str, speed: str) -> Optional[bytes]:
+        async with limit:
+            try:
+                return await clip(key, text, voice, speed)
+            except Exception as exc:
+                logger.warning("TTS batch clip %s failed: %s", key, exc)
+                return None
+
+    audio = dict(zip(jobs, await asyncio.gather(*(fetch(key, *job) for key, job in jobs.items()))))
+
+    manifest: List[Dict[str, Any]] = []
+    parts: List[bytes] = []
+    placed: Dict[str, Tuple[int, int]] = {}
+    offset = 0
+    for key in keys:
+        data = audio[key]
+        if data is None:
+            manifest.append({"key": key, "error": "TTS generation failed"})
+            continue
+        if key not in placed:
+            placed[key] = (offset, len(data))
+            parts.append(data)
+            offset += len(data)
+        start, length = placed[key]
+        manifest.append({"key": key, "offset": start, "length": length})
+    head = json.dumps({"clips": manifest}, separators=(",", ":")).encode() + b"\n"
+
+    async def stream() -> AsyncIterator[bytes]:
+        # Each clip is sent as it is, without copying them all into one buffer
+        yield head
+        for data in parts:
+            yield data
+
+    return StreamingResponse(stream(), media_type="application/octet-stream", headers={"Cache-Control": "no-store"})
@@ -17,8 +17,13 @@ from typing import Optional
 
 import httpx
 
+from app.services import executors
+
 logger = logging.getLogger(__name__)
 
+# Uploads smaller than this are base64-encoded inline; a process round trip costs more
+_INLINE_ENCODE_BYTES = 256 * 1024
+
 # ─── Schema hint for the AI prompt ───────────────────────────────────────────
 
 _SCHEMA = """{
@@ -126,6 +131,10 @@ async def _openai_text(
         return None
 
 
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
 async def _openai_vision(
     image_bytes: bytes,
     mime_type: str,
@@ -134,7 +143,10 @@ async def _openai_vision(
     model: str,
 ) -> Optional[dict]:
     """Send a base64-encoded image to GPT-4o vision and parse JSON response."""
-    b64 = base64.b64encode(image_bytes).decode()
+    if len(image_bytes) < _INLINE_ENCODE_BYTES:
+        b64 = _b64encode(image_bytes)
+    else:
+        b64 = await executors.run_cpu("encode", _b64encode, image_bytes)
     payload = {
         "model": model,
         "messages": [
@@ -295,7 +307,8 @@ async def parse_assessment_file(
 
     # ── PDF ───────────────────────────────────────────────────────────────
     if ext == "pdf" or mime == "application/pdf":
-        text = _extract_pdf_text(file_bytes)
+        # pypdf is pure Python and can take seconds on large reports
+        text = await executors.run_cpu("pdf", _extract_pdf_text, file_bytes)
         if not text.strip():
             raise ValueError(
                 "Could not read text from this PDF. "
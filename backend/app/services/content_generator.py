@@ -7,17 +7,21 @@ falls back to template-based generation when unavailable.
 Each generator produces items with `extra_data` for interactive game types.
 """
 
+import inspect
 import logging
 import random
 import json
-from contextvars import ContextVar
-from typing import List, Dict, Any
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
 from app.models import ExerciseItem
 from app.services import ai_content as ai
+from app.services import executors
+from app.services.content_history import ContentHistory, NoveltyPicker, history as content_history, space
+from app.services.instrumentation import span
 
 logger = logging.getLogger(__name__)
-_STUDENT_AGE_CTX: ContextVar[int | None] = ContextVar("student_age", default=None)
 
 # ─── Bilingual strings ────────────────────────────────────────────────────────
 
@@ -212,70 +216,95 @@ def _age_bucket(student_age: int | None) -> str | None:
     return "13-18"
 
 
-def get_word_bank(difficulty: int, lang: str = "en", student_age: int | None = None) -> List[str]:
-    # Use explicit age first, then request-context age.
-    age = student_age if student_age is not None else _STUDENT_AGE_CTX.get()
+def get_word_bank(difficulty: int, lang: str = "en", student_age: int | None = None) -> Tuple[str, ...]:
     tier = _difficulty_tier(difficulty)
-    bucket = _age_bucket(age)
+    bucket = _age_bucket(student_age)
 
     # Prevent overly childish vocabulary for teens even at lower difficulty.
-    if age is not None and age >= 13 and tier == "simple":
+    if student_age is not None and student_age >= 13 and tier == "simple":
         tier = "medium"
 
-    if isinstance(WORD_BANKS_BY_AGE, dict):
-        lang_banks = WORD_BANKS_BY_AGE.get(lang, {})
-        if bucket and isinstance(lang_banks, dict):
-            bucket_banks = lang_banks.get(bucket, {})
-            if isinstance(bucket_banks, dict):
-                bank = bucket_banks.get(tier)
-                if isinstance(bank, list) and bank:
-                    return bank
+    if bucket:
+        bank = _INDEX.words.get((lang, bucket, tier))
+        if bank:
+            return bank
 
     # Fallback to static banks.
-    if lang == "el":
-        if difficulty <= 2:
-            return SIMPLE_WORDS_EL
-        elif difficulty <= 4:
-            return MEDIUM_WORDS_EL
-        elif difficulty <= 7:
-            return HARD_WORDS_EL
-        else:
-            return ADVANCED_WORDS_EL
-    if difficulty <= 2:
-        return SIMPLE_WORDS
-    elif difficulty <= 4:
-        return MEDIUM_WORDS
-    elif difficulty <= 7:
-        return HARD_WORDS
-    else:
-        return ADVANCED_WORDS
+    return _INDEX.words[("el" if lang == "el" else "en", None, _difficulty_tier(difficulty))]
+
+
+def _sample_excluding(pool: Sequence[Any], exclude: Any, k: int, rng: random.Random = random) -> List[Any]:
+    """Sample up to k distinct entries of pool other than exclude, without copying pool."""
+    drawn = rng.sample(pool, min(k + 1, len(pool)))
+    return [x for x in drawn if x != exclude][:k]
 
 
 import hashlib as _hashlib
 
-_STUDENT_ID_CTX: ContextVar[str | None] = ContextVar("student_id", default=None)
+
+@dataclass
+class GenerationContext:
+    """Everything a generator may know about the request, passed explicitly.
+
+    Generators read the student's age, language and content history only
+    from here and draw randomness only from ``rng``, so sessions for many
+    students can be generated concurrently without sharing state. A fixed
+    ``seed`` makes a context's output reproducible.
+    """
+
+    lang: str = "en"
+    student_id: str | None = None
+    student_age: int | None = None
+    interests: List[str] = field(default_factory=list)
+    # The student's diagnostic, e.g. {"dyslexia_type": "phonological", "severity_level": "moderate"}
+    dyslexia_profile: Dict[str, Any] = field(default_factory=dict)
+    seed: int | None = None
+    # Recent-content rings used for novelty picks
+    novelty: ContentHistory = field(default=content_history, repr=False, compare=False)
+    rng: random.Random = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+
+    def picker(self, content_type: str, pool: Sequence[Any], key: Callable[[Any], str] = str) -> NoveltyPicker:
+        """Picker over pool that prefers content this student hasn't seen recently.
+
+        The student's history must have been warmed (generate_exercise_items
+        does this); without a student it draws uniformly from ``rng``.
+        """
+        return self.novelty.picker(self.student_id, content_type, pool, key, rng=self.rng)
 
 
 def _passage_hash(passage: dict) -> str:
-    return _hashlib.md5(passage.get("text", "").encode()).hexdigest()
+    return passage.get("content_hash") or _hashlib.md5(passage.get("text", "").encode()).hexdigest()
+
+
+def _with_passage_hashes(passages: list[dict]) -> list[dict]:
+    """Attach each passage's content hash once at load, so picks never re-hash the text."""
+    for passage in passages:
+        passage["content_hash"] = _hashlib.md5(passage.get("text", "").encode()).hexdigest()
+    return passages
+
+
+async def _pick_passage(passages: list[dict], ctx: GenerationContext) -> dict:
+    """Select a passage, avoiding recently used ones for the context's student.
+
+    Recent passages come from the in-memory content history (one DB read per
+    student on first use); the pick is persisted write-behind.
+    """
+    if not ctx.student_id or not passages:
+        return ctx.rng.choice(passages) if passages else {}
 
+    await ctx.novelty.recent(ctx.student_id, "passage")
+    return passages[ctx.picker("passage", passages, _passage_hash)()]
 
-async def _pick_passage(passages: list[dict], student_id: str | None = None) -> dict:
-    """Select a passage, avoiding recently used ones for the given student."""
-    sid = student_id or _STUDENT_ID_CTX.get()
-    if not sid or not passages:
-        return random.choice(passages) if passages else {}
 
-    try:
-        from app import database as _db
-        recent_hashes = await _db.get_recent_content_hashes(sid, "passage", limit=50)
-        recent_set = set(recent_hashes)
-        unseen = [p for p in passages if _passage_hash(p) not in recent_set]
-        chosen = random.choice(unseen) if unseen else random.choice(passages)
-        await _db.record_content_usage(sid, "passage", _passage_hash(chosen))
-        return chosen
-    except Exception:
-        return random.choice(passages)
+def _rhyme_key(pair: Tuple[str, str]) -> str:
+    return f"{pair[0]}/{pair[1]}"
+
+
+_entry_word = itemgetter(0)
+_image_id = itemgetter("id")
 
 
 def _pick_passage_sync(passages: list[dict]) -> dict:
@@ -283,9 +312,8 @@ def _pick_passage_sync(passages: list[dict]) -> dict:
     return random.choice(passages) if passages else {}
 
 
-def _age_adjusted_passage_level(difficulty: int) -> str:
+def _age_adjusted_passage_level(difficulty: int, age: int | None = None) -> str:
     """Choose passage difficulty, nudged by student age for age-appropriate content."""
-    age = _STUDENT_AGE_CTX.get()
     if difficulty <= 3:
         base = "easy"
     elif difficulty <= 6:
@@ -413,6 +441,415 @@ def _load_content_pools_from_json() -> None:
 
 
 _load_content_pools_from_json()
+for _levels in (STORY_PASSAGES, STORY_PASSAGES_EL):
+    for _passages in _levels.values():
+        _with_passage_hashes(_passages)
+
+
+PSEUDO_WORDS = [
+    "blorft", "snalp", "gribble", "tramble", "flonk",
+    "criddle", "spunt", "blemish", "glorp", "twisk",
+    "plondle", "frazzle", "snarble", "quibble", "drintle",
+    "glopper", "strumble", "flimber", "brontled", "klipster",
+]
+
+
+EXERCISE_IMAGES = [
+    {"id": "grandmother", "url": "/game-assets/exercise-images/grandmother.png", "label": "Grandmother", "label_el": "Γιαγιά"},
+    {"id": "cat",         "url": "/game-assets/exercise-images/cat.png",         "label": "Cat",         "label_el": "Γάτα"},
+    {"id": "dog",         "url": "/game-assets/exercise-images/dog.png",         "label": "Dog",         "label_el": "Σκύλος"},
+    {"id": "tiger",       "url": "/game-assets/exercise-images/tiger.png",       "label": "Tiger",       "label_el": "Τίγρης"},
+    {"id": "duck",        "url": "/game-assets/exercise-images/duck.png",        "label": "Duck",        "label_el": "Πάπια"},
+    {"id": "apple",       "url": "/game-assets/exercise-images/apple.png",       "label": "Apple",       "label_el": "Μήλο"},
+    {"id": "house",       "url": "/game-assets/exercise-images/house.png",       "label": "House",       "label_el": "Σπίτι"},
+    {"id": "tree",        "url": "/game-assets/exercise-images/tree.png",        "label": "Tree",        "label_el": "Δέντρο"},
+    {"id": "sun",         "url": "/game-assets/exercise-images/sun.png",         "label": "Sun",         "label_el": "Ήλιος"},
+    {"id": "fish",        "url": "/game-assets/exercise-images/fish.png",        "label": "Fish",        "label_el": "Ψάρι"},
+    {"id": "flower",      "url": "/game-assets/exercise-images/flower.png",      "label": "Flower",      "label_el": "Λουλούδι"},
+    {"id": "book",        "url": "/game-assets/exercise-images/book.png",        "label": "Book",        "label_el": "Βιβλίο"},
+]
+
+
+def _get_img_label(img: Dict[str, Any], lang: str = "en") -> str:
+    """Get image label in the specified language."""
+    if lang == "el":
+        return img.get("label_el", img["label"])
+    return img["label"]
+
+
+# ─── Static tables used by template generators ───────────────────────────────
+
+FLASH_CARD_MEANINGS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "cat": "a small furry pet", "dog": "a loyal pet animal", "sun": "a star that gives us light",
+        "tree": "a tall plant with branches", "fish": "an animal that lives in water",
+        "star": "a bright light in the sky", "moon": "shines at night in the sky",
+        "rain": "water falling from clouds", "bird": "an animal with wings",
+        "castle": "a large building with towers", "dragon": "a mythical fire-breathing creature",
+        "forest": "an area with many trees", "island": "land surrounded by water",
+        "monkey": "a clever primate", "rabbit": "a furry animal with long ears",
+    },
+    "el": {
+        "γάτα": "ένα μικρό τριχωτό κατοικίδιο", "σκύλος": "ένα πιστό κατοικίδιο",
+        "ήλιος": "ένα αστέρι που μας δίνει φως", "δέντρο": "ένα ψηλό φυτό με κλαδιά",
+        "ψάρι": "ένα ζώο που ζει στο νερό", "αστέρι": "ένα λαμπρό φως στον ουρανό",
+        "φεγγάρι": "λάμπει τη νύχτα στον ουρανό", "βροχή": "νερό που πέφτει από τα σύννεφα",
+        "πουλί": "ένα ζώο με φτερά", "κάστρο": "ένα μεγάλο κτήριο με πύργους",
+        "δράκος": "ένα μυθικό πλάσμα που βγάζει φωτιά", "δάσος": "μια περιοχή με πολλά δέντρα",
+        "νησί": "γη που περιβάλλεται από νερό", "πίθηκος": "ένα έξυπνο πρωτεύον",
+        "κουνέλι": "ένα τριχωτό ζώο με μακριά αυτιά",
+    },
+}
+
+SYLLABLE_MAP: Dict[str, Dict[str, int]] = {
+    "en": {
+        "cat": 1, "dog": 1, "sun": 1, "hat": 1, "bed": 1,
+        "tiger": 2, "monkey": 2, "basket": 2, "garden": 2, "table": 2,
+        "elephant": 3, "beautiful": 3, "adventure": 3, "chocolate": 3, "banana": 3,
+        "caterpillar": 4, "watermelon": 4, "calculator": 4,
+        "encyclopedia": 6, "imagination": 5,
+    },
+    "el": {
+        "γάτα": 2, "σκύλος": 2, "ήλιος": 3, "σπίτι": 2, "ψάρι": 2,
+        "μήλο": 2, "δέντρο": 2, "νερό": 2, "παιδί": 2, "βιβλίο": 3,
+        "ελέφαντας": 4, "πεταλούδα": 4, "περιπέτεια": 5, "σοκολάτα": 4,
+        "μπανάνα": 3, "καμηλοπάρδαλη": 6, "καρπούζι": 3, "υπολογιστής": 5,
+        "εγκυκλοπαίδεια": 7, "φαντασία": 4,
+    },
+}
+
+SPEED_NAMER_SEQUENCES: Dict[str, Dict[str, List[str]]] = {
+    "en": {
+        "letters": list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+        "numbers": [str(n) for n in range(1, 21)],
+        "colors": ["red", "blue", "green", "yellow", "orange", "purple", "pink", "brown"],
+    },
+    "el": {
+        "letters": list("ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩ"),
+        "numbers": [str(n) for n in range(1, 21)],
+        "colors": ["κόκκινο", "μπλε", "πράσινο", "κίτρινο", "πορτοκαλί", "μωβ", "ροζ", "καφέ"],
+    },
+}
+
+PROSODY_SENTENCES: Dict[str, List[Tuple[str, str]]] = {
+    "en": [
+        ("I can't believe it!", "excited"), ("Where are you going?", "questioning"),
+        ("Please sit down quietly.", "calm"), ("Watch out for that car!", "urgent"),
+        ("Once upon a time, there lived a king.", "storytelling"),
+        ("Happy birthday to you!", "celebratory"),
+        ("We won the championship!", "excited"),
+        ("Could you please help me?", "polite"),
+        ("Stop right there! Don't move!", "commanding"),
+    ],
+    "el": [
+        ("Δεν μπορώ να το πιστέψω!", "ενθουσιασμός"), ("Πού πηγαίνεις;", "ερώτηση"),
+        ("Κάτσε ήσυχα, σε παρακαλώ.", "ηρεμία"), ("Πρόσεχε το αυτοκίνητο!", "επείγον"),
+        ("Μια φορά κι έναν καιρό, ζούσε ένας βασιλιάς.", "αφήγηση"),
+        ("Χρόνια πολλά!", "εορταστικό"),
+        ("Κερδίσαμε το πρωτάθλημα!", "ενθουσιασμός"),
+        ("Μπορείς να με βοηθήσεις;", "ευγένεια"),
+        ("Σταμάτα! Μην κουνιέσαι!", "εντολή"),
+    ],
+}
+
+MAIN_IDEA_PASSAGES: Dict[str, List[Tuple[str, str]]] = {
+    "en": [
+        ("Dogs make wonderful pets. They are loyal, friendly, and love to play. Many families enjoy having a dog.",
+         "Dogs make great pets"),
+        ("The ocean is home to many creatures. Fish, whales, and dolphins all live in the sea. Coral reefs provide shelter for thousands of species.",
+         "The ocean has diverse marine life"),
+        ("Exercise is important for health. Running, swimming, and biking help keep your body strong. Even a short walk each day can make a difference.",
+         "Exercise keeps you healthy"),
+        ("Trees provide us with oxygen and shade. Birds build nests in their branches. Some trees live for thousands of years, standing tall through storms and seasons.",
+         "Trees are important and resilient"),
+        ("Music can change the way we feel. A happy song can make us smile, and a slow melody can help us relax. Scientists say listening to music is good for our brains.",
+         "Music affects our mood and health"),
+    ],
+    "el": [
+        ("Οι σκύλοι είναι υπέροχα κατοικίδια. Είναι πιστοί, φιλικοί και τους αρέσει να παίζουν. Πολλές οικογένειες χαίρονται που έχουν σκύλο.",
+         "Οι σκύλοι είναι υπέροχα κατοικίδια"),
+        ("Ο ωκεανός φιλοξενεί πολλά πλάσματα. Ψάρια, φάλαινες και δελφίνια ζουν στη θάλασσα. Τα κοραλλιογενή υφάλους προσφέρουν καταφύγιο.",
+         "Ο ωκεανός έχει ποικίλη θαλάσσια ζωή"),
+        ("Η άσκηση είναι σημαντική για την υγεία. Το τρέξιμο, η κολύμβηση και η ποδηλασία βοηθούν το σώμα. Ακόμα και ένας μικρός περίπατος κάνει τη διαφορά.",
+         "Η άσκηση σε κρατάει υγιή"),
+        ("Τα δέντρα μας δίνουν οξυγόνο και σκιά. Τα πουλιά χτίζουν φωλιές στα κλαδιά τους. Μερικά δέντρα ζουν χιλιάδες χρόνια.",
+         "Τα δέντρα είναι σημαντικά"),
+        ("Η μουσική αλλάζει τη διάθεσή μας. Ένα χαρούμενο τραγούδι μας κάνει να χαμογελάμε. Οι επιστήμονες λένε ότι η μουσική κάνει καλό στον εγκέφαλο.",
+         "Η μουσική επηρεάζει τη διάθεση"),
+    ],
+}
+
+IMAGE_PHRASES: Dict[str, List[str]] = {
+    "en": [
+        "the big cat", "a little dog", "the yellow sun", "a red apple",
+        "my pet fish", "a tall tree", "the old book", "a pretty flower",
+        "the fat duck", "the baby tiger", "a small house", "my grandmother",
+    ],
+    "el": [
+        "η μεγάλη γάτα", "ένας μικρός σκύλος", "ο κίτρινος ήλιος", "ένα κόκκινο μήλο",
+        "το ψάρι μου", "ένα ψηλό δέντρο", "το παλιό βιβλίο", "ένα όμορφο λουλούδι",
+        "η χοντρή πάπια", "η μικρή τίγρης", "ένα μικρό σπίτι", "η γιαγιά μου",
+    ],
+}
+
+IMAGE_PHRASE_WORDS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "cat": "cat", "dog": "dog", "sun": "sun", "apple": "apple",
+        "fish": "fish", "tree": "tree", "book": "book", "flower": "flower",
+        "duck": "duck", "tiger": "tiger", "house": "house", "grandmother": "grandmother",
+    },
+    "el": {
+        "γάτα": "cat", "σκύλος": "dog", "ήλιος": "sun", "μήλο": "apple",
+        "ψάρι": "fish", "δέντρο": "tree", "βιβλίο": "book", "λουλούδι": "flower",
+        "πάπια": "duck", "τίγρης": "tiger", "σπίτι": "house", "γιαγιά": "grandmother",
+    },
+}
+
+PHRASE_FILLER_WORDS: Dict[str, List[str]] = {
+    "en": ["the", "a", "my", "to", "it", "in", "go", "we", "up", "on"],
+    "el": ["η", "ο", "ένα", "μια", "στο", "από", "και", "με", "για", "δεν"],
+}
+
+ALPHABETS: Dict[str, str] = {
+    "en": "abcdefghijklmnopqrstuvwxyz",
+    "el": "αβγδεζηθικλμνξοπρστυφχψω",
+    "EN": "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "EL": "ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩ",
+}
+
+
+# ─── Precompiled content index ────────────────────────────────────────────────
+#
+# Everything the template generators derive from the pools above (age/tier
+# word banks, rhyme lookups, syllable buckets, distractor candidates, localized
+# image cards) is computed once here, after the JSON pools are loaded, and
+# stored as tuples. Generators only index and sample at call time.
+
+_LANGS = ("en", "el")
+_TIERS = ("simple", "medium", "hard", "advanced")
+_DIFFICULTIES = range(1, 11)
+
+
+@dataclass(frozen=True)
+class ContentIndex:
+    """Read-only lookup tables shared by all template generators."""
+
+    # (lang, age bucket or None for the static banks, tier) -> words
+    words: Dict[Tuple[str, str | None, str], Tuple[str, ...]]
+    # lang -> rhyme pairs; lang -> word -> every word it rhymes with
+    rhyme_pairs: Dict[str, Tuple[Tuple[str, str], ...]]
+    rhymes_by_word: Dict[str, Dict[str, Tuple[str, ...]]]
+    # (lang, difficulty) -> the pair prefix a generator may draw from
+    rhyme_subsets: Dict[Tuple[str, int], Tuple[Tuple[str, str], ...]]
+    # (lang, difficulty) -> per pair of the subset, the other pairs' answers
+    # that don't also rhyme with the pair's prompt word
+    rhyme_distractors: Dict[Tuple[str, int], Tuple[Tuple[str, ...], ...]]
+    # (lang, pair index) -> simple/medium words that don't rhyme with the pair
+    non_rhymes: Dict[Tuple[str, int], Tuple[str, ...]]
+    # (lang, max syllables or None) -> words of SYLLABLE_MAP
+    syllable_buckets: Dict[Tuple[str, int | None], Tuple[str, ...]]
+    # lang -> (word, meaning) entries, and per entry the other meanings
+    meanings: Dict[str, Tuple[Tuple[str, str], ...]]
+    meaning_distractors: Dict[str, Tuple[Tuple[str, ...], ...]]
+    # (lang, difficulty) -> sight words unlocked at that difficulty
+    sight_words: Dict[Tuple[str, int], Tuple[str, ...]]
+    # (lang, difficulty) -> phrase-flash phrases (level phrases + image phrases)
+    phrases: Dict[Tuple[str, int], Tuple[str, ...]]
+    # lang -> image phrase -> matched EXERCISE_IMAGES id
+    phrase_images: Dict[str, Dict[str, str]]
+    # lang -> prosody tones; tone -> the other tones
+    prosody_distractors: Dict[str, Dict[str, Tuple[str, ...]]]
+    # lang -> per main-idea passage, the other main ideas
+    main_idea_distractors: Dict[str, Tuple[Tuple[str, ...], ...]]
+    # ALPHABETS key -> letters; (key, letter) -> every other letter
+    alphabets: Dict[str, Tuple[str, ...]]
+    letters_except: Dict[Tuple[str, str], Tuple[str, ...]]
+    # lang -> EXERCISE_IMAGES cards with the localized "label" applied
+    images: Dict[str, Tuple[Dict[str, Any], ...]]
+    image_labels: Dict[str, Tuple[str, ...]]
+    image_labels_lower: Dict[str, Tuple[str, ...]]
+    image_by_id: Dict[str, int]
+    # image index -> every other image index
+    image_others: Tuple[Tuple[int, ...], ...]
+
+
+def _build_content_index() -> ContentIndex:
+    static_banks = {
+        "en": (SIMPLE_WORDS, MEDIUM_WORDS, HARD_WORDS, ADVANCED_WORDS),
+        "el": (SIMPLE_WORDS_EL, MEDIUM_WORDS_EL, HARD_WORDS_EL, ADVANCED_WORDS_EL),
+    }
+    words: Dict[Tuple[str, str | None, str], Tuple[str, ...]] = {}
+    for lang, banks in static_banks.items():
+        for tier, bank in zip(_TIERS, banks):
+            words[(lang, None, tier)] = tuple(bank)
+    if isinstance(WORD_BANKS_BY_AGE, dict):
+        for lang, lang_banks in WORD_BANKS_BY_AGE.items():
+            if not isinstance(lang_banks, dict):
+                continue
+            for bucket, bucket_banks in lang_banks.items():
+                if not isinstance(bucket_banks, dict):
+                    continue
+                for tier, bank in bucket_banks.items():
+                    if isinstance(bank, list) and bank:
+                        words[(lang, bucket, tier)] = tuple(bank)
+
+    rhyme_pairs = {
+        "en": tuple((p[0], p[1]) for p in RHYME_PAIRS),
+        "el": tuple((p[0], p[1]) for p in RHYME_PAIRS_EL),
+    }
+    rhymes_by_word: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+    rhyme_subsets: Dict[Tuple[str, int], Tuple[Tuple[str, str], ...]] = {}
+    rhyme_distractors: Dict[Tuple[str, int], Tuple[Tuple[str, ...], ...]] = {}
+    non_rhymes: Dict[Tuple[str, int], Tuple[str, ...]] = {}
+    for lang, pairs in rhyme_pairs.items():
+        partners: Dict[str, List[str]] = {}
+        for a, b in pairs:
+            partners.setdefault(a, []).append(b)
+            partners.setdefault(b, []).append(a)
+        rhymes_by_word[lang] = {w: tuple(ws) for w, ws in partners.items()}
+        for difficulty in _DIFFICULTIES:
+            subset = pairs[:min(len(pairs), 5 + difficulty * 2)]
+            rhyme_subsets[(lang, difficulty)] = subset
+            rhyme_distractors[(lang, difficulty)] = tuple(
+                tuple(p[1] for p in subset if p != pair and p[1] not in rhymes_by_word[lang][pair[0]])
+                for pair in subset
+            )
+        simple, medium = static_banks[lang][0], static_banks[lang][1]
+        candidates = tuple(simple) + tuple(medium)
+        by_ending: Dict[str, Tuple[str, ...]] = {}
+        for idx, (a, b) in enumerate(pairs):
+            ending = b[-2:]
+            if ending not in by_ending:
+                by_ending[ending] = tuple(w for w in candidates if w[-2:] != ending)
+            pool = by_ending[ending]
+            non_rhymes[(lang, idx)] = tuple(w for w in pool if w != a) if a in pool else pool
+
+    syllable_buckets: Dict[Tuple[str, int | None], Tuple[str, ...]] = {}
+    for lang, syllables in SYLLABLE_MAP.items():
+        syllable_buckets[(lang, None)] = tuple(syllables)
+        for max_syllables in (2, 3):
+            syllable_buckets[(lang, max_syllables)] = tuple(
+                w for w, n in syllables.items() if n <= max_syllables
+            )
+
+    meanings = {lang: tuple(m.items()) for lang, m in FLASH_CARD_MEANINGS.items()}
+    meaning_distractors = {
+        lang: tuple(tuple(v for k, v in entries if k != word) for word, _ in entries)
+        for lang, entries in meanings.items()
+    }
+
+    sight_sources = {"en": SIGHT_WORDS, "el": SIGHT_WORDS_EL}
+    sight_words = {
+        (lang, d): tuple(src[:min(len(src), 10 + d * 3)])
+        for lang, src in sight_sources.items() for d in _DIFFICULTIES
+    }
+
+    phrase_sources = {"en": PHRASES_BY_LEVEL, "el": PHRASES_BY_LEVEL_EL}
+    phrases: Dict[Tuple[str, int], Tuple[str, ...]] = {}
+    for lang, source in phrase_sources.items():
+        for difficulty in _DIFFICULTIES:
+            level = max(min(difficulty, max(source.keys())), min(source.keys()))
+            level_phrases = source.get(level, source[1])
+            phrases[(lang, difficulty)] = tuple(level_phrases) + tuple(IMAGE_PHRASES[lang])
+
+    phrase_images: Dict[str, Dict[str, str]] = {}
+    for lang, image_phrases in IMAGE_PHRASES.items():
+        matches = {}
+        for phrase in image_phrases:
+            matched_id = next(
+                (img_id for word, img_id in IMAGE_PHRASE_WORDS[lang].items() if word in phrase),
+                "cat",
+            )
+            matches[phrase] = matched_id
+        phrase_images[lang] = matches
+
+    prosody_distractors = {}
+    for lang, sentences in PROSODY_SENTENCES.items():
+        tones = list(dict.fromkeys(t for _, t in sentences))
+        prosody_distractors[lang] = {t: tuple(o for o in tones if o != t) for t in tones}
+
+    main_idea_distractors = {
+        lang: tuple(tuple(mi for _, mi in passages if mi != main_idea) for _, main_idea in passages)
+        for lang, passages in MAIN_IDEA_PASSAGES.items()
+    }
+
+    alphabets = {key: tuple(letters) for key, letters in ALPHABETS.items()}
+    letters_except = {
+        (key, letter): tuple(c for c in letters if c != letter)
+        for key, letters in alphabets.items() for letter in letters
+    }
+
+    images = {
+        lang: tuple({**img, "label": _get_img_label(img, lang)} for img in EXERCISE_IMAGES)
+        for lang in _LANGS
+    }
+    image_labels = {lang: tuple(img["label"] for img in cards) for lang, cards in images.items()}
+    image_labels_lower = {lang: tuple(label.lower() for label in labels) for lang, labels in image_labels.items()}
+    image_by_id = {img["id"]: i for i, img in enumerate(EXERCISE_IMAGES)}
+    image_others = tuple(
+        tuple(j for j in range(len(EXERCISE_IMAGES)) if j != i) for i in range(len(EXERCISE_IMAGES))
+    )
+
+    return ContentIndex(
+        words=words,
+        rhyme_pairs=rhyme_pairs,
+        rhymes_by_word=rhymes_by_word,
+        rhyme_subsets=rhyme_subsets,
+        rhyme_distractors=rhyme_distractors,
+        non_rhymes=non_rhymes,
+        syllable_buckets=syllable_buckets,
+        meanings=meanings,
+        meaning_distractors=meaning_distractors,
+        sight_words=sight_words,
+        phrases=phrases,
+        phrase_images=phrase_images,
+        prosody_distractors=prosody_distractors,
+        main_idea_distractors=main_idea_distractors,
+        alphabets=alphabets,
+        letters_except=letters_except,
+        images=images,
+        image_labels=image_labels,
+        image_labels_lower=image_labels_lower,
+        image_by_id=image_by_id,
+        image_others=image_others,
+    )
+
+
+_INDEX = _build_content_index()
+
+
+def _register_novelty_pools() -> None:
+    """Give every indexed pool its content ids up front, so picks only do bit tests."""
+    word_space, rhyme_space = space("word"), space("rhyme")
+    phrase_space, image_space = space("phrase"), space("image")
+    for bank in _INDEX.words.values():
+        word_space.pool_ids(bank)
+    for bank in _INDEX.sight_words.values():
+        word_space.pool_ids(bank)
+    for bank in (PSEUDO_WORDS, PSEUDO_WORDS_EL):
+        word_space.pool_ids(bank)
+    for entries in _INDEX.meanings.values():
+        word_space.pool_ids(entries, _entry_word)
+    for pairs in _INDEX.rhyme_subsets.values():
+        rhyme_space.pool_ids(pairs, _rhyme_key)
+    for phrases in _INDEX.phrases.values():
+        phrase_space.pool_ids(phrases)
+    for phrases in IMAGE_PHRASES.values():
+        phrase_space.pool_ids(phrases)
+    for cards in _INDEX.images.values():
+        image_space.pool_ids(cards, _image_id)
+
+
+_register_novelty_pools()
+
+
+def _lang_key(lang: str) -> str:
+    """Index key for a language — anything that isn't Greek uses the English tables."""
+    return "el" if lang == "el" else "en"
+
+
+def _clamp_difficulty(difficulty: int) -> int:
+    return max(1, min(10, difficulty))
 
 
 async def generate_exercise_items(
@@ -423,6 +860,8 @@ async def generate_exercise_items(
     lang: str = "en",
     student_age: int | None = None,
     student_id: str | None = None,
+    dyslexia_profile: Dict[str, Any] | None = None,
+    seed: int | None = None,
 ) -> List[ExerciseItem]:
     """
     Generate exercise items — tries AI first, falls back to templates.
@@ -432,122 +871,82 @@ async def generate_exercise_items(
       Heavy (qwen3-vl:8b): stories, comprehension, inference, vocabulary, prosody
       Light (qwen3-vl:4b): word banks, rhymes, hints, syllables, phrases
 
-    Template generators are always available as fallback.
+    Template generators are always available as fallback. How each game is
+    generated is described by its GeneratorSpec in GENERATORS.
     """
-    _STUDENT_AGE_CTX.set(student_age)
-    _STUDENT_ID_CTX.set(student_id)
-
-    # Mapping of game_id -> (AI generator, template fallback)
-    # AI generators return None when LLM is unavailable
-    ai_generators = {
-        # Heavy model games (story / comprehension / inference)
-        "story_recall": _gen_story_recall_ai,
-        "question_quest": _gen_question_quest_ai,
-        "repeated_reader": _gen_repeated_reader_ai,
-        "main_idea_hunter": _gen_main_idea_hunter_ai,
-        "inference_detective": _gen_inference_detective_ai,
-        "vocabulary_builder": _gen_vocabulary_builder_ai,
-        "story_sequencer": _gen_story_sequencer_ai,
-        "prosody_practice": _gen_prosody_practice_ai,
-        # Light model games (words / sounds / phrases)
-        "sound_safari": _gen_sound_safari_ai,
-        "rhyme_time_race": _gen_rhyme_time_ai,
-        "syllable_stomper": _gen_syllable_stomper_ai,
-        "phoneme_blender": _gen_phoneme_blender_ai,
-        "sound_swap": _gen_sound_swap_ai,
-        "flash_card_frenzy": _gen_flash_card_ai,
-        "phrase_flash": _gen_phrase_flash_ai,
-        "word_ladder": _gen_word_ladder_ai,
-    }
-
-    template_generators = {
-        "sound_safari": _gen_sound_safari,
-        "rhyme_time_race": _gen_rhyme_time,
-        "syllable_stomper": _gen_syllable_stomper,
-        "phoneme_blender": _gen_phoneme_blender,
-        "sound_swap": _gen_sound_swap,
-        "sound_matching": _gen_sound_matching,
-        "word_sound_match": _gen_word_sound_match,
-        "speed_namer": _gen_speed_namer,
-        "flash_card_frenzy": _gen_flash_card,
-        "object_blitz": _gen_object_blitz,
-        "letter_stream": _gen_letter_stream,
-        "ran_grid": _gen_rapid_naming,
-        "memory_matrix": _gen_memory_matrix,
-        "sequence_keeper": _gen_sequence_keeper,
-        "backward_spell": _gen_backward_spell,
-        "story_recall": _gen_story_recall,
-        "dual_task_challenge": _gen_dual_task,
-        "memory_recall": _gen_memory_recall,
-        "letter_detective": _gen_letter_detective,
-        "tracking_trail": _gen_tracking_trail,
-        "pattern_matcher": _gen_pattern_matcher,
-        "mirror_image": _gen_mirror_image,
-        "visual_closure": _gen_visual_closure,
-        "phrase_flash": _gen_phrase_flash,
-        "word_ladder": _gen_word_ladder,
-        "repeated_reader": _gen_repeated_reader,
-        "sight_word_sprint": _gen_sight_word_sprint,
-        "prosody_practice": _gen_prosody_practice,
-        "decoding_read_aloud": _gen_read_aloud,
-        "question_quest": _gen_question_quest,
-        "main_idea_hunter": _gen_main_idea_hunter,
-        "inference_detective": _gen_inference_detective,
-        "vocabulary_builder": _gen_vocabulary_builder,
-        "story_sequencer": _gen_story_sequencer,
-        "word_image_match": _gen_word_image_match,
-        "castle_challenge": _gen_castle_challenge,
-    }
-
-    import asyncio as _aio
-    import inspect as _inspect
+    ctx = GenerationContext(
+        lang=lang,
+        student_id=student_id,
+        student_age=student_age,
+        interests=list(student_interests or []),
+        dyslexia_profile=dict(dyslexia_profile or {}),
+        seed=seed,
+    )
+    return await generate_for_context(ctx, game_id, difficulty_level, item_count)
+
+
+async def generate_for_context(
+    ctx: GenerationContext, game_id: str, difficulty_level: int, item_count: int,
+) -> List[ExerciseItem]:
+    """generate_exercise_items for a prepared context; safe to run concurrently for many students."""
+    spec = GENERATORS.get(game_id, _DEFAULT_SPEC)
+    with span("generator", spec.game_id):
+        return await _generate(spec, ctx, game_id, difficulty_level, item_count)
 
-    async def _call_gen(fn, diff, cnt, lng):
-        result = fn(diff, cnt, lang=lng)
-        if _inspect.isawaitable(result):
-            return await result
-        return result
 
-    # For Greek, skip AI generators (they produce English) and go straight to templates
-    if lang != "el" and game_id in ai_generators:
+async def _generate(
+    spec: "GeneratorSpec", ctx: GenerationContext, game_id: str, difficulty_level: int, item_count: int,
+) -> List[ExerciseItem]:
+    # AI generators produce English only; Greek goes straight to templates
+    if spec.ai is not None and _lang_key(ctx.lang) in spec.ai_languages:
         try:
-            items = await ai_generators[game_id](difficulty_level, item_count)
+            items = await spec.ai(difficulty_level, item_count, ctx)
             if items and len(items) >= item_count:
                 logger.info("AI generated %d items for %s", len(items), game_id)
                 return items[:item_count]
             elif items:
                 logger.info("AI partial: %d/%d for %s, padding with templates",
                            len(items), item_count, game_id)
-                remaining = item_count - len(items)
-                template_gen = template_generators.get(game_id, _gen_default)
-                template_items = await _call_gen(template_gen, difficulty_level, remaining, lang)
+                template_items = await _template_items(spec, difficulty_level, item_count - len(items), ctx)
                 for j, ti in enumerate(template_items):
                     ti.index = len(items) + j
                 return items + template_items
         except Exception as exc:
             logger.warning("AI generation failed for %s: %s", game_id, exc)
 
-    generator = template_generators.get(game_id, _gen_default)
-    return await _call_gen(generator, difficulty_level, item_count, lang)
+    return await _template_items(spec, difficulty_level, item_count, ctx)
+
+
+async def _template_items(
+    spec: "GeneratorSpec", difficulty: int, count: int, ctx: GenerationContext,
+) -> List[ExerciseItem]:
+    if ctx.student_id and spec.content_types:
+        # One DB read per student and worker; after that picks are in-memory.
+        await ctx.novelty.warm(ctx.student_id, spec.content_types)
+    if spec.is_async:
+        return await spec.template(difficulty, count, ctx)
+    return spec.template(difficulty, count, ctx)
 
 
 # =============================================================================
 # MULTIPLE CHOICE GENERATORS
 # =============================================================================
 
-def _gen_sound_safari(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_sound_safari(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Multiple choice: identify which word has a sound in a position."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    words = get_word_bank(difficulty, lang)
+    words = get_word_bank(difficulty, lang, ctx.student_age)
     if lang == "el":
         positions_labels = {"beginning": "αρχή", "ending": "τέλος", "middle": "μέση"}
         positions = ["beginning", "ending"] if difficulty <= 3 else ["beginning", "middle", "ending"]
     else:
         positions_labels = {"beginning": "beginning", "ending": "ending", "middle": "middle"}
         positions = ["beginning", "ending"] if difficulty <= 3 else ["beginning", "middle", "ending"]
+    pick = ctx.picker("word", words)
     for i in range(count):
-        word = random.choice(words)
-        position = random.choice(positions)
+        word = words[pick()]
+        position = rng.choice(positions)
         if position == "beginning":
             target_sound = word[0]
         elif position == "ending":
@@ -555,9 +954,9 @@ def _gen_sound_safari(difficulty: int, count: int, lang: str = "en") -> List[Exe
         else:
             target_sound = word[len(word) // 2] if len(word) > 2 else word[0]
 
-        distractors = random.sample([w for w in words if w != word], min(3, len(words) - 1))
+        distractors = _sample_excluding(words, word, 3, rng)
         options = [word] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         pos_label = positions_labels[position]
         q = f"Ποια λέξη έχει τον ήχο '{target_sound}' στην {pos_label};" if lang == "el" else f"Which word has the sound '{target_sound}' at the {position}?"
         h = f"Ο ήχος '{target_sound}' είναι στην {pos_label} της λέξης." if lang == "el" else f"The sound '{target_sound}' is at the {position} of the word."
@@ -572,34 +971,19 @@ def _gen_sound_safari(difficulty: int, count: int, lang: str = "en") -> List[Exe
     return items
 
 
-def _gen_prosody_practice(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_prosody_practice(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Multiple choice: identify the correct reading tone."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    if lang == "el":
-        sentences = [
-            ("Δεν μπορώ να το πιστέψω!", "ενθουσιασμός"), ("Πού πηγαίνεις;", "ερώτηση"),
-            ("Κάτσε ήσυχα, σε παρακαλώ.", "ηρεμία"), ("Πρόσεχε το αυτοκίνητο!", "επείγον"),
-            ("Μια φορά κι έναν καιρό, ζούσε ένας βασιλιάς.", "αφήγηση"),
-            ("Χρόνια πολλά!", "εορταστικό"),
-            ("Κερδίσαμε το πρωτάθλημα!", "ενθουσιασμός"),
-            ("Μπορείς να με βοηθήσεις;", "ευγένεια"),
-            ("Σταμάτα! Μην κουνιέσαι!", "εντολή"),
-        ]
-    else:
-        sentences = [
-            ("I can't believe it!", "excited"), ("Where are you going?", "questioning"),
-            ("Please sit down quietly.", "calm"), ("Watch out for that car!", "urgent"),
-            ("Once upon a time, there lived a king.", "storytelling"),
-            ("Happy birthday to you!", "celebratory"),
-            ("We won the championship!", "excited"),
-            ("Could you please help me?", "polite"),
-            ("Stop right there! Don't move!", "commanding"),
-        ]
+    key = _lang_key(lang)
+    sentences = PROSODY_SENTENCES[key]
+    tone_distractors = _INDEX.prosody_distractors[key]
     for i in range(count):
-        sentence, tone = random.choice(sentences)
-        distractors = list(set(t for _, t in sentences if t != tone))[:3]
+        sentence, tone = rng.choice(sentences)
+        others = tone_distractors[tone]
+        distractors = rng.sample(others, min(3, len(others)))
         options = [tone] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"What tone should you use to read: '{sentence}'",
@@ -611,47 +995,26 @@ def _gen_prosody_practice(difficulty: int, count: int, lang: str = "en") -> List
     return items
 
 
-def _gen_question_quest(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+async def _gen_question_quest(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Multiple choice: reading comprehension questions."""
-    return _gen_story_recall_mc(difficulty, count)
+    return await _gen_story_recall_mc(difficulty, count, ctx)
 
 
-def _gen_main_idea_hunter(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_main_idea_hunter(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Multiple choice: identify the main idea of a passage."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    if lang == "el":
-        passages = [
-            ("Οι σκύλοι είναι υπέροχα κατοικίδια. Είναι πιστοί, φιλικοί και τους αρέσει να παίζουν. Πολλές οικογένειες χαίρονται που έχουν σκύλο.",
-             "Οι σκύλοι είναι υπέροχα κατοικίδια"),
-            ("Ο ωκεανός φιλοξενεί πολλά πλάσματα. Ψάρια, φάλαινες και δελφίνια ζουν στη θάλασσα. Τα κοραλλιογενή υφάλους προσφέρουν καταφύγιο.",
-             "Ο ωκεανός έχει ποικίλη θαλάσσια ζωή"),
-            ("Η άσκηση είναι σημαντική για την υγεία. Το τρέξιμο, η κολύμβηση και η ποδηλασία βοηθούν το σώμα. Ακόμα και ένας μικρός περίπατος κάνει τη διαφορά.",
-             "Η άσκηση σε κρατάει υγιή"),
-            ("Τα δέντρα μας δίνουν οξυγόνο και σκιά. Τα πουλιά χτίζουν φωλιές στα κλαδιά τους. Μερικά δέντρα ζουν χιλιάδες χρόνια.",
-             "Τα δέντρα είναι σημαντικά"),
-            ("Η μουσική αλλάζει τη διάθεσή μας. Ένα χαρούμενο τραγούδι μας κάνει να χαμογελάμε. Οι επιστήμονες λένε ότι η μουσική κάνει καλό στον εγκέφαλο.",
-             "Η μουσική επηρεάζει τη διάθεση"),
-        ]
-    else:
-        passages = [
-            ("Dogs make wonderful pets. They are loyal, friendly, and love to play. Many families enjoy having a dog.",
-             "Dogs make great pets"),
-            ("The ocean is home to many creatures. Fish, whales, and dolphins all live in the sea. Coral reefs provide shelter for thousands of species.",
-             "The ocean has diverse marine life"),
-            ("Exercise is important for health. Running, swimming, and biking help keep your body strong. Even a short walk each day can make a difference.",
-             "Exercise keeps you healthy"),
-            ("Trees provide us with oxygen and shade. Birds build nests in their branches. Some trees live for thousands of years, standing tall through storms and seasons.",
-             "Trees are important and resilient"),
-            ("Music can change the way we feel. A happy song can make us smile, and a slow melody can help us relax. Scientists say listening to music is good for our brains.",
-             "Music affects our mood and health"),
-        ]
+    key = _lang_key(lang)
+    passages = MAIN_IDEA_PASSAGES[key]
+    idea_distractors = _INDEX.main_idea_distractors[key]
     for i in range(count):
-        text, main_idea = random.choice(passages)
-        distractors = [mi for _, mi in passages if mi != main_idea][:3]
+        p_idx = rng.randrange(len(passages))
+        text, main_idea = passages[p_idx]
+        distractors = list(idea_distractors[p_idx][:3])
         if len(distractors) < 3:
             distractors.extend(["The weather is changing", "Food is delicious", "School is fun"][:3 - len(distractors)])
         options = [main_idea] + distractors[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Read: '{text}'\n\nWhat is the main idea?",
@@ -662,8 +1025,9 @@ def _gen_main_idea_hunter(difficulty: int, count: int, lang: str = "en") -> List
     return items
 
 
-def _gen_inference_detective(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_inference_detective(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Multiple choice: make inferences from text clues."""
+    rng = ctx.rng
     items = []
     scenarios = [
         ("Sarah put on her boots, grabbed her umbrella, and looked at the dark clouds.",
@@ -683,8 +1047,8 @@ def _gen_inference_detective(difficulty: int, count: int, lang: str = "en") -> L
          ["Sunlight", "Rain or water", "Fertilizer", "Seeds"]),
     ]
     for i in range(count):
-        text, question, answer, options = random.choice(scenarios)
-        random.shuffle(options)
+        text, question, answer, options = rng.choice(scenarios)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Read: '{text}'\n\n{question}",
@@ -695,12 +1059,13 @@ def _gen_inference_detective(difficulty: int, count: int, lang: str = "en") -> L
     return items
 
 
-async def _gen_story_recall_mc(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+async def _gen_story_recall_mc(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Multiple choice: standard story comprehension (passage always visible)."""
-    level = _age_adjusted_passage_level(difficulty)
+    lang = ctx.lang
+    level = _age_adjusted_passage_level(difficulty, ctx.student_age)
     story_src = STORY_PASSAGES_EL if lang == "el" else STORY_PASSAGES
     passages = story_src.get(level, story_src["easy"])
-    passage = await _pick_passage(passages)
+    passage = await _pick_passage(passages, ctx)
     items = []
     for i, q in enumerate(passage["questions"][:count]):
         items.append(ExerciseItem(
@@ -717,22 +1082,25 @@ async def _gen_story_recall_mc(difficulty: int, count: int, lang: str = "en") ->
 # SPEED ROUND GENERATORS
 # =============================================================================
 
-def _gen_rhyme_time(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_rhyme_time(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Speed round: match rhyming words against a timer."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    pairs_source = RHYME_PAIRS_EL if lang == "el" else RHYME_PAIRS
-    pairs = pairs_source[: min(len(pairs_source), 5 + difficulty * 2)]
+    key = (_lang_key(lang), _clamp_difficulty(difficulty))
+    pairs = _INDEX.rhyme_subsets[key]
+    pair_distractors = _INDEX.rhyme_distractors[key]
+    words = get_word_bank(difficulty, lang, ctx.student_age)
     time_limit = max(3, 10 - difficulty)
+    pick = ctx.picker("rhyme", pairs, _rhyme_key)
     for i in range(count):
-        pair = random.choice(pairs)
-        word = pair[0]
-        correct = pair[1]
-        distractors = random.sample(
-            [p[1] for p in pairs if p != pair] + random.sample(get_word_bank(difficulty, lang), 2),
+        p_idx = pick()
+        word, correct = pairs[p_idx]
+        distractors = rng.sample(
+            pair_distractors[p_idx] + tuple(rng.sample(words, 2)),
             min(3, len(pairs)),
         )
         options = [correct] + distractors[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         q = f"{_t('which_rhymes', lang)} '{word}';"  if lang == "el" else f"Which word rhymes with '{word}'?"
         h = _t("rhyme_hint", lang)
         items.append(ExerciseItem(
@@ -750,29 +1118,19 @@ def _gen_rhyme_time(difficulty: int, count: int, lang: str = "en") -> List[Exerc
     return items
 
 
-def _gen_speed_namer(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_speed_namer(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Speed round: rapidly identify items with countdown timer."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    if lang == "el":
-        sequences = {
-            "letters": list("ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩ"),
-            "numbers": [str(n) for n in range(1, 21)],
-            "colors": ["κόκκινο", "μπλε", "πράσινο", "κίτρινο", "πορτοκαλί", "μωβ", "ροζ", "καφέ"],
-        }
-    else:
-        sequences = {
-            "letters": list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
-            "numbers": [str(n) for n in range(1, 21)],
-            "colors": ["red", "blue", "green", "yellow", "orange", "purple", "pink", "brown"],
-        }
+    sequences = SPEED_NAMER_SEQUENCES[_lang_key(lang)]
     time_limit = max(2, 8 - difficulty)
-    seq_type = random.choice(list(sequences.keys()))
+    seq_type = rng.choice(list(sequences.keys()))
     pool = sequences[seq_type]
     for i in range(count):
-        target = random.choice(pool)
-        distractors = random.sample([x for x in pool if x != target], min(3, len(pool) - 1))
+        target = rng.choice(pool)
+        distractors = _sample_excluding(pool, target, 3, rng)
         options = [target] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Quickly identify: {target}",
@@ -788,38 +1146,21 @@ def _gen_speed_namer(difficulty: int, count: int, lang: str = "en") -> List[Exer
     return items
 
 
-def _gen_flash_card(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_flash_card(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Speed round: rapid word recognition with decreasing time."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    words = get_word_bank(difficulty, lang)
-    if lang == "el":
-        meanings = {
-            "γάτα": "ένα μικρό τριχωτό κατοικίδιο", "σκύλος": "ένα πιστό κατοικίδιο",
-            "ήλιος": "ένα αστέρι που μας δίνει φως", "δέντρο": "ένα ψηλό φυτό με κλαδιά",
-            "ψάρι": "ένα ζώο που ζει στο νερό", "αστέρι": "ένα λαμπρό φως στον ουρανό",
-            "φεγγάρι": "λάμπει τη νύχτα στον ουρανό", "βροχή": "νερό που πέφτει από τα σύννεφα",
-            "πουλί": "ένα ζώο με φτερά", "κάστρο": "ένα μεγάλο κτήριο με πύργους",
-            "δράκος": "ένα μυθικό πλάσμα που βγάζει φωτιά", "δάσος": "μια περιοχή με πολλά δέντρα",
-            "νησί": "γη που περιβάλλεται από νερό", "πίθηκος": "ένα έξυπνο πρωτεύον",
-            "κουνέλι": "ένα τριχωτό ζώο με μακριά αυτιά",
-        }
-    else:
-        meanings = {
-            "cat": "a small furry pet", "dog": "a loyal pet animal", "sun": "a star that gives us light",
-            "tree": "a tall plant with branches", "fish": "an animal that lives in water",
-            "star": "a bright light in the sky", "moon": "shines at night in the sky",
-            "rain": "water falling from clouds", "bird": "an animal with wings",
-            "castle": "a large building with towers", "dragon": "a mythical fire-breathing creature",
-            "forest": "an area with many trees", "island": "land surrounded by water",
-            "monkey": "a clever primate", "rabbit": "a furry animal with long ears",
-        }
+    key = _lang_key(lang)
+    meanings = _INDEX.meanings[key]
+    meaning_distractors = _INDEX.meaning_distractors[key]
     base_time = max(3, 10 - difficulty)
+    pick = ctx.picker("word", meanings, _entry_word)
     for i in range(count):
-        word = random.choice(list(meanings.keys()))
-        correct = meanings[word]
-        distractors = random.sample([v for k, v in meanings.items() if k != word], min(3, len(meanings) - 2))
+        m_idx = pick()
+        word, correct = meanings[m_idx]
+        distractors = rng.sample(meaning_distractors[m_idx], min(3, len(meanings) - 2))
         options = [correct] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         time_limit = max(2, base_time - (i // 3))
         q = f"Τι σημαίνει '{word}';" if lang == "el" else f"What does '{word}' mean?"
         items.append(ExerciseItem(
@@ -837,20 +1178,22 @@ def _gen_flash_card(difficulty: int, count: int, lang: str = "en") -> List[Exerc
     return items
 
 
-def _gen_object_blitz(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_object_blitz(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Speed round: name objects quickly using images."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    pool = EXERCISE_IMAGES.copy()
+    key = _lang_key(lang)
+    cards = _INDEX.images[key]
+    labels = _INDEX.image_labels_lower[key]
     time_limit = max(2, 7 - difficulty)
+    pick = ctx.picker("image", cards, _image_id)
     for i in range(count):
-        correct_img = random.choice(pool)
-        label = _get_img_label(correct_img, lang).lower()
-        distractors = random.sample(
-            [_get_img_label(img, lang).lower() for img in pool if img["id"] != correct_img["id"]],
-            min(3, len(pool) - 1),
-        )
+        img_idx = pick()
+        correct_img = cards[img_idx]
+        label = labels[img_idx]
+        distractors = [labels[j] for j in rng.sample(_INDEX.image_others[img_idx], min(3, len(cards) - 1))]
         options = [label] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=_t("what_is_this", lang),
@@ -860,30 +1203,32 @@ def _gen_object_blitz(difficulty: int, count: int, lang: str = "en") -> List[Exe
             extra_data={
                 "time_limit_seconds": time_limit,
                 "display_image": correct_img["url"],
-                "display_image_label": _get_img_label(correct_img, lang),
+                "display_image_label": correct_img["label"],
             },
         ))
     return items
 
 
-def _gen_sight_word_sprint(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_sight_word_sprint(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Speed round: rapid sight word identification."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    word_source = SIGHT_WORDS_EL if lang == "el" else SIGHT_WORDS
-    words = word_source[:min(len(word_source), 10 + difficulty * 3)]
-    alphabet = "αβγδεζηθικλμνξοπρστυφχψω" if lang == "el" else "abcdefghijklmnopqrstuvwxyz"
+    key = _lang_key(lang)
+    words = _INDEX.sight_words[(key, _clamp_difficulty(difficulty))]
+    alphabet = _INDEX.alphabets[key]
     time_limit = max(2, 6 - difficulty // 2)
+    pick = ctx.picker("word", words)
     for i in range(count):
-        word = random.choice(words)
+        word = words[pick()]
         distractors = []
         for _ in range(3):
             chars = list(word)
             if len(chars) > 1:
-                idx = random.randint(0, len(chars) - 1)
-                chars[idx] = random.choice(alphabet)
+                idx = rng.randint(0, len(chars) - 1)
+                chars[idx] = rng.choice(alphabet)
             distractors.append("".join(chars))
         options = [word] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=_t("correct_spelling", lang),
@@ -902,15 +1247,16 @@ def _gen_sight_word_sprint(difficulty: int, count: int, lang: str = "en") -> Lis
 # GRID MEMORY GENERATOR
 # =============================================================================
 
-def _gen_memory_matrix(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_memory_matrix(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Grid memory: show pattern on grid, player recreates from memory."""
+    rng = ctx.rng
     items = []
     grid_size = min(3 + difficulty // 3, 6)
     show_duration = max(1.5, 5 - difficulty * 0.3)  # seconds to study pattern
     for i in range(count):
         cells_to_remember = min(2 + difficulty // 2, grid_size * grid_size // 2)
         total_cells = grid_size * grid_size
-        pattern = sorted(random.sample(range(total_cells), cells_to_remember))
+        pattern = sorted(rng.sample(range(total_cells), cells_to_remember))
         pattern_str = ",".join(str(p) for p in pattern)
         items.append(ExerciseItem(
             index=i,
@@ -933,33 +1279,21 @@ def _gen_memory_matrix(difficulty: int, count: int, lang: str = "en") -> List[Ex
 # SEQUENCE TAP GENERATORS
 # =============================================================================
 
-def _gen_syllable_stomper(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_syllable_stomper(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Sequence tap: tap the correct number of beats for syllables."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    if lang == "el":
-        syllable_map = {
-            "γάτα": 2, "σκύλος": 2, "ήλιος": 3, "σπίτι": 2, "ψάρι": 2,
-            "μήλο": 2, "δέντρο": 2, "νερό": 2, "παιδί": 2, "βιβλίο": 3,
-            "ελέφαντας": 4, "πεταλούδα": 4, "περιπέτεια": 5, "σοκολάτα": 4,
-            "μπανάνα": 3, "καμηλοπάρδαλη": 6, "καρπούζι": 3, "υπολογιστής": 5,
-            "εγκυκλοπαίδεια": 7, "φαντασία": 4,
-        }
-    else:
-        syllable_map = {
-            "cat": 1, "dog": 1, "sun": 1, "hat": 1, "bed": 1,
-            "tiger": 2, "monkey": 2, "basket": 2, "garden": 2, "table": 2,
-            "elephant": 3, "beautiful": 3, "adventure": 3, "chocolate": 3, "banana": 3,
-            "caterpillar": 4, "watermelon": 4, "calculator": 4,
-            "encyclopedia": 6, "imagination": 5,
-        }
-    words = list(syllable_map.keys())
+    key = _lang_key(lang)
+    syllable_map = SYLLABLE_MAP[key]
     if difficulty <= 3:
-        words = [w for w in words if syllable_map[w] <= 2]
+        words = _INDEX.syllable_buckets[(key, 2)]
     elif difficulty <= 6:
-        words = [w for w in words if syllable_map[w] <= 3]
+        words = _INDEX.syllable_buckets[(key, 3)]
+    else:
+        words = _INDEX.syllable_buckets[(key, None)]
 
     for i in range(count):
-        word = random.choice(words)
+        word = rng.choice(words)
         correct_count = syllable_map[word]
         max_taps = min(correct_count + 2, 6)
         items.append(ExerciseItem(
@@ -979,13 +1313,14 @@ def _gen_syllable_stomper(difficulty: int, count: int, lang: str = "en") -> List
     return items
 
 
-def _gen_sequence_keeper(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_sequence_keeper(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Sequence tap: remember and repeat a number sequence by tapping."""
+    rng = ctx.rng
     items = []
     seq_length = min(3 + difficulty // 2, 8)
     show_duration = max(2, seq_length * 0.8)  # time to study
     for i in range(count):
-        sequence = [random.randint(1, 9) for _ in range(seq_length)]
+        sequence = [rng.randint(1, 9) for _ in range(seq_length)]
         correct = ",".join(str(s) for s in sequence)
         items.append(ExerciseItem(
             index=i,
@@ -1007,12 +1342,14 @@ def _gen_sequence_keeper(difficulty: int, count: int, lang: str = "en") -> List[
 # TEXT INPUT GENERATOR
 # =============================================================================
 
-def _gen_backward_spell(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_backward_spell(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Text input: spell words backwards."""
+    lang = ctx.lang
     items = []
-    words = get_word_bank(difficulty, lang)
+    words = get_word_bank(difficulty, lang, ctx.student_age)
+    pick = ctx.picker("word", words)
     for i in range(count):
-        word = random.choice(words)
+        word = words[pick()]
         correct = word[::-1]
         items.append(ExerciseItem(
             index=i,
@@ -1033,8 +1370,9 @@ def _gen_backward_spell(difficulty: int, count: int, lang: str = "en") -> List[E
 # SORTING GENERATOR
 # =============================================================================
 
-def _gen_story_sequencer(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_story_sequencer(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Sorting: arrange story events in the correct order by tapping."""
+    rng = ctx.rng
     items = []
     sequences = [
         ["Wake up in the morning", "Eat breakfast", "Go to school", "Come home"],
@@ -1046,15 +1384,15 @@ def _gen_story_sequencer(difficulty: int, count: int, lang: str = "en") -> List[
         ["Hear the alarm", "Get out of bed", "Take a shower", "Get dressed for school"],
     ]
     for i in range(count):
-        correct_seq = random.choice(sequences)
+        correct_seq = rng.choice(sequences)
         num_items = min(len(correct_seq), 3 + difficulty // 3)
         correct_seq = correct_seq[:num_items]
         shuffled = correct_seq.copy()
-        random.shuffle(shuffled)
+        rng.shuffle(shuffled)
         # Make sure it's actually shuffled
         attempts = 0
         while shuffled == correct_seq and attempts < 10:
-            random.shuffle(shuffled)
+            rng.shuffle(shuffled)
             attempts += 1
         correct_answer = "|".join(correct_seq)
         items.append(ExerciseItem(
@@ -1077,8 +1415,9 @@ def _gen_story_sequencer(difficulty: int, count: int, lang: str = "en") -> List[
 # WORD BUILDING GENERATORS
 # =============================================================================
 
-def _gen_phoneme_blender(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_phoneme_blender(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Word building: tap sounds in order to blend them into a word."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
     if lang == "el":
         blends = PHONEME_BLENDS_EL
@@ -1092,14 +1431,14 @@ def _gen_phoneme_blender(difficulty: int, count: int, lang: str = "en") -> List[
             (["/m/", "/oo/", "/n/"], "moon"), (["/r/", "/ai/", "/n/"], "rain"),
         ]
     subset = blends[:min(len(blends), 3 + difficulty)]
+    words = get_word_bank(difficulty, lang, ctx.student_age)
     for i in range(count):
-        sounds, word = random.choice(subset)
+        sounds, word = rng.choice(subset)
         shuffled_sounds = sounds.copy()
-        random.shuffle(shuffled_sounds)
-        words = get_word_bank(difficulty, lang)
-        distractors = random.sample([w for w in words if w != word], min(3, len(words) - 1))
+        rng.shuffle(shuffled_sounds)
+        distractors = _sample_excluding(words, word, 3, rng)
         options = [word] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=_t("blend_sounds", lang),
@@ -1116,8 +1455,9 @@ def _gen_phoneme_blender(difficulty: int, count: int, lang: str = "en") -> List[
     return items
 
 
-def _gen_sound_swap(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_sound_swap(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Word building: swap a sound to make a new word."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
     swaps = [
         ("cat", "c", "b", "bat"), ("cat", "c", "h", "hat"), ("dog", "d", "l", "log"),
@@ -1125,12 +1465,12 @@ def _gen_sound_swap(difficulty: int, count: int, lang: str = "en") -> List[Exerc
         ("fun", "f", "s", "sun"), ("net", "n", "p", "pet"), ("big", "b", "d", "dig"),
         ("cap", "c", "m", "map"), ("hit", "h", "s", "sit"), ("mop", "m", "t", "top"),
     ]
+    words = get_word_bank(difficulty, lang, ctx.student_age)
     for i in range(count):
-        original, old_sound, new_sound, answer = random.choice(swaps)
-        words = get_word_bank(difficulty, lang)
-        distractors = random.sample([w for w in words if w != answer], min(3, len(words) - 1))
+        original, old_sound, new_sound, answer = rng.choice(swaps)
+        distractors = _sample_excluding(words, answer, 3, rng)
         options = [answer] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Change '{old_sound}' to '{new_sound}' in the word below:",
@@ -1150,8 +1490,9 @@ def _gen_sound_swap(difficulty: int, count: int, lang: str = "en") -> List[Exerc
     return items
 
 
-def _gen_word_ladder(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_word_ladder(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Word building: change one letter to build a word chain."""
+    rng = ctx.rng
     items = []
     ladders = [
         ("cat", "bat"), ("bat", "bad"), ("bad", "bed"), ("bed", "red"),
@@ -1160,10 +1501,10 @@ def _gen_word_ladder(difficulty: int, count: int, lang: str = "en") -> List[Exer
         ("top", "tap"), ("tap", "tip"), ("tip", "tin"), ("tin", "bin"),
     ]
     for i in range(count):
-        start, target = random.choice(ladders)
-        distractors = random.sample([w for _, w in ladders if w != target] + ["cap", "tap", "zip"], 3)
+        start, target = rng.choice(ladders)
+        distractors = rng.sample([w for _, w in ladders if w != target] + ["cap", "tap", "zip"], 3)
         options = [target] + distractors[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         # Figure out which letter changed
         change_pos = 0
         for j in range(min(len(start), len(target))):
@@ -1192,12 +1533,13 @@ def _gen_word_ladder(difficulty: int, count: int, lang: str = "en") -> List[Exer
 # TIMED READING GENERATORS
 # =============================================================================
 
-async def _gen_story_recall(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+async def _gen_story_recall(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Timed reading: read passage under time pressure, then answer from memory."""
-    level = _age_adjusted_passage_level(difficulty)
+    lang = ctx.lang
+    level = _age_adjusted_passage_level(difficulty, ctx.student_age)
     story_source = STORY_PASSAGES_EL if lang == "el" else STORY_PASSAGES
     passages = story_source.get(level, story_source["easy"])
-    passage = await _pick_passage(passages)
+    passage = await _pick_passage(passages, ctx)
     text = passage["text"]
     # Reading time based on word count and difficulty
     word_count = len(text.split())
@@ -1220,67 +1562,36 @@ async def _gen_story_recall(difficulty: int, count: int, lang: str = "en") -> Li
     return items
 
 
-def _gen_phrase_flash(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_phrase_flash(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Timed reading: phrase appears briefly, then answer with image-card options."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    phrase_source = PHRASES_BY_LEVEL_EL if lang == "el" else PHRASES_BY_LEVEL
-    level = min(difficulty, max(phrase_source.keys()))
-    level = max(level, min(phrase_source.keys()))
-    phrases = phrase_source.get(level, phrase_source[1])
+    key = _lang_key(lang)
+    all_phrases = _INDEX.phrases[(key, _clamp_difficulty(difficulty))]
+    img_phrases = IMAGE_PHRASES[key]
+    phrase_images = _INDEX.phrase_images[key]
+    cards = _INDEX.images[key]
+    fillers = PHRASE_FILLER_WORDS[key]
     flash_time = max(1, 4 - difficulty * 0.3)
-    pool = EXERCISE_IMAGES.copy()
-
-    image_phrases_en = [
-        "the big cat", "a little dog", "the yellow sun", "a red apple",
-        "my pet fish", "a tall tree", "the old book", "a pretty flower",
-        "the fat duck", "the baby tiger", "a small house", "my grandmother",
-    ]
-    image_phrases_el = [
-        "η μεγάλη γάτα", "ένας μικρός σκύλος", "ο κίτρινος ήλιος", "ένα κόκκινο μήλο",
-        "το ψάρι μου", "ένα ψηλό δέντρο", "το παλιό βιβλίο", "ένα όμορφο λουλούδι",
-        "η χοντρή πάπια", "η μικρή τίγρης", "ένα μικρό σπίτι", "η γιαγιά μου",
-    ]
-    image_word_map_en = {
-        "cat": "cat", "dog": "dog", "sun": "sun", "apple": "apple",
-        "fish": "fish", "tree": "tree", "book": "book", "flower": "flower",
-        "duck": "duck", "tiger": "tiger", "house": "house", "grandmother": "grandmother",
-    }
-    image_word_map_el = {
-        "γάτα": "cat", "σκύλος": "dog", "ήλιος": "sun", "μήλο": "apple",
-        "ψάρι": "fish", "δέντρο": "tree", "βιβλίο": "book", "λουλούδι": "flower",
-        "πάπια": "duck", "τίγρης": "tiger", "σπίτι": "house", "γιαγιά": "grandmother",
-    }
-
-    img_phrases = image_phrases_el if lang == "el" else image_phrases_en
-    word_map = image_word_map_el if lang == "el" else image_word_map_en
-    filler_words_en = ["the", "a", "my", "to", "it", "in", "go", "we", "up", "on"]
-    filler_words_el = ["η", "ο", "ένα", "μια", "στο", "από", "και", "με", "για", "δεν"]
-    fillers = filler_words_el if lang == "el" else filler_words_en
+    pick_image_phrase = ctx.picker("phrase", img_phrases)
+    pick_phrase = ctx.picker("phrase", all_phrases)
 
     for i in range(count):
-        q_type = random.choice(["word_count", "first_word", "last_word", "which_image"])
+        q_type = rng.choice(["word_count", "first_word", "last_word", "which_image"])
 
         if q_type == "which_image":
-            phrase = random.choice(img_phrases)
-            matched_id = None
-            for word_key, img_id in word_map.items():
-                if word_key in phrase:
-                    matched_id = img_id
-                    break
-            if not matched_id:
-                matched_id = "cat"
-
-            correct_img = next((im for im in pool if im["id"] == matched_id), pool[0])
-            distractors = random.sample([im for im in pool if im["id"] != matched_id], 3)
-            image_options = [correct_img] + distractors
-            random.shuffle(image_options)
-            localized_opts = [{**im, "label": _get_img_label(im, lang)} for im in image_options]
+            phrase = img_phrases[pick_image_phrase()]
+            matched_id = phrase_images[phrase]
+            img_idx = _INDEX.image_by_id.get(matched_id, 0)
+            option_idx = [img_idx] + rng.sample(_INDEX.image_others[img_idx], 3)
+            rng.shuffle(option_idx)
+            localized_opts = [dict(cards[j]) for j in option_idx]
 
             q_text = "Ποια εικόνα ήταν στη φράση;" if lang == "el" else "Which image was in the phrase?"
             items.append(ExerciseItem(
                 index=i,
                 question=q_text,
-                options=[im["id"] for im in image_options],
+                options=[im["id"] for im in localized_opts],
                 correct_answer=matched_id,
                 item_type="timed_reading",
                 extra_data={
@@ -1292,8 +1603,7 @@ def _gen_phrase_flash(difficulty: int, count: int, lang: str = "en") -> List[Exe
                 },
             ))
         else:
-            all_phrases = list(phrases) + img_phrases
-            phrase = random.choice(all_phrases)
+            phrase = all_phrases[pick_phrase()]
             words_in_phrase = phrase.split()
             word_count = len(words_in_phrase)
 
@@ -1306,21 +1616,19 @@ def _gen_phrase_flash(difficulty: int, count: int, lang: str = "en") -> List[Exe
             elif q_type == "first_word":
                 q_text = "Ποια ήταν η πρώτη λέξη;" if lang == "el" else "What was the first word?"
                 correct = words_in_phrase[0]
-                word_distractors = random.sample([w for w in fillers if w != correct], min(3, len(fillers) - 1))
+                word_distractors = _sample_excluding(fillers, correct, 3, rng)
                 opts = list(set([correct] + word_distractors))[:4]
                 answer_mode = "word_cards"
             else:
                 q_text = "Ποια ήταν η τελευταία λέξη;" if lang == "el" else "What was the last word?"
                 correct = words_in_phrase[-1]
-                word_distractors = random.sample(
-                    [w for w in get_word_bank(min(difficulty, 2), lang) if w != correct], 3
-                )
+                word_distractors = _sample_excluding(get_word_bank(min(difficulty, 2), lang, ctx.student_age), correct, 3, rng)
                 opts = list(set([correct] + word_distractors))[:4]
                 answer_mode = "word_cards"
 
             if correct not in opts:
                 opts[0] = correct
-            random.shuffle(opts)
+            rng.shuffle(opts)
 
             items.append(ExerciseItem(
                 index=i,
@@ -1339,12 +1647,13 @@ def _gen_phrase_flash(difficulty: int, count: int, lang: str = "en") -> List[Exe
     return items
 
 
-async def _gen_repeated_reader(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+async def _gen_repeated_reader(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Timed reading: passage stays visible, focus on comprehension."""
-    level = _age_adjusted_passage_level(difficulty)
+    lang = ctx.lang
+    level = _age_adjusted_passage_level(difficulty, ctx.student_age)
     story_src = STORY_PASSAGES_EL if lang == "el" else STORY_PASSAGES
     passages = story_src.get(level, story_src["easy"])
-    passage = await _pick_passage(passages)
+    passage = await _pick_passage(passages, ctx)
     text = passage["text"]
     items = []
     for i, q in enumerate(passage["questions"][:count]):
@@ -1368,18 +1677,21 @@ async def _gen_repeated_reader(difficulty: int, count: int, lang: str = "en") ->
 # SPOT TARGET GENERATORS
 # =============================================================================
 
-def _gen_letter_stream(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_letter_stream(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Spot target: find target letter in a grid of letters."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    alphabet = list("ΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩ") if lang == "el" else list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    alpha_key = "EL" if lang == "el" else "EN"
+    alphabet = _INDEX.alphabets[alpha_key]
     for i in range(count):
-        target = random.choice(alphabet)
+        target = rng.choice(alphabet)
+        others = _INDEX.letters_except[(alpha_key, target)]
         # Create a grid layout
         grid_cols = min(4 + difficulty, 8)
         grid_rows = min(3 + difficulty // 2, 5)
         total = grid_cols * grid_rows
-        grid = [random.choice([c for c in alphabet if c != target]) for _ in range(total)]
-        target_positions = random.sample(range(total), min(1 + difficulty // 3, 3))
+        grid = rng.choices(others, k=total)
+        target_positions = rng.sample(range(total), min(1 + difficulty // 3, 3))
         for pos in target_positions:
             grid[pos] = target
         items.append(ExerciseItem(
@@ -1401,18 +1713,19 @@ def _gen_letter_stream(difficulty: int, count: int, lang: str = "en") -> List[Ex
     return items
 
 
-def _gen_letter_detective(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_letter_detective(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Spot target: find the target letter in a visual grid."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    alpha = "αβγδεζηθικλμνξοπρστυφχψω" if lang == "el" else "abcdefghijklmnopqrstuvwxyz"
+    alpha_key = _lang_key(lang)
+    alpha = _INDEX.alphabets[alpha_key]
     for i in range(count):
-        target = random.choice(alpha)
+        target = rng.choice(alpha)
         grid_cols = min(4 + difficulty, 7)
         grid_rows = min(3 + difficulty // 2, 5)
         total = grid_cols * grid_rows
-        letters = [random.choice(alpha) for _ in range(total)]
-        letters = [l if l != target else random.choice([c for c in alpha if c != target]) for l in letters]
-        target_pos = random.sample(range(total), min(1 + difficulty // 4, 3))
+        letters = rng.choices(_INDEX.letters_except[(alpha_key, target)], k=total)
+        target_pos = rng.sample(range(total), min(1 + difficulty // 4, 3))
         for pos in target_pos:
             letters[pos] = target
         q = f"Πάτησε κάθε '{target}' που μπορείς να βρεις!" if lang == "el" else f"Tap every '{target}' you can find!"
@@ -1436,8 +1749,9 @@ def _gen_letter_detective(difficulty: int, count: int, lang: str = "en") -> List
     return items
 
 
-def _gen_mirror_image(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_mirror_image(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Spot target: find the correctly oriented letter among mirrored versions."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
     if lang == "el":
         mirror_map = {"β": "δ", "δ": "β", "θ": "φ", "φ": "θ", "ψ": "ω", "ω": "ψ", "η": "ν", "ν": "η"}
@@ -1446,13 +1760,13 @@ def _gen_mirror_image(difficulty: int, count: int, lang: str = "en") -> List[Exe
         mirror_map = {"b": "d", "d": "b", "p": "q", "q": "p", "m": "w", "w": "m", "n": "u", "u": "n"}
         reversed_letters = LETTERS_COMMONLY_REVERSED
     for i in range(count):
-        letter = random.choice(reversed_letters)
+        letter = rng.choice(reversed_letters)
         mirrored = mirror_map.get(letter, letter)
         # Create a grid of mirrored letters with one correct one
         grid_size = min(3 + difficulty // 2, 5)
         total = grid_size * grid_size
         grid = [mirrored] * total
-        correct_pos = random.sample(range(total), min(1 + difficulty // 4, 3))
+        correct_pos = rng.sample(range(total), min(1 + difficulty // 4, 3))
         for pos in correct_pos:
             grid[pos] = letter
         items.append(ExerciseItem(
@@ -1479,17 +1793,19 @@ def _gen_mirror_image(difficulty: int, count: int, lang: str = "en") -> List[Exe
 # FILL BLANK GENERATORS
 # =============================================================================
 
-def _gen_visual_closure(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_visual_closure(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Fill blank: complete a word with missing letters."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    words = get_word_bank(difficulty, lang)
+    words = get_word_bank(difficulty, lang, ctx.student_age)
+    alphabet = _INDEX.alphabets[_lang_key(lang)]
     for i in range(count):
-        word = random.choice(words)
+        word = rng.choice(words)
         partial = list(word)
         num_blanks = max(1, len(word) // 3)
         if difficulty >= 5:
             num_blanks = max(1, len(word) // 2)
-        blank_indices = sorted(random.sample(range(len(word)), min(num_blanks, len(word))))
+        blank_indices = sorted(rng.sample(range(len(word)), min(num_blanks, len(word))))
         missing_letters = [word[idx] for idx in blank_indices]
         for idx in blank_indices:
             partial[idx] = "_"
@@ -1507,14 +1823,15 @@ def _gen_visual_closure(difficulty: int, count: int, lang: str = "en") -> List[E
                 "blank_positions": blank_indices,
                 "missing_letters": missing_letters,
                 "full_word": word,
-                "available_letters": list(set(missing_letters + random.sample(list("αβγδεζηθικλμνξοπρστυφχψω" if lang == "el" else "abcdefghijklmnopqrstuvwxyz"), min(4, 24)))),
+                "available_letters": list(set(missing_letters + rng.sample(alphabet, 4))),
             },
         ))
     return items
 
 
-def _gen_vocabulary_builder(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_vocabulary_builder(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Fill blank: use context to determine word meaning (with options)."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
     if lang == "el":
         vocab = [
@@ -1547,8 +1864,8 @@ def _gen_vocabulary_builder(difficulty: int, count: int, lang: str = "en") -> Li
              ["wonderful", "terrible", "surprising", "pleasant"]),
         ]
     for i in range(count):
-        sentence, word, meaning, options = random.choice(vocab)
-        random.shuffle(options)
+        sentence, word, meaning, options = rng.choice(vocab)
+        rng.shuffle(options)
         q = f"Τι σημαίνει '{word}' σε αυτή την πρόταση;" if lang == "el" else f"What does '{word}' mean in this sentence?"
         h = "Χρησιμοποίησε το νόημα της πρότασης για βοήθεια." if lang == "el" else "Use the context of the sentence to help."
         items.append(ExerciseItem(
@@ -1571,12 +1888,13 @@ def _gen_vocabulary_builder(difficulty: int, count: int, lang: str = "en") -> Li
 # TRACKING GENERATOR
 # =============================================================================
 
-def _gen_tracking_trail(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_tracking_trail(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Tracking: follow a visual path and determine the endpoint."""
+    rng = ctx.rng
     items = []
     for i in range(count):
         steps = 3 + difficulty
-        directions = [random.choice(["up", "down", "left", "right"]) for _ in range(steps)]
+        directions = [rng.choice(["up", "down", "left", "right"]) for _ in range(steps)]
         # Calculate actual endpoint from start (0, 0)
         x, y = 0, 0
         path_positions = [(x, y)]
@@ -1614,8 +1932,9 @@ def _gen_tracking_trail(difficulty: int, count: int, lang: str = "en") -> List[E
 # PATTERN MATCH GENERATOR
 # =============================================================================
 
-def _gen_pattern_matcher(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_pattern_matcher(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Pattern match: find the exact match from similar-looking options."""
+    rng = ctx.rng
     items = []
     shape_emojis = {
         "circle": "🔴", "square": "🟦", "triangle": "🔺",
@@ -1625,7 +1944,7 @@ def _gen_pattern_matcher(difficulty: int, count: int, lang: str = "en") -> List[
     for i in range(count):
         pattern_length = min(3 + difficulty // 2, 6)
         available = shapes[:min(len(shapes), 2 + difficulty)]
-        pattern = [random.choice(available) for _ in range(pattern_length)]
+        pattern = [rng.choice(available) for _ in range(pattern_length)]
         pattern_display = " ".join(shape_emojis[s] for s in pattern)
         correct_display = pattern_display
 
@@ -1633,10 +1952,10 @@ def _gen_pattern_matcher(difficulty: int, count: int, lang: str = "en") -> List[
         wrong_options = []
         for _ in range(3):
             wrong = pattern.copy()
-            num_changes = random.randint(1, min(2, len(wrong)))
+            num_changes = rng.randint(1, min(2, len(wrong)))
             for _ in range(num_changes):
-                idx = random.randint(0, len(wrong) - 1)
-                wrong[idx] = random.choice([s for s in available if s != wrong[idx]])
+                idx = rng.randint(0, len(wrong) - 1)
+                wrong[idx] = rng.choice([s for s in available if s != wrong[idx]])
             wrong_display = " ".join(shape_emojis[s] for s in wrong)
             if wrong_display != correct_display:
                 wrong_options.append(wrong_display)
@@ -1644,14 +1963,14 @@ def _gen_pattern_matcher(difficulty: int, count: int, lang: str = "en") -> List[
         # Ensure we have enough options
         while len(wrong_options) < 3:
             wrong = pattern.copy()
-            idx = random.randint(0, len(wrong) - 1)
-            wrong[idx] = random.choice([s for s in available if s != wrong[idx]])
+            idx = rng.randint(0, len(wrong) - 1)
+            wrong[idx] = rng.choice([s for s in available if s != wrong[idx]])
             wd = " ".join(shape_emojis[s] for s in wrong)
             if wd != correct_display and wd not in wrong_options:
                 wrong_options.append(wd)
 
         options = [correct_display] + wrong_options[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question="Study this pattern, then find the exact match!",
@@ -1671,16 +1990,18 @@ def _gen_pattern_matcher(difficulty: int, count: int, lang: str = "en") -> List[
 # DUAL TASK GENERATOR
 # =============================================================================
 
-def _gen_dual_task(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_dual_task(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Dual task: remember a word while solving a math problem."""
+    rng = ctx.rng
     items = []
+    word_bank = get_word_bank(min(difficulty, 4), "en", ctx.student_age)
     for i in range(count):
         # The word to remember
-        word = random.choice(get_word_bank(min(difficulty, 4)))
+        word = rng.choice(word_bank)
         # The math problem
-        num1 = random.randint(1, 5 * difficulty)
-        num2 = random.randint(1, 5 * difficulty)
-        operation = random.choice(["+", "-"]) if difficulty > 3 else "+"
+        num1 = rng.randint(1, 5 * difficulty)
+        num2 = rng.randint(1, 5 * difficulty)
+        operation = rng.choice(["+", "-"]) if difficulty > 3 else "+"
         if operation == "+":
             math_answer = num1 + num2
         else:
@@ -1694,13 +2015,12 @@ def _gen_dual_task(difficulty: int, count: int, lang: str = "en") -> List[Exerci
             if math_answer + d > 0 and math_answer + d != math_answer
         ]))[:3]
         math_options = [str(math_answer)] + [str(d) for d in math_distractors]
-        random.shuffle(math_options)
+        rng.shuffle(math_options)
 
         # Create word recall options
-        word_bank = get_word_bank(min(difficulty, 4))
-        word_distractors = random.sample([w for w in word_bank if w != word], 3)
+        word_distractors = _sample_excluding(word_bank, word, 3, rng)
         word_options = [word] + word_distractors
-        random.shuffle(word_options)
+        rng.shuffle(word_options)
 
         items.append(ExerciseItem(
             index=i,
@@ -1724,8 +2044,9 @@ def _gen_dual_task(difficulty: int, count: int, lang: str = "en") -> List[Exerci
 # CASTLE BOSS CHALLENGE GENERATOR
 # =============================================================================
 
-def _gen_castle_challenge(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_castle_challenge(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Generate simple multiple-choice questions for the castle boss fight (3 needed)."""
+    lang, rng = ctx.lang, ctx.rng
     questions_en = [
         {"q": "Which word rhymes with 'cat'?", "opts": ["hat", "dog", "sun", "map"], "ans": "hat"},
         {"q": "What sound does the letter 'B' make?", "opts": ["/b/", "/d/", "/p/", "/g/"], "ans": "/b/"},
@@ -1747,7 +2068,7 @@ def _gen_castle_challenge(difficulty: int, count: int, lang: str = "en") -> List
     ]
 
     pool = questions_el if lang == "el" else questions_en
-    random.shuffle(pool)
+    rng.shuffle(pool)
 
     items: List[ExerciseItem] = []
     for i in range(min(count, len(pool))):
@@ -1770,7 +2091,7 @@ def _gen_castle_challenge(difficulty: int, count: int, lang: str = "en") -> List
 
 # ── Heavy model (8b) AI generators ──────────────────────────────────────────
 
-async def _gen_story_recall_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_story_recall_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI timed-reading story recall (heavy model)."""
     data = await ai.generate_story_passage(difficulty, num_questions=count)
     if not data:
@@ -1797,7 +2118,7 @@ async def _gen_story_recall_ai(difficulty: int, count: int) -> List[ExerciseItem
     return items if items else None
 
 
-async def _gen_question_quest_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_question_quest_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI comprehension questions (heavy model)."""
     data = await ai.generate_story_passage(difficulty, num_questions=count)
     if not data:
@@ -1816,7 +2137,7 @@ async def _gen_question_quest_ai(difficulty: int, count: int) -> List[ExerciseIt
     return items if items else None
 
 
-async def _gen_repeated_reader_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_repeated_reader_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI reading fluency with visible passage (heavy model)."""
     data = await ai.generate_story_passage(difficulty, num_questions=count)
     if not data:
@@ -1841,15 +2162,16 @@ async def _gen_repeated_reader_ai(difficulty: int, count: int) -> List[ExerciseI
     return items if items else None
 
 
-async def _gen_main_idea_hunter_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_main_idea_hunter_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI main-idea identification (heavy model)."""
+    rng = ctx.rng
     data = await ai.generate_main_idea_passages(difficulty, count=count)
     if not data:
         return None
     items = []
     for i, p in enumerate(data[:count]):
         options = [p["main_idea"]] + p.get("distractors", [])[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Read: '{p['text']}'\n\nWhat is the main idea?",
@@ -1861,15 +2183,16 @@ async def _gen_main_idea_hunter_ai(difficulty: int, count: int) -> List[Exercise
     return items if items else None
 
 
-async def _gen_inference_detective_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_inference_detective_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI inference scenarios (heavy model)."""
+    rng = ctx.rng
     data = await ai.generate_inference_scenarios(difficulty, count=count)
     if not data:
         return None
     items = []
     for i, s in enumerate(data[:count]):
         options = s.get("options", [])
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Read: '{s['text']}'\n\n{s['question']}",
@@ -1881,15 +2204,16 @@ async def _gen_inference_detective_ai(difficulty: int, count: int) -> List[Exerc
     return items if items else None
 
 
-async def _gen_vocabulary_builder_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_vocabulary_builder_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI vocabulary in context (heavy model)."""
+    rng = ctx.rng
     data = await ai.generate_vocabulary_items(difficulty, count=count)
     if not data:
         return None
     items = []
     for i, v in enumerate(data[:count]):
         options = v.get("options", [])
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"What does '{v['word']}' mean in this sentence?",
@@ -1907,8 +2231,9 @@ async def _gen_vocabulary_builder_ai(difficulty: int, count: int) -> List[Exerci
     return items if items else None
 
 
-async def _gen_story_sequencer_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_story_sequencer_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI story event ordering (heavy model)."""
+    rng = ctx.rng
     data = await ai.generate_story_sequence(difficulty, count=count)
     if not data:
         return None
@@ -1916,10 +2241,10 @@ async def _gen_story_sequencer_ai(difficulty: int, count: int) -> List[ExerciseI
     for i, s in enumerate(data[:count]):
         correct_seq = s["events"]
         shuffled = correct_seq.copy()
-        random.shuffle(shuffled)
+        rng.shuffle(shuffled)
         attempts = 0
         while shuffled == correct_seq and attempts < 10:
-            random.shuffle(shuffled)
+            rng.shuffle(shuffled)
             attempts += 1
         items.append(ExerciseItem(
             index=i,
@@ -1938,15 +2263,16 @@ async def _gen_story_sequencer_ai(difficulty: int, count: int) -> List[ExerciseI
     return items if items else None
 
 
-async def _gen_prosody_practice_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_prosody_practice_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI prosody / reading tone (heavy model)."""
+    rng = ctx.rng
     data = await ai.generate_prosody_sentences(difficulty, count=count)
     if not data:
         return None
     items = []
     for i, p in enumerate(data[:count]):
         options = [p["tone"]] + p.get("distractor_tones", [])[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"What tone should you use to read: '{p['sentence']}'",
@@ -1961,25 +2287,26 @@ async def _gen_prosody_practice_ai(difficulty: int, count: int) -> List[Exercise
 
 # ── Light model (4b) AI generators ─────────────────────────────────────────
 
-async def _gen_sound_safari_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_sound_safari_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI word bank for sound identification (light model)."""
+    rng = ctx.rng
     words = await ai.generate_word_bank(difficulty, count=20, category="common objects")
     if not words or len(words) < 4:
         return None
     positions = ["beginning", "ending"] if difficulty <= 3 else ["beginning", "middle", "ending"]
     items = []
     for i in range(count):
-        word = random.choice(words)
-        position = random.choice(positions)
+        word = rng.choice(words)
+        position = rng.choice(positions)
         if position == "beginning":
             target_sound = word[0]
         elif position == "ending":
             target_sound = word[-1]
         else:
             target_sound = word[len(word) // 2] if len(word) > 2 else word[0]
-        distractors = random.sample([w for w in words if w != word], min(3, len(words) - 1))
+        distractors = rng.sample([w for w in words if w != word], min(3, len(words) - 1))
         options = [word] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Which word has the sound '{target_sound}' at the {position}?",
@@ -1992,8 +2319,9 @@ async def _gen_sound_safari_ai(difficulty: int, count: int) -> List[ExerciseItem
     return items
 
 
-async def _gen_rhyme_time_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_rhyme_time_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI rhyming pairs (light model)."""
+    rng = ctx.rng
     pairs = await ai.generate_rhyme_pairs(difficulty, count=max(count, 8))
     if not pairs or len(pairs) < 2:
         return None
@@ -2003,9 +2331,9 @@ async def _gen_rhyme_time_ai(difficulty: int, count: int) -> List[ExerciseItem]
         pair = pairs[i]
         word, correct = pair[0], pair[1]
         all_answers = [p[1] for p in pairs if p != pair]
-        distractors = random.sample(all_answers, min(3, len(all_answers))) if all_answers else ["no", "match", "here"]
+        distractors = rng.sample(all_answers, min(3, len(all_answers))) if all_answers else ["no", "match", "here"]
         options = [correct] + distractors[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Which word rhymes with '{word}'?",
@@ -2022,8 +2350,9 @@ async def _gen_rhyme_time_ai(difficulty: int, count: int) -> List[ExerciseItem]
     return items if items else None
 
 
-async def _gen_syllable_stomper_ai(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem] | None:
+async def _gen_syllable_stomper_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI syllable counting (light model)."""
+    lang = ctx.lang
     data = await ai.generate_syllable_words(difficulty, count=max(count, 10))
     if not data or len(data) < 2:
         return None
@@ -2051,8 +2380,9 @@ async def _gen_syllable_stomper_ai(difficulty: int, count: int, lang: str = "en"
     return items if items else None
 
 
-async def _gen_phoneme_blender_ai(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem] | None:
+async def _gen_phoneme_blender_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI phoneme blending (light model)."""
+    rng = ctx.rng
     data = await ai.generate_phoneme_blends(difficulty, count=max(count, 8))
     if not data or len(data) < 2:
         return None
@@ -2063,10 +2393,10 @@ async def _gen_phoneme_blender_ai(difficulty: int, count: int, lang: str = "en")
         sounds = entry["sounds"]
         word = entry["word"]
         shuffled_sounds = list(sounds)
-        random.shuffle(shuffled_sounds)
-        distractors = random.sample([w for w in all_words if w != word], min(3, len(all_words) - 1))
+        rng.shuffle(shuffled_sounds)
+        distractors = rng.sample([w for w in all_words if w != word], min(3, len(all_words) - 1))
         options = [word] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question="Blend the sounds to make a word!",
@@ -2084,8 +2414,9 @@ async def _gen_phoneme_blender_ai(difficulty: int, count: int, lang: str = "en")
     return items if items else None
 
 
-async def _gen_sound_swap_ai(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem] | None:
+async def _gen_sound_swap_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI sound swap exercises (light model)."""
+    lang, rng = ctx.lang, ctx.rng
     data = await ai.generate_sound_swap_items(difficulty, count=max(count, 8))
     if not data or len(data) < 2:
         return None
@@ -2097,12 +2428,12 @@ async def _gen_sound_swap_ai(difficulty: int, count: int, lang: str = "en") -> L
         old_sound = entry["old_sound"]
         new_sound = entry["new_sound"]
         answer = entry["result"]
-        distractors = random.sample([w for w in all_results if w != answer],
+        distractors = rng.sample([w for w in all_results if w != answer],
                                     min(3, len(all_results) - 1))
         if len(distractors) < 3:
-            distractors += random.sample(get_word_bank(difficulty, lang), 3 - len(distractors))
+            distractors += rng.sample(get_word_bank(difficulty, lang, ctx.student_age), 3 - len(distractors))
         options = [answer] + distractors[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Change '{old_sound}' to '{new_sound}' in the word below:",
@@ -2123,8 +2454,9 @@ async def _gen_sound_swap_ai(difficulty: int, count: int, lang: str = "en") -> L
     return items if items else None
 
 
-async def _gen_flash_card_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_flash_card_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI flash card word meanings (light model)."""
+    rng = ctx.rng
     data = await ai.generate_word_meanings(difficulty, count=max(count, 8))
     if not data or len(data) < 4:
         return None
@@ -2135,10 +2467,10 @@ async def _gen_flash_card_ai(difficulty: int, count: int) -> List[ExerciseItem]
         entry = data[i]
         word = entry["word"]
         correct = entry["meaning"]
-        distractors = random.sample([m for m in all_meanings if m != correct],
+        distractors = rng.sample([m for m in all_meanings if m != correct],
                                     min(3, len(all_meanings) - 1))
         options = [correct] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
         time_limit = max(2, base_time - (i // 3))
         items.append(ExerciseItem(
             index=i,
@@ -2156,8 +2488,9 @@ async def _gen_flash_card_ai(difficulty: int, count: int) -> List[ExerciseItem]
     return items if items else None
 
 
-async def _gen_phrase_flash_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_phrase_flash_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI phrase flash timed reading (light model)."""
+    rng = ctx.rng
     phrases = await ai.generate_phrases(difficulty, count=max(count, 8))
     if not phrases or len(phrases) < 2:
         return None
@@ -2171,15 +2504,15 @@ async def _gen_phrase_flash_ai(difficulty: int, count: int) -> List[ExerciseItem
             (f"How many words were in the phrase?", str(word_count),
              [str(word_count - 1), str(word_count), str(word_count + 1), str(word_count + 2)]),
             (f"What was the first word?", words_in_phrase[0],
-             [words_in_phrase[0]] + random.sample(["the", "a", "my", "to", "it", "in"], 3)),
+             [words_in_phrase[0]] + rng.sample(["the", "a", "my", "to", "it", "in"], 3)),
             (f"What was the last word?", words_in_phrase[-1],
-             [words_in_phrase[-1]] + random.sample(["up", "go", "it", "run", "day", "big"], 3)),
+             [words_in_phrase[-1]] + rng.sample(["up", "go", "it", "run", "day", "big"], 3)),
         ]
-        q_text, correct, opts = random.choice(question_types)
+        q_text, correct, opts = rng.choice(question_types)
         opts = list(set(opts))[:4]
         if correct not in opts:
             opts[0] = correct
-        random.shuffle(opts)
+        rng.shuffle(opts)
         items.append(ExerciseItem(
             index=i,
             question=q_text,
@@ -2197,8 +2530,9 @@ async def _gen_phrase_flash_ai(difficulty: int, count: int) -> List[ExerciseItem
     return items if items else None
 
 
-async def _gen_word_ladder_ai(difficulty: int, count: int) -> List[ExerciseItem] | None:
+async def _gen_word_ladder_ai(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem] | None:
     """AI word ladder pairs (light model)."""
+    rng = ctx.rng
     data = await ai.generate_word_ladder_pairs(difficulty, count=max(count, 8))
     if not data or len(data) < 2:
         return None
@@ -2209,12 +2543,12 @@ async def _gen_word_ladder_ai(difficulty: int, count: int) -> List[ExerciseItem]
         start = entry["start"]
         target = entry["target"]
         change_pos = entry.get("change_position", 0)
-        distractors = random.sample([t for t in all_targets if t != target],
+        distractors = rng.sample([t for t in all_targets if t != target],
                                     min(3, len(all_targets) - 1))
         if len(distractors) < 3:
-            distractors += random.sample(["cap", "tap", "zip", "hop"], 3 - len(distractors))
+            distractors += rng.sample(["cap", "tap", "zip", "hop"], 3 - len(distractors))
         options = [target] + distractors[:3]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"Change one letter in '{start}' to make a new word:",
@@ -2238,24 +2572,22 @@ async def _gen_word_ladder_ai(difficulty: int, count: int) -> List[ExerciseItem]
 # SOUND MATCHING GENERATOR  (item_type="sound_matching")
 # =============================================================================
 
-def _gen_sound_matching(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_sound_matching(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Sound matching: listen to two words, decide if they rhyme (yes/no)."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    pairs_source = RHYME_PAIRS_EL if lang == "el" else RHYME_PAIRS
-    pairs = pairs_source[:min(len(pairs_source), 5 + difficulty * 2)]
-    non_rhyme_words = (SIMPLE_WORDS_EL + MEDIUM_WORDS_EL) if lang == "el" else (SIMPLE_WORDS + MEDIUM_WORDS)
+    key = _lang_key(lang)
+    pairs = _INDEX.rhyme_subsets[(key, _clamp_difficulty(difficulty))]
+    pick = ctx.picker("rhyme", pairs, _rhyme_key)
     for i in range(count):
-        do_rhyme = random.choice([True, False])
+        do_rhyme = rng.choice([True, False])
+        p_idx = pick()
         if do_rhyme:
-            pair = random.choice(pairs)
-            word1, word2 = pair[0], pair[1]
+            word1, word2 = pairs[p_idx]
             correct = "yes"
         else:
-            pair = random.choice(pairs)
-            word1 = pair[0]
-            word2 = random.choice([w for w in non_rhyme_words
-                                   if w != pair[0] and w != pair[1]
-                                   and w[-2:] != pair[1][-2:]])
+            word1 = pairs[p_idx][0]
+            word2 = rng.choice(_INDEX.non_rhymes[(key, p_idx)])
             correct = "no"
         items.append(ExerciseItem(
             index=i,
@@ -2278,21 +2610,23 @@ def _gen_sound_matching(difficulty: int, count: int, lang: str = "en") -> List[E
 # WORD-SOUND MATCH GENERATOR  (item_type="word_sound_match")
 # =============================================================================
 
-def _gen_word_sound_match(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_word_sound_match(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Word-to-sound matching: pick the word that sounds like the target."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    pairs_source = RHYME_PAIRS_EL if lang == "el" else RHYME_PAIRS
-    pairs = pairs_source[:min(len(pairs_source), 5 + difficulty * 2)]
+    key = (_lang_key(lang), _clamp_difficulty(difficulty))
+    pairs = _INDEX.rhyme_subsets[key]
+    pair_distractors = _INDEX.rhyme_distractors[key]
+    pick = ctx.picker("rhyme", pairs, _rhyme_key)
     for i in range(count):
-        pair = random.choice(pairs)
-        target = pair[0]
-        correct = pair[1]
-        other_words = [p[1] for p in pairs if p != pair]
-        distractors = random.sample(other_words, min(2, len(other_words)))
+        p_idx = pick()
+        target, correct = pairs[p_idx]
+        other_words = pair_distractors[p_idx]
+        distractors = rng.sample(other_words, min(2, len(other_words)))
         if len(distractors) < 2:
-            distractors += random.sample(get_word_bank(difficulty, lang), 2 - len(distractors))
+            distractors += rng.sample(get_word_bank(difficulty, lang, ctx.student_age), 2 - len(distractors))
         options = [correct] + distractors[:2]
-        random.shuffle(options)
+        rng.shuffle(options)
         items.append(ExerciseItem(
             index=i,
             question=f"{_t('which_sounds_same', lang)} '{target}';" if lang == "el" else f"Which word sounds like '{target}'?",
@@ -2313,26 +2647,21 @@ def _gen_word_sound_match(difficulty: int, count: int, lang: str = "en") -> List
 # READ ALOUD GENERATOR  (item_type="read_aloud")
 # =============================================================================
 
-PSEUDO_WORDS = [
-    "blorft", "snalp", "gribble", "tramble", "flonk",
-    "criddle", "spunt", "blemish", "glorp", "twisk",
-    "plondle", "frazzle", "snarble", "quibble", "drintle",
-    "glopper", "strumble", "flimber", "brontled", "klipster",
-]
-
-
-def _gen_read_aloud(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_read_aloud(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Read aloud: show a word (or pseudo-word) for the child to read via STT."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    real_words = get_word_bank(difficulty, lang)
+    real_words = get_word_bank(difficulty, lang, ctx.student_age)
     pseudo_pool = PSEUDO_WORDS_EL if lang == "el" else PSEUDO_WORDS
     pseudo_ratio = min(0.3 + difficulty * 0.05, 0.5)
+    pick_pseudo = ctx.picker("word", pseudo_pool)
+    pick_real = ctx.picker("word", real_words)
     for i in range(count):
-        is_pseudo = random.random() < pseudo_ratio
+        is_pseudo = rng.random() < pseudo_ratio
         if is_pseudo:
-            word = random.choice(pseudo_pool)
+            word = pseudo_pool[pick_pseudo()]
         else:
-            word = random.choice(real_words)
+            word = real_words[pick_real()]
         hint = "Προσπάθησε να το διαβάσεις γράμμα-γράμμα." if lang == "el" else "Sound it out letter by letter if you're unsure."
         items.append(ExerciseItem(
             index=i,
@@ -2356,44 +2685,23 @@ def _gen_read_aloud(difficulty: int, count: int, lang: str = "en") -> List[Exerc
 # WORD-IMAGE MATCH GENERATOR  (item_type="word_image_match")
 # =============================================================================
 
-EXERCISE_IMAGES = [
-    {"id": "grandmother", "url": "/game-assets/exercise-images/grandmother.png", "label": "Grandmother", "label_el": "Γιαγιά"},
-    {"id": "cat",         "url": "/game-assets/exercise-images/cat.png",         "label": "Cat",         "label_el": "Γάτα"},
-    {"id": "dog",         "url": "/game-assets/exercise-images/dog.png",         "label": "Dog",         "label_el": "Σκύλος"},
-    {"id": "tiger",       "url": "/game-assets/exercise-images/tiger.png",       "label": "Tiger",       "label_el": "Τίγρης"},
-    {"id": "duck",        "url": "/game-assets/exercise-images/duck.png",        "label": "Duck",        "label_el": "Πάπια"},
-    {"id": "apple",       "url": "/game-assets/exercise-images/apple.png",       "label": "Apple",       "label_el": "Μήλο"},
-    {"id": "house",       "url": "/game-assets/exercise-images/house.png",       "label": "House",       "label_el": "Σπίτι"},
-    {"id": "tree",        "url": "/game-assets/exercise-images/tree.png",        "label": "Tree",        "label_el": "Δέντρο"},
-    {"id": "sun",         "url": "/game-assets/exercise-images/sun.png",         "label": "Sun",         "label_el": "Ήλιος"},
-    {"id": "fish",        "url": "/game-assets/exercise-images/fish.png",        "label": "Fish",        "label_el": "Ψάρι"},
-    {"id": "flower",      "url": "/game-assets/exercise-images/flower.png",      "label": "Flower",      "label_el": "Λουλούδι"},
-    {"id": "book",        "url": "/game-assets/exercise-images/book.png",        "label": "Book",        "label_el": "Βιβλίο"},
-]
-
-
-def _get_img_label(img: Dict[str, Any], lang: str = "en") -> str:
-    """Get image label in the specified language."""
-    if lang == "el":
-        return img.get("label_el", img["label"])
-    return img["label"]
-
-
-def _gen_word_image_match(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_word_image_match(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Word-image matching: pick the image for a word, or word for an image."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    pool = EXERCISE_IMAGES.copy()
+    cards = _INDEX.images[_lang_key(lang)]
     tts_lang = "el-GR" if lang == "el" else "en-US"
+    pick = ctx.picker("image", cards, _image_id)
     for i in range(count):
-        mode = random.choice(["word_to_image", "image_to_word"])
-        correct_img = random.choice(pool)
-        correct_label = _get_img_label(correct_img, lang)
-        distractors = random.sample([img for img in pool if img["id"] != correct_img["id"]],
-                                    min(3, len(pool) - 1))
+        mode = rng.choice(["word_to_image", "image_to_word"])
+        img_idx = pick()
+        correct_img = cards[img_idx]
+        correct_label = correct_img["label"]
+        distractors = [cards[j] for j in rng.sample(_INDEX.image_others[img_idx], min(3, len(cards) - 1))]
         if mode == "word_to_image":
             image_options = [correct_img] + distractors
-            random.shuffle(image_options)
-            localized_options = [{**img, "label": _get_img_label(img, lang)} for img in image_options]
+            rng.shuffle(image_options)
+            localized_options = [dict(img) for img in image_options]
             q = f"{_t('find_picture', lang)}: {correct_label}"
             items.append(ExerciseItem(
                 index=i,
@@ -2409,8 +2717,8 @@ def _gen_word_image_match(difficulty: int, count: int, lang: str = "en") -> List
                 },
             ))
         else:
-            word_options = [correct_label] + [_get_img_label(d, lang) for d in distractors]
-            random.shuffle(word_options)
+            word_options = [correct_label] + [d["label"] for d in distractors]
+            rng.shuffle(word_options)
             items.append(ExerciseItem(
                 index=i,
                 question=_t("what_word_matches", lang),
@@ -2431,19 +2739,22 @@ def _gen_word_image_match(difficulty: int, count: int, lang: str = "en") -> List
 # RAPID NAMING (RAN) GENERATOR  (item_type="rapid_naming")
 # =============================================================================
 
-def _gen_rapid_naming(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_rapid_naming(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """RAN grid: name images in a grid as fast as possible using STT."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
     grid_cols = min(3 + difficulty // 3, 5)
     grid_rows = min(2 + difficulty // 3, 4)
     grid_size = grid_cols * grid_rows
     time_limit = max(15, 45 - difficulty * 3)
-    pool = EXERCISE_IMAGES.copy()
+    key = _lang_key(lang)
+    cards = _INDEX.images[key]
+    labels = _INDEX.image_labels_lower[key]
     tts_lang = "el-GR" if lang == "el" else "en-US"
     for i in range(count):
-        grid_images = [random.choice(pool) for _ in range(grid_size)]
-        localized_grid = [{**img, "label": _get_img_label(img, lang)} for img in grid_images]
-        expected_names = [_get_img_label(img, lang).lower() for img in grid_images]
+        grid_idx = rng.choices(range(len(cards)), k=grid_size)
+        localized_grid = [dict(cards[j]) for j in grid_idx]
+        expected_names = [labels[j] for j in grid_idx]
         items.append(ExerciseItem(
             index=i,
             question=_t("name_pictures", lang),
@@ -2466,20 +2777,21 @@ def _gen_rapid_naming(difficulty: int, count: int, lang: str = "en") -> List[Exe
 # MEMORY RECALL GENERATOR  (item_type="memory_recall")
 # =============================================================================
 
-def _gen_memory_recall(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_memory_recall(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Memory recall: select images that were (or weren't) seen earlier."""
+    lang, rng = ctx.lang, ctx.rng
     items = []
-    pool = EXERCISE_IMAGES.copy()
+    cards = _INDEX.images[_lang_key(lang)]
     seen_count = min(3 + difficulty // 2, 6)
     distractor_count = min(2 + difficulty // 2, 5)
     cols = 3 if (seen_count + distractor_count) <= 9 else 4
     for i in range(count):
-        mode = random.choice(["pick_seen", "pick_unseen"])
-        random.shuffle(pool)
-        seen_images = [{**img, "label": _get_img_label(img, lang)} for img in pool[:seen_count]]
-        unseen_images = [{**img, "label": _get_img_label(img, lang)} for img in pool[seen_count:seen_count + distractor_count]]
+        mode = rng.choice(["pick_seen", "pick_unseen"])
+        picked = rng.sample(range(len(cards)), min(len(cards), seen_count + distractor_count))
+        seen_images = [dict(cards[j]) for j in picked[:seen_count]]
+        unseen_images = [dict(cards[j]) for j in picked[seen_count:]]
         all_images = seen_images + unseen_images
-        random.shuffle(all_images)
+        rng.shuffle(all_images)
         seen_ids = sorted([img["id"] for img in seen_images])
         unseen_ids = sorted([img["id"] for img in unseen_images])
         if mode == "pick_seen":
@@ -2511,12 +2823,13 @@ def _gen_memory_recall(difficulty: int, count: int, lang: str = "en") -> List[Ex
 # FALLBACK GENERATOR
 # =============================================================================
 
-def _gen_default(difficulty: int, count: int, lang: str = "en") -> List[ExerciseItem]:
+def _gen_default(difficulty: int, count: int, ctx: GenerationContext) -> List[ExerciseItem]:
     """Fallback generator for unknown game types."""
-    words = get_word_bank(difficulty, lang)
+    lang, rng = ctx.lang, ctx.rng
+    words = get_word_bank(difficulty, lang, ctx.student_age)
     items = []
     for i in range(count):
-        word = random.choice(words)
+        word = rng.choice(words)
         items.append(ExerciseItem(
             index=i,
             question=f"Πόσα γράμματα έχει η λέξη '{word}';" if lang == "el" else f"How many letters are in the word '{word}'?",
@@ -2525,3 +2838,659 @@ def _gen_default(difficulty: int, count: int, lang: str = "en") -> List[Exercise
             item_type="multiple_choice",
         ))
     return items
+
+
+# =============================================================================
+# BULK GENERATION
+# =============================================================================
+#
+# Offline QA and the item pool need thousands of template sessions at once.
+# The bulk samplers below draw every random choice for M sessions × N items as
+# NumPy index arrays over the content index in one pass. A BulkItemSet keeps
+# only those arrays; its game's builder turns a row into the dict a session
+# stores (ExerciseItem.model_dump() layout) when that session is read, and
+# ExerciseItem objects are made only for callers that ask for them.
+
+class BulkItemSet:
+    """M sessions × N template items, built on access as stored dicts or ExerciseItem objects.
+
+    Pickling keeps only the sampled index arrays, so a set sampled in the
+    process pool crosses back as a few compact buffers; the builder is
+    recreated from the content index on first read.
+    """
+
+    def __init__(
+        self, game_id: str, sessions: int, items_per_session: int,
+        difficulty: int, lang: str, student_age: int | None, arrays: Tuple[Any, ...],
+    ):
+        self.game_id = game_id
+        self.sessions = sessions
+        self.items_per_session = items_per_session
+        self.difficulty = difficulty
+        self.lang = lang
+        self.student_age = student_age
+        self._arrays = arrays
+        self._builder: Optional[Callable[[int, int], Dict[str, Any]]] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**self.__dict__, "_builder": None}
+
+    def __len__(self) -> int:
+        return self.sessions
+
+    def __getitem__(self, session: int) -> List[ExerciseItem]:
+        if not -self.sessions <= session < self.sessions:
+            raise IndexError(session)
+        return self.session(session % self.sessions)
+
+    def __iter__(self):
+        for s in range(self.sessions):
+            yield self.session(s)
+
+    @property
+    def total_items(self) -> int:
+        return self.sessions * self.items_per_session
+
+    @property
+    def _build(self) -> Callable[[int, int], Dict[str, Any]]:
+        if self._builder is None:
+            make = GENERATORS[self.game_id].bulk_build
+            self._builder = make(self.difficulty, self.lang, self.student_age, *_bulk_lists(*self._arrays))
+        return self._builder
+
+    def item(self, session: int, index: int) -> ExerciseItem:
+        return ExerciseItem(**self._build(session * self.items_per_session + index, index))
+
+    def session(self, session: int) -> List[ExerciseItem]:
+        return [ExerciseItem(**item) for item in self.session_dicts(session)]
+
+    def session_dicts(self, session: int) -> List[Dict[str, Any]]:
+        """A session's items as the dicts sessions store, without building models."""
+        build, base = self._build, session * self.items_per_session
+        return [build(base + i, i) for i in range(self.items_per_session)]
+
+    def dicts(self) -> List[List[Dict[str, Any]]]:
+        build, per = self._build, self.items_per_session
+        return [[build(base + i, i) for i in range(per)] for base in range(0, self.total_items, per)]
+
+
+def _bulk_distractors(np, rng, pool_size: int, targets, k: int, blocked=None):
+    """Pick k distinct pool indices per row, never the row's target, without replacement.
+
+    Large unmasked pools draw k offsets from the pool minus the target and
+    redraw the few rows that collide. Otherwise every row gets random sort keys
+    over the pool, blocked entries get +inf and argpartition keeps the k
+    smallest; ``blocked`` is an optional (T, pool_size) mask indexed by target.
+    Rows with fewer than k candidates get -1 fill.
+    """
+    n = len(targets)
+    k = min(k, pool_size - 1)
+    if blocked is None and pool_size > 8 * k:
+        picked = rng.integers(pool_size - 1, size=(n, k))
+        while True:
+            ordered = np.sort(picked, axis=1)
+            clash = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+            if not len(clash):
+                break
+            picked[clash] = rng.integers(pool_size - 1, size=(len(clash), k))
+        return picked + (picked >= targets[:, None])
+    keys = rng.random((n, pool_size))
+    if blocked is not None:
+        keys[blocked[targets]] = np.inf
+    keys[np.arange(n), targets] = np.inf
+    picked = np.argpartition(keys, k - 1, axis=1)[:, :k]
+    valid = np.isfinite(np.take_along_axis(keys, picked, axis=1))
+    return np.where(valid, picked, -1)
+
+
+def _bulk_lists(*arrays):
+    """Sampled arrays as nested lists — the per-item builders index lists much faster than NumPy scalars."""
+    return tuple(a.tolist() for a in arrays)
+
+
+def _bulk_option_orders(np, rng, n: int, width: int):
+    """Per-row shuffles of option slots 0..width-1 (slot 0 is the correct answer)."""
+    return rng.permuted(np.broadcast_to(np.arange(width), (n, width)), axis=1)
+
+
+def _bulk_rhyme_blocked(np, pairs: Sequence[Tuple[str, str]], rhymes: Dict[str, Tuple[str, ...]]):
+    """(P, P) mask: pair q's answer may not be a distractor for pair p if it rhymes with p's prompt."""
+    answers = [b for _, b in pairs]
+    return np.array([[ans in rhymes.get(a, ()) for ans in answers] for a, _ in pairs], dtype=bool)
+
+
+def _bulk_compact(np, *arrays):
+    """Integer arrays in the smallest dtype that holds their values, so a pickled set stays small."""
+    return tuple(
+        a.astype(np.result_type(np.min_scalar_type(a.min()), np.min_scalar_type(a.max())))
+        if a.dtype.kind == "i" and a.size else a
+        for a in arrays
+    )
+
+
+# Each game has a sampler, (np, rng, difficulty, n, per_session, lang, age) ->
+# index arrays, and a builder, (difficulty, lang, age, *arrays as lists) ->
+# build(row, index) -> item dict. Both read the same content index tables.
+
+def _bulk_sound_safari(np, rng, difficulty, n, per_session, lang, age):
+    words = get_word_bank(difficulty, lang, age)
+    positions = 2 if difficulty <= 3 else 3
+    targets = rng.integers(len(words), size=n)
+    distractors = _bulk_distractors(np, rng, len(words), targets, 3)
+    pos = rng.integers(positions, size=n)
+    orders = _bulk_option_orders(np, rng, n, distractors.shape[1] + 1)
+    return targets, distractors, pos, orders
+
+
+def _bulk_sound_safari_build(difficulty, lang, age, targets, distractors, pos, orders):
+    words = get_word_bank(difficulty, lang, age)
+    positions = ["beginning", "ending"] if difficulty <= 3 else ["beginning", "middle", "ending"]
+    labels = {"beginning": "αρχή", "ending": "τέλος", "middle": "μέση"}
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        word = words[targets[row]]
+        position = positions[pos[row]]
+        if position == "beginning":
+            sound = word[0]
+        elif position == "ending":
+            sound = word[-1]
+        else:
+            sound = word[len(word) // 2] if len(word) > 2 else word[0]
+        slots = [word] + [words[d] for d in distractors[row]]
+        if lang == "el":
+            q = f"Ποια λέξη έχει τον ήχο '{sound}' στην {labels[position]};"
+            h = f"Ο ήχος '{sound}' είναι στην {labels[position]} της λέξης."
+        else:
+            q = f"Which word has the sound '{sound}' at the {position}?"
+            h = f"The sound '{sound}' is at the {position} of the word."
+        return {
+            "index": index, "question": q, "options": [slots[o] for o in orders[row]],
+            "correct_answer": word, "hint": h, "item_type": "multiple_choice", "extra_data": {},
+        }
+    return build
+
+
+def _bulk_rhyme_time(np, rng, difficulty, n, per_session, lang, age):
+    key = _lang_key(lang)
+    pairs = _INDEX.rhyme_subsets[(key, _clamp_difficulty(difficulty))]
+    words = get_word_bank(difficulty, lang, age)
+    p = len(pairs)
+    # Like the template: the candidate pool is the other pairs' answers plus
+    # two random word-bank words per item (pool slots p and p + 1).
+    blocked = np.zeros((p, p + 2), dtype=bool)
+    blocked[:, :p] = _bulk_rhyme_blocked(np, pairs, _INDEX.rhymes_by_word[key])
+    targets = rng.integers(p, size=n)
+    extras = rng.integers(len(words), size=(n, 2))
+    distractors = _bulk_distractors(np, rng, p + 2, targets, 3, blocked)
+    orders = _bulk_option_orders(np, rng, n, 4)
+    return targets, extras, distractors, orders
+
+
+def _bulk_rhyme_time_build(difficulty, lang, age, targets, extras, distractors, orders):
+    pairs = _INDEX.rhyme_subsets[(_lang_key(lang), _clamp_difficulty(difficulty))]
+    words = get_word_bank(difficulty, lang, age)
+    time_limit = max(3, 10 - difficulty)
+    p = len(pairs)
+    hint = _t("rhyme_hint", lang)
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        word, correct = pairs[targets[row]]
+        slots = [correct] + [
+            pairs[d][1] if d < p else words[extras[row][d - p]] for d in distractors[row] if d >= 0
+        ]
+        q = f"{_t('which_rhymes', lang)} '{word}';" if lang == "el" else f"Which word rhymes with '{word}'?"
+        return {
+            "index": index, "question": q, "options": [slots[o] for o in orders[row] if o < len(slots)],
+            "correct_answer": correct, "hint": hint, "item_type": "speed_round",
+            "extra_data": {"time_limit_seconds": time_limit, "target_word": word},
+        }
+    return build
+
+
+def _bulk_word_sound_match(np, rng, difficulty, n, per_session, lang, age):
+    key = _lang_key(lang)
+    pairs = _INDEX.rhyme_subsets[(key, _clamp_difficulty(difficulty))]
+    words = get_word_bank(difficulty, lang, age)
+    blocked = _bulk_rhyme_blocked(np, pairs, _INDEX.rhymes_by_word[key])
+    targets = rng.integers(len(pairs), size=n)
+    distractors = _bulk_distractors(np, rng, len(pairs), targets, 2, blocked)
+    fill = rng.integers(len(words), size=(n, 2))
+    orders = _bulk_option_orders(np, rng, n, 3)
+    return targets, distractors, fill, orders
+
+
+def _bulk_word_sound_match_build(difficulty, lang, age, targets, distractors, fill, orders):
+    pairs = _INDEX.rhyme_subsets[(_lang_key(lang), _clamp_difficulty(difficulty))]
+    words = get_word_bank(difficulty, lang, age)
+    tts_lang = "el-GR" if lang == "el" else "en-US"
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        target, correct = pairs[targets[row]]
+        slots = [correct] + [
+            pairs[d][1] if d >= 0 else words[fill[row][j]] for j, d in enumerate(distractors[row])
+        ]
+        if lang == "el":
+            q = f"{_t('which_sounds_same', lang)} '{target}';"
+            h = f"Άκουσε τον τελευταίο ήχο της λέξης '{target}'."
+        else:
+            q = f"Which word sounds like '{target}'?"
+            h = f"Listen to the ending sound of '{target}'."
+        return {
+            "index": index, "question": q, "options": [slots[o] for o in orders[row] if o < len(slots)],
+            "correct_answer": correct, "hint": h, "item_type": "word_sound_match",
+            "extra_data": {"target_word": target, "lang": tts_lang, "auto_play": True},
+        }
+    return build
+
+
+def _bulk_sound_matching(np, rng, difficulty, n, per_session, lang, age):
+    key = _lang_key(lang)
+    pairs = _INDEX.rhyme_subsets[(key, _clamp_difficulty(difficulty))]
+    sizes = np.array([len(_INDEX.non_rhymes[(key, i)]) for i in range(len(pairs))])
+    do_rhyme = rng.random(n) < 0.5
+    targets = rng.integers(len(pairs), size=n)
+    other = (rng.random(n) * sizes[targets]).astype(np.int64)
+    return do_rhyme, targets, other
+
+
+def _bulk_sound_matching_build(difficulty, lang, age, do_rhyme, targets, other):
+    key = _lang_key(lang)
+    pairs = _INDEX.rhyme_subsets[(key, _clamp_difficulty(difficulty))]
+    non_rhymes = [_INDEX.non_rhymes[(key, i)] for i in range(len(pairs))]
+    tts_lang = "el-GR" if lang == "el" else "en-US"
+    hint = "Άκουσε προσεκτικά τους τελικούς ήχους." if lang == "el" else "Listen carefully to the ending sounds."
+    question = _t("listen_same", lang)
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        p_idx = targets[row]
+        word1 = pairs[p_idx][0]
+        word2 = pairs[p_idx][1] if do_rhyme[row] else non_rhymes[p_idx][other[row]]
+        return {
+            "index": index, "question": question, "options": [word1, word2],
+            "correct_answer": "yes" if do_rhyme[row] else "no", "hint": hint, "item_type": "sound_matching",
+            "extra_data": {"word1": word1, "word2": word2, "lang": tts_lang, "auto_play": True},
+        }
+    return build
+
+
+def _bulk_flash_card(np, rng, difficulty, n, per_session, lang, age):
+    meanings = _INDEX.meanings[_lang_key(lang)]
+    targets = rng.integers(len(meanings), size=n)
+    distractors = _bulk_distractors(np, rng, len(meanings), targets, min(3, len(meanings) - 2))
+    orders = _bulk_option_orders(np, rng, n, distractors.shape[1] + 1)
+    return targets, distractors, orders
+
+
+def _bulk_flash_card_build(difficulty, lang, age, targets, distractors, orders):
+    meanings = _INDEX.meanings[_lang_key(lang)]
+    base_time = max(3, 10 - difficulty)
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        word, correct = meanings[targets[row]]
+        slots = [correct] + [meanings[d][1] for d in distractors[row]]
+        q = f"Τι σημαίνει '{word}';" if lang == "el" else f"What does '{word}' mean?"
+        return {
+            "index": index, "question": q, "options": [slots[o] for o in orders[row]],
+            "correct_answer": correct, "hint": None, "item_type": "speed_round",
+            "extra_data": {
+                "time_limit_seconds": max(2, base_time - (index // 3)),
+                "display_item": word,
+                "progressive_speed": True,
+            },
+        }
+    return build
+
+
+def _bulk_object_blitz(np, rng, difficulty, n, per_session, lang, age):
+    cards = _INDEX.images[_lang_key(lang)]
+    targets = rng.integers(len(cards), size=n)
+    distractors = _bulk_distractors(np, rng, len(cards), targets, 3)
+    orders = _bulk_option_orders(np, rng, n, distractors.shape[1] + 1)
+    return targets, distractors, orders
+
+
+def _bulk_object_blitz_build(difficulty, lang, age, targets, distractors, orders):
+    key = _lang_key(lang)
+    cards = _INDEX.images[key]
+    labels = _INDEX.image_labels_lower[key]
+    time_limit = max(2, 7 - difficulty)
+    question = _t("what_is_this", lang)
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        card = cards[targets[row]]
+        slots = [labels[targets[row]]] + [labels[d] for d in distractors[row]]
+        return {
+            "index": index, "question": question, "options": [slots[o] for o in orders[row]],
+            "correct_answer": slots[0], "hint": None, "item_type": "speed_round",
+            "extra_data": {
+                "time_limit_seconds": time_limit,
+                "display_image": card["url"],
+                "display_image_label": card["label"],
+            },
+        }
+    return build
+
+
+def _bulk_speed_namer(np, rng, difficulty, n, per_session, lang, age):
+    sequences = SPEED_NAMER_SEQUENCES[_lang_key(lang)]
+    seq_types = list(sequences)
+    # Like the template, one sequence type per session.
+    row_types = np.repeat(rng.integers(len(seq_types), size=n // per_session), per_session)
+    targets = np.zeros(n, dtype=np.int64)
+    distractors = np.full((n, 3), -1, dtype=np.int64)
+    for t, seq_type in enumerate(seq_types):
+        rows = np.flatnonzero(row_types == t)
+        if not len(rows):
+            continue
+        size = len(sequences[seq_type])
+        targets[rows] = rng.integers(size, size=len(rows))
+        distractors[rows] = _bulk_distractors(np, rng, size, targets[rows], 3)
+    orders = _bulk_option_orders(np, rng, n, 4)
+    return row_types, targets, distractors, orders
+
+
+def _bulk_speed_namer_build(difficulty, lang, age, row_types, targets, distractors, orders):
+    sequences = SPEED_NAMER_SEQUENCES[_lang_key(lang)]
+    seq_types = list(sequences)
+    time_limit = max(2, 8 - difficulty)
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        seq_type = seq_types[row_types[row]]
+        pool = sequences[seq_type]
+        target = pool[targets[row]]
+        slots = [target] + [pool[d] for d in distractors[row]]
+        return {
+            "index": index, "question": f"Quickly identify: {target}", "options": [slots[o] for o in orders[row]],
+            "correct_answer": target, "hint": None, "item_type": "speed_round",
+            "extra_data": {"time_limit_seconds": time_limit, "display_item": target, "category": seq_type},
+        }
+    return build
+
+
+def _bulk_sight_word_sprint(np, rng, difficulty, n, per_session, lang, age):
+    key = _lang_key(lang)
+    words = _INDEX.sight_words[(key, _clamp_difficulty(difficulty))]
+    lengths = np.array([len(w) for w in words])
+    targets = rng.integers(len(words), size=n)
+    # Three misspellings per item: one random position replaced by a random letter.
+    swap_pos = (rng.random((n, 3)) * lengths[targets][:, None]).astype(np.int64)
+    swap_letter = rng.integers(len(_INDEX.alphabets[key]), size=(n, 3))
+    orders = _bulk_option_orders(np, rng, n, 4)
+    return targets, swap_pos, swap_letter, orders
+
+
+def _bulk_sight_word_sprint_build(difficulty, lang, age, targets, swap_pos, swap_letter, orders):
+    key = _lang_key(lang)
+    words = _INDEX.sight_words[(key, _clamp_difficulty(difficulty))]
+    alphabet = _INDEX.alphabets[key]
+    time_limit = max(2, 6 - difficulty // 2)
+    question = _t("correct_spelling", lang)
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        word = words[targets[row]]
+        slots = [word]
+        for j in range(3):
+            if len(word) > 1:
+                pos = swap_pos[row][j]
+                slots.append(word[:pos] + alphabet[swap_letter[row][j]] + word[pos + 1:])
+            else:
+                slots.append(word)
+        return {
+            "index": index, "question": question, "options": [slots[o] for o in orders[row]],
+            "correct_answer": word, "hint": None, "item_type": "speed_round",
+            "extra_data": {"time_limit_seconds": time_limit, "display_item": word},
+        }
+    return build
+
+
+def _bulk_backward_spell(np, rng, difficulty, n, per_session, lang, age):
+    return (rng.integers(len(get_word_bank(difficulty, lang, age)), size=n),)
+
+
+def _bulk_backward_spell_build(difficulty, lang, age, targets):
+    words = get_word_bank(difficulty, lang, age)
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        word = words[targets[row]]
+        return {
+            "index": index, "question": f"Spell '{word}' backwards:", "options": [], "correct_answer": word[::-1],
+            "hint": f"The word has {len(word)} letters. Start from the last letter!", "item_type": "text_input",
+            "extra_data": {"original_word": word, "letter_count": len(word)},
+        }
+    return build
+
+
+def _bulk_read_aloud(np, rng, difficulty, n, per_session, lang, age):
+    real_words = get_word_bank(difficulty, lang, age)
+    pseudo_pool = PSEUDO_WORDS_EL if lang == "el" else PSEUDO_WORDS
+    pseudo_ratio = min(0.3 + difficulty * 0.05, 0.5)
+    is_pseudo = rng.random(n) < pseudo_ratio
+    real_idx = rng.integers(len(real_words), size=n)
+    pseudo_idx = rng.integers(len(pseudo_pool), size=n)
+    return is_pseudo, real_idx, pseudo_idx
+
+
+def _bulk_read_aloud_build(difficulty, lang, age, is_pseudo, real_idx, pseudo_idx):
+    real_words = get_word_bank(difficulty, lang, age)
+    pseudo_pool = PSEUDO_WORDS_EL if lang == "el" else PSEUDO_WORDS
+    hint = "Προσπάθησε να το διαβάσεις γράμμα-γράμμα." if lang == "el" else "Sound it out letter by letter if you're unsure."
+    question = _t("read_word", lang)
+    tts_lang = "el-GR" if lang == "el" else "en-US"
+
+    def build(row: int, index: int) -> Dict[str, Any]:
+        pseudo = is_pseudo[row]
+        word = pseudo_pool[pseudo_idx[row]] if pseudo else real_words[real_idx[row]]
+        return {
+            "index": index, "question": question, "options": [], "correct_answer": word.lower(), "hint": hint,
+            "item_type": "read_aloud",
+            "extra_data": {
+                "word": word,
+                "is_pseudo_word": pseudo,
+                "lang": tts_lang,
+                "show_hint_audio": True,
+                "max_attempts": 2,
+            },
+        }
+    return build
+
+
+# game_id -> (sampler, builder)
+_BULK_SAMPLERS = {
+    "sound_safari": (_bulk_sound_safari, _bulk_sound_safari_build),
+    "rhyme_time_race": (_bulk_rhyme_time, _bulk_rhyme_time_build),
+    "word_sound_match": (_bulk_word_sound_match, _bulk_word_sound_match_build),
+    "sound_matching": (_bulk_sound_matching, _bulk_sound_matching_build),
+    "speed_namer": (_bulk_speed_namer, _bulk_speed_namer_build),
+    "flash_card_frenzy": (_bulk_flash_card, _bulk_flash_card_build),
+    "object_blitz": (_bulk_object_blitz, _bulk_object_blitz_build),
+    "sight_word_sprint": (_bulk_sight_word_sprint, _bulk_sight_word_sprint_build),
+    "backward_spell": (_bulk_backward_spell, _bulk_backward_spell_build),
+    "decoding_read_aloud": (_bulk_read_aloud, _bulk_read_aloud_build),
+}
+
+def generate_bulk_items(
+    game_id: str,
+    difficulty_level: int,
+    sessions: int,
+    items_per_session: int,
+    lang: str = "en",
+    student_age: int | None = None,
+    seed: int | None = None,
+) -> BulkItemSet:
+    """Generate `sessions` × `items_per_session` template items for a game in one vectorized pass.
+
+    Only games in BULK_GAME_IDS are supported. The same seed always yields the
+    same item sets. Items are built when a session is read, as ExerciseItem
+    objects or (session_dicts/dicts) as the dicts sessions store.
+    """
+    spec = GENERATORS.get(game_id)
+    if spec is None or spec.bulk is None:
+        raise ValueError(f"Bulk generation is not supported for game '{game_id}'")
+    if sessions < 1 or items_per_session < 1:
+        raise ValueError("sessions and items_per_session must be positive")
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    n = sessions * items_per_session
+    arrays = spec.bulk(np, rng, difficulty_level, n, items_per_session, lang, student_age)
+    return BulkItemSet(
+        game_id, sessions, items_per_session, difficulty_level, lang, student_age, _bulk_compact(np, *arrays),
+    )
+
+
+async def generate_bulk_sessions(
+    game_id: str,
+    difficulty_level: int,
+    sessions: int,
+    items_per_session: int,
+    lang: str = "en",
+    student_age: int | None = None,
+    seed: int | None = None,
+) -> BulkItemSet:
+    """generate_bulk_items in the CPU process pool, off the event loop.
+
+    Only the sampled index arrays come back; read sessions with session_dicts
+    (the stored layout) or session, which build that session's items.
+    """
+    return await executors.run_cpu(
+        "bulk", generate_bulk_items, game_id, difficulty_level, sessions, items_per_session,
+        lang=lang, student_age=student_age, seed=seed,
+    )
+
+
+# =============================================================================
+# GENERATOR REGISTRY
+# =============================================================================
+#
+# One GeneratorSpec per game_id, built once at import. Dispatch, bulk
+# generation, history warm-up and the benchmarks all read from here.
+
+AI_HEAVY = "heavy"    # qwen3-vl:8b — stories, comprehension, inference
+AI_LIGHT = "light"    # qwen3-vl:4b — words, sounds, phrases
+
+COST_CPU = "cpu"              # template only, a few µs per item
+COST_HISTORY = "history"      # template that awaits the student's passage history
+COST_LLM_LIGHT = "llm_light"  # tries the light model first (seconds)
+COST_LLM_HEAVY = "llm_heavy"  # tries the heavy model first (seconds)
+
+_BILINGUAL = ("en", "el")
+_ENGLISH = ("en",)
+
+
+@dataclass(frozen=True)
+class GeneratorSpec:
+    """How items for one game are generated."""
+
+    game_id: str
+    # (difficulty, count, ctx) -> items, or an awaitable of items
+    template: Callable[..., Any]
+    is_async: bool
+    # (difficulty, count, ctx) -> items, or None when the LLM is unavailable
+    ai: Optional[Callable[[int, int, GenerationContext], Awaitable[Optional[List[ExerciseItem]]]]]
+    ai_tier: Optional[str]
+    ai_languages: Tuple[str, ...]
+    # Languages the template output is localized in
+    languages: Tuple[str, ...]
+    # Reads the request's student age or content history
+    needs_student: bool
+    # Novelty content types warmed from content_history before the template runs
+    content_types: Tuple[str, ...]
+    cost: str
+    # Vectorized sampler used by generate_bulk_items, and the builder of its items
+    bulk: Optional[Callable[..., Any]]
+    bulk_build: Optional[Callable[..., Any]]
+
+
+def _spec(
+    game_id: str,
+    template: Callable[..., Any],
+    *,
+    ai: Optional[Callable[[int, int, GenerationContext], Awaitable[Optional[List[ExerciseItem]]]]] = None,
+    ai_tier: Optional[str] = None,
+    languages: Tuple[str, ...] = _BILINGUAL,
+    content_types: Tuple[str, ...] = (),
+    uses_age: bool = False,
+) -> GeneratorSpec:
+    is_async = inspect.iscoroutinefunction(template)
+    if ai_tier == AI_HEAVY:
+        cost = COST_LLM_HEAVY
+    elif ai_tier == AI_LIGHT:
+        cost = COST_LLM_LIGHT
+    else:
+        cost = COST_HISTORY if is_async else COST_CPU
+    bulk, bulk_build = _BULK_SAMPLERS.get(game_id, (None, None))
+    return GeneratorSpec(
+        game_id=game_id,
+        template=template,
+        is_async=is_async,
+        ai=ai,
+        ai_tier=ai_tier,
+        ai_languages=_ENGLISH if ai else (),
+        languages=languages,
+        needs_student=uses_age or bool(content_types),
+        content_types=content_types,
+        cost=cost,
+        bulk=bulk,
+        bulk_build=bulk_build,
+    )
+
+
+_PASSAGE = ("passage",)
+
+GENERATORS: Dict[str, GeneratorSpec] = {spec.game_id: spec for spec in (
+    # Heavy model games (story / comprehension / inference)
+    _spec("story_recall", _gen_story_recall, ai=_gen_story_recall_ai, ai_tier=AI_HEAVY,
+          content_types=_PASSAGE, uses_age=True),
+    _spec("question_quest", _gen_question_quest, ai=_gen_question_quest_ai, ai_tier=AI_HEAVY,
+          content_types=_PASSAGE, uses_age=True),
+    _spec("repeated_reader", _gen_repeated_reader, ai=_gen_repeated_reader_ai, ai_tier=AI_HEAVY,
+          content_types=_PASSAGE, uses_age=True),
+    _spec("main_idea_hunter", _gen_main_idea_hunter, ai=_gen_main_idea_hunter_ai, ai_tier=AI_HEAVY),
+    _spec("inference_detective", _gen_inference_detective, ai=_gen_inference_detective_ai, ai_tier=AI_HEAVY,
+          languages=_ENGLISH),
+    _spec("vocabulary_builder", _gen_vocabulary_builder, ai=_gen_vocabulary_builder_ai, ai_tier=AI_HEAVY),
+    _spec("story_sequencer", _gen_story_sequencer, ai=_gen_story_sequencer_ai, ai_tier=AI_HEAVY,
+          languages=_ENGLISH),
+    _spec("prosody_practice", _gen_prosody_practice, ai=_gen_prosody_practice_ai, ai_tier=AI_HEAVY),
+    # Light model games (words / sounds / phrases)
+    _spec("sound_safari", _gen_sound_safari, ai=_gen_sound_safari_ai, ai_tier=AI_LIGHT,
+          content_types=("word",), uses_age=True),
+    _spec("rhyme_time_race", _gen_rhyme_time, ai=_gen_rhyme_time_ai, ai_tier=AI_LIGHT,
+          content_types=("rhyme",), uses_age=True),
+    _spec("syllable_stomper", _gen_syllable_stomper, ai=_gen_syllable_stomper_ai, ai_tier=AI_LIGHT),
+    _spec("phoneme_blender", _gen_phoneme_blender, ai=_gen_phoneme_blender_ai, ai_tier=AI_LIGHT,
+          uses_age=True),
+    _spec("sound_swap", _gen_sound_swap, ai=_gen_sound_swap_ai, ai_tier=AI_LIGHT, uses_age=True),
+    _spec("flash_card_frenzy", _gen_flash_card, ai=_gen_flash_card_ai, ai_tier=AI_LIGHT,
+          content_types=("word",)),
+    _spec("phrase_flash", _gen_phrase_flash, ai=_gen_phrase_flash_ai, ai_tier=AI_LIGHT,
+          content_types=("phrase",), uses_age=True),
+    _spec("word_ladder", _gen_word_ladder, ai=_gen_word_ladder_ai, ai_tier=AI_LIGHT, languages=_ENGLISH),
+    # Template-only games
+    _spec("sound_matching", _gen_sound_matching, content_types=("rhyme",)),
+    _spec("word_sound_match", _gen_word_sound_match, content_types=("rhyme",), uses_age=True),
+    _spec("speed_namer", _gen_speed_namer),
+    _spec("object_blitz", _gen_object_blitz, content_types=("image",)),
+    _spec("letter_stream", _gen_letter_stream),
+    _spec("ran_grid", _gen_rapid_naming),
+    _spec("memory_matrix", _gen_memory_matrix, languages=_ENGLISH),
+    _spec("sequence_keeper", _gen_sequence_keeper, languages=_ENGLISH),
+    _spec("backward_spell", _gen_backward_spell, content_types=("word",), uses_age=True),
+    _spec("dual_task_challenge", _gen_dual_task, languages=_ENGLISH, uses_age=True),
+    _spec("memory_recall", _gen_memory_recall),
+    _spec("letter_detective", _gen_letter_detective),
+    _spec("tracking_trail", _gen_tracking_trail, languages=_ENGLISH),
+    _spec("pattern_matcher", _gen_pattern_matcher, languages=_ENGLISH),
+    _spec("mirror_image", _gen_mirror_image),
+    _spec("visual_closure", _gen_visual_closure, uses_age=True),
+    _spec("sight_word_sprint", _gen_sight_word_sprint, content_types=("word",)),
+    _spec("decoding_read_aloud", _gen_read_aloud, content_types=("word",), uses_age=True),
+    _spec("word_image_match", _gen_word_image_match, content_types=("image",)),
+    _spec("castle_challenge", _gen_castle_challenge),
+)}
+
+# Unknown game ids fall back to a generic word exercise
+_DEFAULT_SPEC = _spec("default", _gen_default, uses_age=True)
+
+BULK_GAME_IDS = frozenset(game_id for game_id, spec in GENERATORS.items() if spec.bulk is not None)
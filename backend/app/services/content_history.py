@@ -0,0 +1,390 @@
+"""
+Per-student novelty engine for anti-repetition, backed by content_history.
+
+The generators ask "what has this student seen recently?" on every pick of a
+passage, word, phrase, rhyme or image. Instead of a DB round trip per pick:
+
+  - every content type has a ContentSpace that gives each content key (a
+    passage hash, a word, an image id...) a dense integer id; the pools of
+    the precomputed content index are registered at import
+  - each (student, content type) keeps a RecentRing: the last N ids shown, in
+    order, plus a bitset over the space for O(1) "seen?" tests
+  - a ring is warmed from content_history once, on first use (all content
+    types of a student in one query), and updated in memory on every pick
+  - picks are queued for a write-behind batch insert, flushed by a background
+    task; after each flush the touched students' history is pruned to the
+    newest HISTORY_KEEP rows per content type, so the table stays bounded
+  - NoveltyPicker draws pool positions whose ids are not in the ring by
+    rejection sampling, so a pick costs O(1) expected time no matter how
+    much history the student has
+
+Each worker process has its own cache; history written by another worker is
+picked up the next time this worker warms that student.
+"""
+
+import asyncio
+import logging
+import random
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app import database as db
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+RECENT_LIMIT = 50          # default ids per (student, content type) treated as "recent"
+HISTORY_KEEP = 200         # rows per (student, content type) kept in content_history
+MAX_CACHED = 20_000        # (student, content type) rings kept in memory (LRU)
+FLUSH_INTERVAL = 2.0       # seconds between write-behind flushes
+FLUSH_BATCH = 1_000        # max rows per INSERT
+MAX_PENDING = 50_000       # queued rows kept while the DB is unreachable
+PICK_TRIES = 8             # random draws per pick before scanning the pool
+
+# The recent window per content type, sized against the pools a single game
+# draws from so that students still get unseen content most of the time.
+RECENT_LIMITS: Dict[str, int] = {
+    "passage": 50,
+    "word": 60,
+    "phrase": 20,
+    "rhyme": 12,
+    "image": 6,
+}
+
+NOVELTY_TYPES: Tuple[str, ...] = ("passage", "word", "phrase", "rhyme", "image")
+
+
+# ─── Content ids ─────────────────────────────────────────────────────────────
+
+class ContentSpace:
+    """Dense integer ids for the content keys of one content type."""
+
+    __slots__ = ("_ids", "keys", "_pools")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        # id(pool) -> (pool, ids); the pool is kept so its id() stays valid
+        self._pools: Dict[int, Tuple[Sequence, Tuple[int, ...]]] = {}
+
+    def id(self, key: str) -> int:
+        content_id = self._ids.get(key)
+        if content_id is None:
+            content_id = self._ids[key] = len(self.keys)
+            self.keys.append(key)
+        return content_id
+
+    def pool_ids(self, pool: Sequence, key: Callable[[object], str] = str) -> Tuple[int, ...]:
+        """Ids of a pool's entries, computed once per pool object.
+
+        Pools are the immutable tuples of the content index (or module-level
+        lists), so they are cached by identity instead of re-hashing entries.
+        """
+        cached = self._pools.get(id(pool))
+        if cached is not None and cached[0] is pool:
+            return cached[1]
+        ids = tuple(self.id(key(entry)) for entry in pool)
+        self._pools[id(pool)] = (pool, ids)
+        return ids
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+_SPACES: Dict[str, ContentSpace] = {}
+
+
+def space(content_type: str) -> ContentSpace:
+    """The id space of a content type, created on first use."""
+    content_space = _SPACES.get(content_type)
+    if content_space is None:
+        content_space = _SPACES[content_type] = ContentSpace()
+    return content_space
+
+
+class RecentRing:
+    """Bounded FIFO of content ids with a bitset for O(1) membership tests."""
+
+    __slots__ = ("_order", "_bits")
+
+    def __init__(self, ids: Iterable[int] = (), maxlen: int = RECENT_LIMIT):
+        self._order: deque = deque(maxlen=maxlen)
+        self._bits = bytearray()
+        for content_id in ids:
+            self.add(content_id)
+
+    def seen(self, content_id: int) -> bool:
+        byte = content_id >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (content_id & 7)))
+
+    def add(self, content_id: int) -> None:
+        """Mark an id as the most recently shown, evicting the oldest when full."""
+        if self.seen(content_id):
+            # Re-shown while still recent (the pool ran out): move it to the end.
+            self._order.remove(content_id)
+        elif len(self._order) == self._order.maxlen:
+            self._clear(self._order.popleft())
+        self._order.append(content_id)
+        byte = content_id >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        self._bits[byte] |= 1 << (content_id & 7)
+
+    def _clear(self, content_id: int) -> None:
+        self._bits[content_id >> 3] &= ~(1 << (content_id & 7)) & 0xFF
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self):
+        """Ids oldest first."""
+        return iter(self._order)
+
+
+# ─── Picking ─────────────────────────────────────────────────────────────────
+
+class NoveltyPicker:
+    """Draws positions from one pool, preferring content the student hasn't seen.
+
+    Each pick is recorded immediately, so later picks of the same call (and
+    later calls) avoid it too. Positions are not repeated within a picker
+    until the pool is exhausted. Without a ring (no student) picks are
+    plain uniform draws.
+    """
+
+    __slots__ = (
+        "_history", "_student_id", "_content_type", "_space", "_ring", "_ids", "_size", "_rng", "_taken", "_fallback",
+    )
+
+    def __init__(
+        self,
+        history: "ContentHistory",
+        student_id: Optional[str],
+        content_type: str,
+        ring: Optional[RecentRing],
+        ids: Tuple[int, ...],
+        size: int,
+        rng: random.Random = random,
+    ):
+        self._history = history
+        self._student_id = student_id
+        self._content_type = content_type
+        self._space = space(content_type)
+        self._ring = ring
+        self._ids = ids
+        self._size = size
+        self._rng = rng
+        self._taken: set = set()
+        self._fallback: Optional[List[int]] = None
+
+    def __call__(self) -> int:
+        """The pool position of the next item."""
+        n = self._size
+        if self._ring is None:
+            return self._rng.randrange(n)
+        ring, ids, taken = self._ring, self._ids, self._taken
+        if len(taken) >= n:
+            taken.clear()
+            self._fallback = None
+        pos = -1
+        if self._fallback is None:
+            for _ in range(PICK_TRIES):
+                candidate = self._rng.randrange(n)
+                if candidate not in taken and not ring.seen(ids[candidate]):
+                    pos = candidate
+                    break
+            else:
+                self._fallback = self._ranked_candidates()
+        if pos < 0:
+            while self._fallback:
+                candidate = self._fallback.pop()
+                if candidate not in taken:
+                    pos = candidate
+                    break
+            else:
+                pos = self._rng.randrange(n)
+        taken.add(pos)
+        content_id = ids[pos]
+        ring.add(content_id)
+        self._history._queue(self._student_id, self._content_type, self._space.keys[content_id])
+        return pos
+
+    def _ranked_candidates(self) -> List[int]:
+        """Untaken positions ordered so pop() yields unseen ones first, then the least recent.
+
+        Only reached when random draws keep hitting seen content, i.e. most
+        of a small pool is in the recent window; costs O(pool + window).
+        """
+        ring, ids, taken = self._ring, self._ids, self._taken
+        unseen = [p for p in range(len(ids)) if p not in taken and not ring.seen(ids[p])]
+        self._rng.shuffle(unseen)
+        positions: Dict[int, List[int]] = {}
+        for p, content_id in enumerate(ids):
+            if p not in taken and ring.seen(content_id):
+                positions.setdefault(content_id, []).append(p)
+        # Newest seen first, so the oldest are popped right after the unseen ones.
+        stale = [p for content_id in reversed(list(ring)) for p in positions.get(content_id, ())]
+        return stale + unseen
+
+
+# ─── History cache ───────────────────────────────────────────────────────────
+
+class ContentHistory:
+    """In-memory recent-content rings with write-behind persistence."""
+
+    def __init__(self):
+        self._rings: "OrderedDict[Tuple[str, str], RecentRing]" = OrderedDict()
+        self._warming: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._pending: List[Tuple[str, str, str, datetime]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def peek(self, student_id: str, content_type: str) -> Optional[RecentRing]:
+        """The ring for a student if it is already warm, without touching the DB."""
+        key = (student_id, content_type)
+        ring = self._rings.get(key)
+        if ring is not None:
+            self._rings.move_to_end(key)
+        return ring
+
+    async def recent(self, student_id: str, content_type: str) -> RecentRing:
+        """The student's recent ids; hits the DB only the first time a key is seen."""
+        ring = self.peek(student_id, content_type)
+        if ring is None:
+            await self.warm(student_id, (content_type,))
+            ring = self.peek(student_id, content_type)
+            if ring is None:  # evicted between warm-up and now
+                ring = self._store((student_id, content_type), _new_ring(content_type))
+        return ring
+
+    async def warm(self, student_id: str, content_types: Iterable[str]) -> None:
+        """Load every cold ring of a student in one DB query (shared with concurrent callers)."""
+        keys = [(student_id, ctype) for ctype in content_types if (student_id, ctype) not in self._rings]
+        metrics.cache_lookup("content_history", not keys)
+        if not keys:
+            return
+        missing = [key for key in keys if key not in self._warming]
+        if missing:
+            task = asyncio.ensure_future(self._warm(student_id, [key[1] for key in missing]))
+            for key in missing:
+                self._warming[key] = task
+        tasks = {self._warming[key] for key in keys if key in self._warming}
+        if tasks:
+            await asyncio.shield(asyncio.gather(*tasks))
+
+    async def _warm(self, student_id: str, content_types: List[str]) -> None:
+        try:
+            limit = max(RECENT_LIMITS.get(ctype, RECENT_LIMIT) for ctype in content_types)
+            try:
+                by_type = await db.get_recent_content_by_type(student_id, content_types, limit=limit)
+            except Exception as exc:
+                logger.warning("Could not load content history for %s: %s", student_id, exc)
+                by_type = {}
+            for ctype in content_types:
+                content_space = space(ctype)
+                ring = _new_ring(ctype)
+                # Newest first from the DB; replay oldest first so ring order matches.
+                for content_hash in reversed(by_type.get(ctype, [])[:ring_limit(ctype)]):
+                    ring.add(content_space.id(content_hash))
+                # Keep anything recorded for this key while the read was in flight.
+                for sid, pending_type, content_hash, _ in self._pending:
+                    if sid == student_id and pending_type == ctype:
+                        ring.add(content_space.id(content_hash))
+                self._store((student_id, ctype), ring)
+        finally:
+            for ctype in content_types:
+                self._warming.pop((student_id, ctype), None)
+
+    def _store(self, key: Tuple[str, str], ring: RecentRing) -> RecentRing:
+        self._rings[key] = ring
+        self._rings.move_to_end(key)
+        while len(self._rings) > MAX_CACHED:
+            self._rings.popitem(last=False)
+        return ring
+
+    def picker(
+        self,
+        student_id: Optional[str],
+        content_type: str,
+        pool: Sequence,
+        key: Callable[[object], str] = str,
+        rng: random.Random = random,
+    ) -> NoveltyPicker:
+        """A NoveltyPicker over pool for a student whose rings were warmed beforehand.
+
+        Generators are synchronous, so this never reads the DB: without a
+        student, or before warm() ran for them, picks are uniformly random.
+        """
+        ring = self.peek(student_id, content_type) if student_id else None
+        ids = space(content_type).pool_ids(pool, key) if ring is not None else ()
+        return NoveltyPicker(self, student_id, content_type, ring, ids, len(pool), rng)
+
+    def _queue(self, student_id: str, content_type: str, content_hash: str) -> None:
+        self._pending.append((student_id, content_type, content_hash, datetime.now(timezone.utc)))
+        if len(self._pending) > MAX_PENDING:
+            # History is best-effort: drop the oldest rows rather than grow without bound.
+            del self._pending[:len(self._pending) - MAX_PENDING]
+
+    async def flush(self) -> int:
+        """Write queued rows in batches, then prune the touched students' history."""
+        written = 0
+        touched: set = set()
+        while self._pending:
+            batch, self._pending = self._pending[:FLUSH_BATCH], self._pending[FLUSH_BATCH:]
+            try:
+                written += await db.record_content_usage_batch(batch)
+                touched.update(row[0] for row in batch)
+            except Exception as exc:
+                # Put the batch back and retry on the next flush.
+                self._pending[:0] = batch
+                logger.warning("Content history flush failed (%d rows pending): %s", len(self._pending), exc)
+                break
+            except BaseException:
+                # Cancelled mid-write (e.g. stop() during a loop flush): keep the
+                # batch so the final flush writes it.
+                self._pending[:0] = batch
+                raise
+        if touched:
+            try:
+                await db.prune_content_history(sorted(touched), HISTORY_KEEP)
+            except Exception as exc:
+                logger.warning("Content history prune failed: %s", exc)
+        return written
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher (called from the app lifespan)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop(), name="content-history-flush")
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+def ring_limit(content_type: str) -> int:
+    return RECENT_LIMITS.get(content_type, RECENT_LIMIT)
+
+
+def _new_ring(content_type: str) -> RecentRing:
+    return RecentRing(maxlen=ring_limit(content_type))
+
+
+history = ContentHistory()
+
+metrics.track_cache_size("content_history", lambda: len(history._rings))
+metrics.gauge(
+    "eyeradar_content_history_pending", "History rows waiting for the write-behind flush",
+    callback=lambda: {(): float(len(history._pending))},
+)
@@ -0,0 +1,100 @@
+"""
+Managed executors for work that must not run on the event loop.
+
+Each uvicorn worker runs a single event loop; a 200 ms PDF parse on it
+stalls every other request of that worker. Work is offloaded here instead:
+
+  - CPU-bound work (PDF text extraction, base64 encoding of uploads, bulk
+    item generation) runs in a process pool, so it doesn't hold the GIL
+    of the serving process
+  - blocking I/O runs in a thread pool
+
+Every call names a task type, and each task type has its own concurrency
+limit, so one kind of work (e.g. a burst of PDF uploads) can't take every
+pool slot. Functions sent to the process pool must be picklable
+module-level functions.
+
+The pools are created in the app lifespan (start/shutdown). Outside the app
+(scripts, benchmarks) calls fall back to the default thread pool.
+
+Event-loop lag is measured by app.services.instrumentation.LoopLagMonitor.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROCESS_WORKERS = int(os.getenv("EXECUTOR_PROCESSES", str(max(1, min(2, (os.cpu_count() or 2) // 2)))))
+THREAD_WORKERS = int(os.getenv("EXECUTOR_THREADS", "8"))
+
+# Concurrent tasks allowed per task type (per uvicorn worker)
+TASK_LIMITS: Dict[str, int] = {
+    "pdf": 2,
+    "encode": 4,
+    "bulk": 2,
+    "io": 8,
+    "tts_cache": 8,
+}
+DEFAULT_TASK_LIMIT = 2
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _semaphore(task_type: str) -> asyncio.Semaphore:
+    sem = _semaphores.get(task_type)
+    if sem is None:
+        sem = _semaphores[task_type] = asyncio.Semaphore(TASK_LIMITS.get(task_type, DEFAULT_TASK_LIMIT))
+    return sem
+
+
+async def _run(executor: Optional[Executor], task_type: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    call = partial(fn, *args, **kwargs) if kwargs else fn
+    call_args = () if kwargs else args
+    async with _semaphore(task_type):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, call, *call_args)
+
+
+async def run_cpu(task_type: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a CPU-bound, picklable function in the process pool."""
+    return await _run(_process_pool, task_type, fn, *args, **kwargs)
+
+
+async def run_io(task_type: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking I/O function in the thread pool."""
+    return await _run(_thread_pool, task_type, fn, *args, **kwargs)
+
+
+def start() -> None:
+    """Create the pools (called from the app lifespan)."""
+    global _process_pool, _thread_pool
+    if _process_pool is None:
+        # spawn, not fork: forking a process that runs an event loop and
+        # threads (asyncpg, the thread pool) can deadlock the child.
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+        )
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="eyeradar-io")
+    logger.info("Executors ready (%d processes, %d threads)", PROCESS_WORKERS, THREAD_WORKERS)
+
+
+def shutdown() -> None:
+    """Shut the pools down, cancelling queued work."""
+    global _process_pool, _thread_pool
+    for pool in (_process_pool, _thread_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _process_pool = _thread_pool = None
+    _semaphores.clear()
+
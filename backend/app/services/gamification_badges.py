@@ -1,8 +1,16 @@
 """
 Badge definitions for the gamification system.
 21 badges across 4 categories: Progress, Mastery, Consistency, Special.
+
+Each automatically awarded badge has a rule in BADGE_RULES that names the
+progress counters it reads, so an event only re-checks the badges whose
+counters it changed.
 """
 
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Collection, Dict, FrozenSet, List, Mapping, Optional
+
 from app.models import Badge
 
 BADGES: dict[str, dict] = {
@@ -163,15 +171,98 @@ BADGES: dict[str, dict] = {
 }
 
 
+# Unearned Badge models, built once; shared, so never mutate them
+BADGE_TEMPLATES: dict[str, Badge] = {
+    bid: Badge(id=bid, earned=False, **bdata) for bid, bdata in BADGES.items()
+}
+ALL_BADGES: list[Badge] = list(BADGE_TEMPLATES.values())
+
+
 def get_all_badges() -> list[Badge]:
+    return ALL_BADGES
+
+
+def get_badge(badge_id: str) -> Badge | None:
+    return BADGE_TEMPLATES.get(badge_id)
+
+
+def build_badge_view(earned: Collection[str], earned_at: Mapping[str, Optional[datetime]]) -> list[Badge]:
+    """Every badge in catalog order, with the earned ones marked and dated."""
+    if not earned:
+        return ALL_BADGES
     return [
-        Badge(id=bid, earned=False, **bdata)
-        for bid, bdata in BADGES.items()
+        template.model_copy(update={"earned": True, "earned_at": earned_at.get(bid)}) if bid in earned else template
+        for bid, template in BADGE_TEMPLATES.items()
     ]
 
 
-def get_badge(badge_id: str) -> Badge | None:
-    bdata = BADGES.get(badge_id)
-    if bdata is None:
-        return None
-    return Badge(id=badge_id, **bdata)
+# ─── Award Rules ─────────────────────────────────────────────────────────────
+
+# Counters: completed_sessions, areas_played, points (balance), level, streak,
+# session_accuracy (the session just completed), and per deficit area
+# "<area>.sessions" and "<area>.accuracy" (mean over completed sessions).
+
+@dataclass(frozen=True)
+class BadgeRule:
+    """A badge is earned once test() passes on the counters it reads."""
+
+    counters: FrozenSet[str]
+    test: Callable[[Mapping[str, Any]], bool]
+
+
+def at_least(counter: str, threshold: float) -> BadgeRule:
+    return BadgeRule(frozenset({counter}), lambda c: c.get(counter, 0) >= threshold)
+
+
+def area_mastery(area: str, min_sessions: int = 5, min_accuracy: float = 0.90) -> BadgeRule:
+    sessions, accuracy = f"{area}.sessions", f"{area}.accuracy"
+    return BadgeRule(
+        frozenset({sessions, accuracy}),
+        lambda c: c.get(sessions, 0) >= min_sessions and c.get(accuracy, 0) >= min_accuracy,
+    )
+
+
+# speed_learner has no rule yet: nothing counts sessions per day
+BADGE_RULES: Dict[str, BadgeRule] = {
+    "first_steps": at_least("completed_sessions", 1),
+    "getting_started": at_least("completed_sessions", 5),
+    "dedicated_learner": at_least("completed_sessions", 25),
+    "champion": at_least("completed_sessions", 100),
+    "sound_master": area_mastery("phonological_awareness"),
+    "speed_demon": area_mastery("rapid_naming"),
+    "memory_champion": area_mastery("working_memory"),
+    "eagle_eye": area_mastery("visual_processing"),
+    "fluent_reader": area_mastery("reading_fluency"),
+    "comprehension_king": area_mastery("comprehension"),
+    "three_day_streak": at_least("streak", 3),
+    "week_warrior": at_least("streak", 7),
+    "two_week_champion": at_least("streak", 14),
+    "month_master": at_least("streak", 30),
+    "perfect_score": at_least("session_accuracy", 1.0),
+    "level_up": at_least("level", 5),
+    "level_up_10": at_least("level", 10),
+    "all_rounder": at_least("areas_played", 6),
+    "point_collector": at_least("points", 500),
+    "point_master": at_least("points", 5000),
+}
+assert BADGE_RULES.keys() <= BADGES.keys(), "badge rule without a definition"
+
+# counter -> badges whose rule reads it, in BADGES order
+RULES_BY_COUNTER: Dict[str, List[str]] = {}
+for _badge_id in BADGES:
+    if _badge_id in BADGE_RULES:
+        for _counter in BADGE_RULES[_badge_id].counters:
+            RULES_BY_COUNTER.setdefault(_counter, []).append(_badge_id)
+
+
+def evaluate_badges(changed: Mapping[str, Any], earned: Collection[str]) -> List[str]:
+    """Badges newly earned after the counters in `changed` took these values.
+
+    Only rules reading one of those counters are checked; `changed` must hold
+    every counter such a rule reads.
+    """
+    candidates = {bid for counter in changed for bid in RULES_BY_COUNTER.get(counter, ())}
+    return [
+        bid for bid in BADGES
+        if bid in candidates and bid not in earned and BADGE_RULES[bid].test(changed)
+    ]
@@ -2,12 +2,19 @@
 Gamification service: points, levels, streaks, and badge checking.
 """
 
-from datetime import datetime, date
-from typing import Dict, List, Optional, Any
+import asyncio
+import logging
+import os
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
 from app.models import LevelInfo, GamificationSummary, Badge
-from app.services.gamification_badges import BADGES, get_all_badges
+from app.services import metrics
+from app.services.gamification_badges import build_badge_view, evaluate_badges
 from app import database as db
 
+logger = logging.getLogger(__name__)
+
 
 # ─── Points System ────────────────────────────────────────────────────────────
 
@@ -50,40 +57,106 @@ LEVEL_TITLES = {
     40: "Grandmaster", 45: "Mythic", 50: "Transcendent",
 }
 
+# Highest reachable level; raise it to keep long-running students progressing
+MAX_LEVEL = int(os.getenv("LEVEL_MAX", "50"))
+
+
+class LevelCurve:
+    """XP thresholds and titles for levels 1..max_level, computed once.
+
+    Reaching level L takes int(base * L ** exponent) XP. Level lookups are a
+    bisect over the precomputed thresholds instead of a walk from level 1.
+    """
+
+    def __init__(
+        self,
+        max_level: int = 50,
+        base: float = 100,
+        exponent: float = 1.5,
+        titles: Optional[Dict[int, str]] = None,
+    ):
+        if max_level < 1:
+            raise ValueError("max_level must be at least 1")
+        self.max_level = max_level
+        self.base = base
+        self.exponent = exponent
+        titles = titles or LEVEL_TITLES
+        self._title_levels = sorted(titles)
+        self._title_names = [titles[level] for level in self._title_levels]
+        # thresholds[i] is the XP for level i + 1; one past the cap for its progress bar
+        self.thresholds = [self.xp_for_level(level) for level in range(1, max_level + 2)]
+        self.titles = [self._lookup_title(level) for level in range(1, max_level + 1)]
+
+    def xp_for_level(self, level: int) -> int:
+        return int(self.base * (level ** self.exponent))
+
+    def _lookup_title(self, level: int) -> str:
+        i = bisect_right(self._title_levels, level)
+        return self._title_names[i - 1] if i else "Beginner"
+
+    def title(self, level: int) -> str:
+        if 1 <= level <= self.max_level:
+            return self.titles[level - 1]
+        return self._lookup_title(level)
+
+    def level_for_xp(self, xp: int) -> int:
+        # Levels 2..max_level are reached at thresholds[1..max_level - 1]
+        return bisect_right(self.thresholds, xp, 1, self.max_level)
+
+    def _info(self, level: int, xp: int, progress: float) -> LevelInfo:
+        return LevelInfo(
+            level=level,
+            title=self.titles[level - 1],
+            xp=xp,
+            xp_for_next_level=self.thresholds[level],
+            progress_percent=round(max(0, min(100, progress)), 1),
+        )
+
+    def level_info(self, xp: int) -> LevelInfo:
+        level = self.level_for_xp(xp)
+        current_xp_threshold = self.thresholds[level - 1]
+        xp_needed = self.thresholds[level] - current_xp_threshold
+        progress = ((xp - current_xp_threshold) / xp_needed * 100) if xp_needed > 0 else 100
+        return self._info(level, xp, progress)
+
+    def level_infos(self, xps: Sequence[int]) -> List[LevelInfo]:
+        """level_info for many students at once (e.g. a classroom), in one array pass."""
+        import numpy as np
+
+        xp = np.asarray(xps, dtype=np.int64)
+        thresholds = np.asarray(self.thresholds, dtype=np.int64)
+        levels = np.searchsorted(thresholds[1:self.max_level], xp, side="right") + 1
+        current = thresholds[levels - 1]
+        needed = thresholds[levels] - current
+        with np.errstate(divide="ignore", invalid="ignore"):
+            progress = np.where(needed > 0, (xp - current) / needed * 100, 100.0)
+        return [
+            self._info(level, int(x), p)
+            for level, x, p in zip(levels.tolist(), xp.tolist(), progress.tolist())
+        ]
+
+
+LEVEL_CURVE = LevelCurve(max_level=MAX_LEVEL)
+
 
 def xp_for_level(level: int) -> int:
     """Calculate XP required to reach a given level."""
-    return int(100 * (level ** 1.5))
+    return LEVEL_CURVE.xp_for_level(level)
 
 
 def get_level_title(level: int) -> str:
     """Get the title for a given level."""
-    title = "Beginner"
-    for threshold, t in sorted(LEVEL_TITLES.items()):
-        if level >= threshold:
-            title = t
-    return title
+    return LEVEL_CURVE.title(level)
 
 
-def calculate_level_info(xp: int) -> LevelInfo:
+def calculate_level_info(xp: int, curve: Optional[LevelCurve] = None) -> LevelInfo:
     """Calculate level info from total XP."""
-    level = 1
-    while level < 50 and xp >= xp_for_level(level + 1):
-        level += 1
-
-    current_xp_threshold = xp_for_level(level)
-    next_xp_threshold = xp_for_level(level + 1)
-    xp_in_level = xp - current_xp_threshold
-    xp_needed = next_xp_threshold - current_xp_threshold
-    progress = (xp_in_level / xp_needed * 100) if xp_needed > 0 else 100
-
-    return LevelInfo(
-        level=level,
-        title=get_level_title(level),
-        xp=xp,
-        xp_for_next_level=next_xp_threshold,
-        progress_percent=round(max(0, min(100, progress)), 1),
-    )
+    return (curve or LEVEL_CURVE).level_info(xp)
+
+
+def calculate_level_infos(xps: Sequence[int], curve: Optional[LevelCurve] = None) -> List[LevelInfo]:
+    """Calculate level info for a list of XP totals, in the same order."""
+    return (curve or LEVEL_CURVE).level_infos(xps)
 
 
 # ─── Streak System ───────────────────────────────────────────────────────────
@@ -93,127 +166,81 @@ async def update_streak(student_id: str) -> tuple[int, int]:
     Update the student's streak based on today's activity.
     Returns (current_streak, longest_streak).
     """
-    student = await db.get_student(student_id)
-    if not student:
-        return 0, 0
-
-    today = date.today().isoformat()
-    last_session_date = student.get("last_session_date")
-    current_streak = student.get("current_streak", 0)
-    longest_streak = student.get("longest_streak", 0)
-
-    if last_session_date == today:
-        # Already played today, no change
-        return current_streak, longest_streak
-
-    yesterday = date.today().replace(day=date.today().day - 1) if date.today().day > 1 else date.today()
-    yesterday_str = yesterday.isoformat()
-
-    if last_session_date == yesterday_str:
-        current_streak += 1
-    elif last_session_date is None:
-        current_streak = 1
-    else:
-        current_streak = 1  # Streak broken
-
-    longest_streak = max(longest_streak, current_streak)
-
-    await db.update_student(student_id, {
-        "current_streak": current_streak,
-        "longest_streak": longest_streak,
-        "last_session_date": today,
-    })
-
-    return current_streak, longest_streak
+    return await db.update_streak(student_id) or (0, 0)
 
 
 # ─── Badge Checking ──────────────────────────────────────────────────────────
 
 async def check_and_award_badges(
     student_id: str,
-    session_data: Optional[Dict[str, Any]] = None,
+    changed: Dict[str, Any],
+    earned: Collection[str] = (),
 ) -> List[str]:
     """
-    Check all badge conditions and award new badges.
+    Award the badges whose rules read a counter in `changed` and now pass.
     Returns list of newly earned badge IDs.
     """
-    student = await db.get_student(student_id)
-    if not student:
-        return []
+    new_badges = evaluate_badges(changed, earned)
+    if new_badges:
+        new_badges = await db.award_student_badges(student_id, new_badges)
+    return new_badges
 
-    current_badges = set(student.get("badges", []))
-    new_badges = []
-    stats = await db.get_student_stats(student_id)
-    total_sessions = stats.get("completed_sessions", 0)
-    total_points = student.get("total_points", 0)
-    current_streak = student.get("current_streak", 0)
-    level = student.get("level", 1)
-
-    # Progress badges
-    if total_sessions >= 1 and "first_steps" not in current_badges:
-        new_badges.append("first_steps")
-    if total_sessions >= 5 and "getting_started" not in current_badges:
-        new_badges.append("getting_started")
-    if total_sessions >= 25 and "dedicated_learner" not in current_badges:
-        new_badges.append("dedicated_learner")
-    if total_sessions >= 100 and "champion" not in current_badges:
-        new_badges.append("champion")
-
-    # Mastery badges
-    mastery_map = {
-        "phonological_awareness": "sound_master",
-        "rapid_naming": "speed_demon",
-        "working_memory": "memory_champion",
-        "visual_processing": "eagle_eye",
-        "reading_fluency": "fluent_reader",
-        "comprehension": "comprehension_king",
+
+async def award_session_badges(
+    student: Dict[str, Any],
+    deficit_area: str,
+    accuracy: float,
+    total_points: int,
+    level: int,
+    streak: int,
+) -> List[str]:
+    """
+    Count a completed session and award the badges it unlocks.
+    `student` is the row as read before the session's updates.
+    """
+    counts = await db.record_completed_session(student["id"], deficit_area, accuracy)
+    changed: Dict[str, Any] = {
+        "completed_sessions": counts["completed_sessions"],
+        "areas_played": counts["areas_played"],
+        f"{deficit_area}.sessions": counts["area_sessions"],
+        f"{deficit_area}.accuracy": counts["area_accuracy_sum"] / counts["area_sessions"],
+        "session_accuracy": accuracy,
     }
-    for area, badge_id in mastery_map.items():
-        if badge_id not in current_badges:
-            area_stats = await db.get_deficit_area_stats(student_id, area)
-            if area_stats.get("sessions", 0) >= 5 and area_stats.get("avg_accuracy", 0) >= 0.90:
-                new_badges.append(badge_id)
-
-    # Consistency badges
-    if current_streak >= 3 and "three_day_streak" not in current_badges:
-        new_badges.append("three_day_streak")
-    if current_streak >= 7 and "week_warrior" not in current_badges:
-        new_badges.append("week_warrior")
-    if current_streak >= 14 and "two_week_champion" not in current_badges:
-        new_badges.append("two_week_champion")
-    if current_streak >= 30 and "month_master" not in current_badges:
-        new_badges.append("month_master")
-
-    # Special badges
-    if session_data and session_data.get("accuracy", 0) >= 1.0 and "perfect_score" not in current_badges:
-        new_badges.append("perfect_score")
-
-    if level >= 5 and "level_up" not in current_badges:
-        new_badges.append("level_up")
-    if level >= 10 and "level_up_10" not in current_badges:
-        new_badges.append("level_up_10")
-
-    if total_points >= 500 and "point_collector" not in current_badges:
-        new_badges.append("point_collector")
-    if total_points >= 5000 and "point_master" not in current_badges:
-        new_badges.append("point_master")
-
-    # All-rounder check
-    if "all_rounder" not in current_badges:
-        areas_played = set()
-        sessions = await db.get_student_sessions(student_id, limit=200)
-        for s in sessions:
-            if s.get("status") == "completed":
-                areas_played.add(s.get("deficit_area"))
-        if len(areas_played) >= 6:
-            new_badges.append("all_rounder")
-
-    # Save new badges
-    if new_badges:
-        all_badges = list(current_badges | set(new_badges))
-        await db.update_student(student_id, {"badges": all_badges})
+    if total_points != student.get("total_points"):
+        changed["points"] = total_points
+    if level != student.get("level"):
+        changed["level"] = level
+    if streak != student.get("current_streak"):
+        changed["streak"] = streak
+    return await check_and_award_badges(student["id"], changed, student.get("badges") or [])
 
-    return new_badges
+
+# ─── Badge Views ─────────────────────────────────────────────────────────────
+
+MAX_BADGE_VIEWS = 10_000  # students whose badge list is kept in memory (LRU)
+
+# student id -> (earned badge ids, badge list); awards only ever append to
+# students.badges, so an unchanged id list means the cached view is current
+_badge_views: "OrderedDict[str, Tuple[Tuple[str, ...], List[Badge]]]" = OrderedDict()
+metrics.track_cache_size("badge_view", lambda: len(_badge_views))
+
+
+async def get_student_badge_view(student: Dict[str, Any]) -> List[Badge]:
+    """All badges with the student's earned ones marked, from a student row."""
+    earned = tuple(student.get("badges") or ())
+    cached = _badge_views.get(student["id"])
+    metrics.cache_lookup("badge_view", cached is not None and cached[0] == earned)
+    if cached is not None and cached[0] == earned:
+        _badge_views.move_to_end(student["id"])
+        return cached[1]
+
+    earned_at = await db.get_student_badges(student["id"]) if earned else {}
+    view = build_badge_view(earned, earned_at)
+    _badge_views[student["id"]] = (earned, view)
+    _badge_views.move_to_end(student["id"])
+    while len(_badge_views) > MAX_BADGE_VIEWS:
+        _badge_views.popitem(last=False)
+    return view
 
 
 async def get_gamification_summary(student_id: str) -> Optional[GamificationSummary]:
@@ -225,15 +252,7 @@ async def get_gamification_summary(student_id: str) -> Optional[GamificationSumm
     stats = await db.get_student_stats(student_id)
     level_info = calculate_level_info(student.get("xp", 0))
 
-    # Build badge list with earned status
-    earned_badges = set(student.get("badges", []))
-    badges = []
-    for bid, bdata in BADGES.items():
-        badges.append(Badge(
-            id=bid,
-            earned=bid in earned_badges,
-            **bdata,
-        ))
+    badges = await get_student_badge_view(student)
 
     return GamificationSummary(
         student_id=student_id,
@@ -245,3 +264,26 @@ async def get_gamification_summary(student_id: str) -> Optional[GamificationSumm
         total_sessions=stats.get("completed_sessions") or 0,
         total_correct=stats.get("total_correct") or 0,
     )
+
+
+# ─── Maintenance ─────────────────────────────────────────────────────────────
+
+async def recompute_streaks() -> int:
+    """Rebuild every student's streaks from session history; returns students updated."""
+    updated = await db.recompute_streaks()
+    logger.info("Recomputed streaks for %d students", updated)
+    return updated
+
+
+async def _run_recompute_streaks() -> None:
+    await db.init_db()
+    try:
+        await recompute_streaks()
+    finally:
+        await db.close_db()
+
+
+if __name__ == "__main__":
+    # Nightly or after imports: python -m app.services.gamification_service
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_recompute_streaks())
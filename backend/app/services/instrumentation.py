@@ -0,0 +1,304 @@
+"""
+Request and event-loop instrumentation.
+
+  - Spans: every db.* call, outbound httpx request and generator invocation is
+    timed into a per-dependency histogram, and added to the current request's
+    RequestTrace (held in a ContextVar, so concurrent requests never mix).
+    The log_requests middleware prints the per-dependency totals.
+  - LoopLagMonitor: samples how late the event loop wakes from a short sleep.
+  - SlowCallbackWatchdog: a thread that notices when the loop has not run the
+    lag sampler for SLOW_CALLBACK_MS and logs the loop thread's stack, i.e.
+    the code that is blocking the loop right now.
+
+Everything is exposed through app.services.metrics at /metrics.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "250"))
+
+REQUEST_SECONDS = metrics.histogram(
+    "eyeradar_request_seconds", "HTTP request latency by route template, status and caller role",
+    ("method", "route", "status", "role"),
+)
+REQUEST_BYTES = metrics.histogram(
+    "eyeradar_request_bytes", "HTTP request body size (Content-Length)", ("method", "route"), metrics.SIZE_BUCKETS,
+)
+RESPONSE_BYTES = metrics.histogram(
+    "eyeradar_response_bytes", "HTTP response body size (Content-Length)", ("method", "route"), metrics.SIZE_BUCKETS,
+)
+DEPENDENCY_SECONDS = metrics.histogram(
+    "eyeradar_dependency_seconds", "Time spent in a dependency call", ("dependency", "operation"),
+)
+DEPENDENCY_ERRORS = metrics.counter(
+    "eyeradar_dependency_errors_total", "Dependency calls that raised", ("dependency", "operation"),
+)
+LOOP_LAG_SECONDS = metrics.histogram(
+    "eyeradar_event_loop_lag_seconds", "How late the event loop woke from a scheduled sleep",
+)
+SLOW_CALLBACKS = metrics.counter(
+    "eyeradar_slow_callbacks_total", "Times the event loop was blocked for longer than SLOW_CALLBACK_MS",
+)
+
+
+# ─── Per-request trace ───────────────────────────────────────────────────────
+
+class RequestTrace:
+    """Call count and seconds per dependency for one request, and the caller's role."""
+
+    __slots__ = ("totals", "role")
+
+    def __init__(self):
+        self.totals: Dict[str, List[float]] = {}
+        self.role = "anonymous"
+
+    def add(self, dependency: str, seconds: float) -> None:
+        entry = self.totals.get(dependency)
+        if entry is None:
+            self.totals[dependency] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def summary(self) -> str:
+        """e.g. 'db=3/12ms http=1/840ms'"""
+        return " ".join(
+            f"{dep}={int(count)}/{seconds * 1000:.0f}ms" for dep, (count, seconds) in self.totals.items()
+        )
+
+    # Pass the trace itself as a log argument: it is only formatted if the record is emitted
+    __str__ = summary
+
+
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+# Dependency of the innermost open span, so nested calls (a db function calling
+# another) are not counted twice in the request totals
+_active: ContextVar[Optional[str]] = ContextVar("active_dependency", default=None)
+
+
+def begin_request() -> RequestTrace:
+    trace = RequestTrace()
+    _trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _trace.get()
+
+
+def tag_role(role: str) -> None:
+    """Label the current request's metrics with the authenticated caller's role."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.role = role
+
+
+class span:
+    """Time a dependency call: ``with span("db", "get_student"): ...`` (sync or async code).
+
+    A plain class rather than @contextmanager: it runs around every db call,
+    and a generator-based context manager costs several times as much.
+    """
+
+    __slots__ = ("dependency", "operation", "_token", "_outer", "_start")
+
+    def __init__(self, dependency: str, operation: str):
+        self.dependency = dependency
+        self.operation = operation
+
+    def __enter__(self) -> "span":
+        self._outer = _active.get() != self.dependency
+        self._token = _active.set(self.dependency)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        _active.reset(self._token)
+        labels = (self.dependency, self.operation)
+        DEPENDENCY_SECONDS.observe(elapsed, labels)
+        if exc_type is not None:
+            DEPENDENCY_ERRORS.inc(labels)
+        if self._outer:
+            trace = _trace.get()
+            if trace is not None:
+                trace.add(self.dependency, elapsed)
+
+
+def traced(dependency: str, operation: str, fn: Callable) -> Callable:
+    """Wrap a coroutine function so every call runs in a span."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(dependency, operation):
+            return await fn(*args, **kwargs)
+
+    wrapper.__wrapped_span__ = True
+    return wrapper
+
+
+def instrument_module(namespace: Dict[str, Any], dependency: str, exclude: Iterable[str] = ()) -> None:
+    """Replace the public coroutine functions of a module (its globals()) with traced wrappers."""
+    skip = set(exclude)
+    for name, obj in list(namespace.items()):
+        if (
+            name.startswith("_") or name in skip or not inspect.iscoroutinefunction(obj)
+            or getattr(obj, "__wrapped_span__", False) or obj.__module__ != namespace.get("__name__")
+        ):
+            continue
+        namespace[name] = traced(dependency, name, obj)
+
+
+def instrument_httpx() -> None:
+    """Time every outbound httpx.AsyncClient request, labelled by host."""
+    import httpx
+
+    send = httpx.AsyncClient.send
+    if getattr(send, "__wrapped_span__", False):
+        return
+
+    @functools.wraps(send)
+    async def traced_send(self, request, *args, **kwargs):
+        with span("http", request.url.host or "unknown"):
+            return await send(self, request, *args, **kwargs)
+
+    traced_send.__wrapped_span__ = True
+    httpx.AsyncClient.send = traced_send
+
+
+def content_length(headers: List[Tuple[bytes, bytes]]) -> Optional[int]:
+    """Content-Length from raw ASGI headers (cheaper than building a Headers object)."""
+    for name, value in headers:
+        if name == b"content-length":
+            return int(value) if value.isdigit() else None
+    return None
+
+
+def observe_request(
+    method: str,
+    route: str,
+    status: int,
+    role: str,
+    seconds: float,
+    request_bytes: Optional[int] = None,
+    response_bytes: Optional[int] = None,
+) -> None:
+    REQUEST_SECONDS.observe(seconds, (method, route, str(status), role))
+    labels = (method, route)
+    if request_bytes is not None:
+        REQUEST_BYTES.observe(request_bytes, labels)
+    if response_bytes is not None:
+        RESPONSE_BYTES.observe(response_bytes, labels)
+
+
+# ─── Event-loop lag ──────────────────────────────────────────────────────────
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes from a short sleep."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples = 0
+        self.total = 0.0
+        self.max = 0.0
+        # perf_counter of the last time the loop ran the sampler (read by the watchdog)
+        self.heartbeat = time.perf_counter()
+        self.loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        self.loop_thread_id = threading.get_ident()
+        while True:
+            start = self.heartbeat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.samples += 1
+            self.total += lag
+            self.max = max(self.max, lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self.heartbeat = time.perf_counter()
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset(self) -> None:
+        self.samples, self.total, self.max = 0, 0.0, 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """Mean and max lag in milliseconds since the last reset."""
+        mean = self.total / self.samples if self.samples else 0.0
+        return {"samples": self.samples, "mean_ms": mean * 1000, "max_ms": self.max * 1000}
+
+
+loop_lag = LoopLagMonitor()
+
+
+# ─── Slow-callback watchdog ──────────────────────────────────────────────────
+
+class SlowCallbackWatchdog:
+    """Logs the loop thread's stack when the loop is blocked longer than a threshold.
+
+    asyncio's own slow-callback warning only works in debug mode and reports
+    after the fact; this captures the stack while the loop is still blocked.
+    One report per blocking episode.
+    """
+
+    def __init__(self, monitor: LoopLagMonitor, threshold_ms: float = SLOW_CALLBACK_MS):
+        self.monitor = monitor
+        self.threshold = threshold_ms / 1000
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _capture(self) -> str:
+        frame = sys._current_frames().get(self.monitor.loop_thread_id)
+        return "".join(traceback.format_stack(frame)) if frame is not None else "<no stack>"
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self.monitor.heartbeat
+            blocked = time.perf_counter() - beat - self.monitor.interval
+            if blocked < self.threshold or beat == reported_beat or self.monitor.loop_thread_id is None:
+                continue
+            reported_beat = beat
+            SLOW_CALLBACKS.inc()
+            logger.warning("Event loop blocked for %.0fms; loop thread stack:\n%s", blocked * 1000, self._capture())
+
+    def start(self) -> None:
+        if self._thread is None and self.threshold > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="slow-callback-watchdog", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+watchdog = SlowCallbackWatchdog(loop_lag)
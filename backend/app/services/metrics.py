@@ -0,0 +1,338 @@
+"""
+In-process metrics (counters, gauges, fixed-bucket histograms) rendered in the
+Prometheus text exposition format at /metrics.
+
+Metrics are module-level singletons registered in REGISTRY. Label values are
+passed as a tuple in the order of the metric's label names:
+
+    REQUEST_SECONDS.observe(0.012, ("GET", "/api/v1/games", "200", "teacher"))
+
+Updates take no locks: each metric is written from one thread (the event
+loop, or the watchdog thread for its own counter), and a render that races a
+write is off by at most that one observation.
+
+Each uvicorn worker keeps its own registry. MetricsExporter writes a snapshot
+of it to METRICS_DIR every few seconds, and /metrics sums the live registry
+with the other workers' snapshots, so a scrape that lands on either worker
+sees the whole service. /metrics?scope=worker returns this worker only.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services import executors
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[str, ...]
+
+METRICS_DIR = Path(os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), "eyeradar-metrics")))
+EXPORT_INTERVAL = float(os.getenv("METRICS_EXPORT_INTERVAL", "5"))
+# Snapshots older than this belong to a worker that is gone
+STALE_AFTER = EXPORT_INTERVAL * 3
+
+# Seconds; covers sub-millisecond cache hits up to slow LLM calls
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+# Bytes; from tiny JSON replies to uploaded assessment PDFs
+SIZE_BUCKETS: Tuple[float, ...] = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def collect(self) -> Dict[Labels, Any]:
+        """Current value per label set (a float, or a list for histograms)."""
+        return {}
+
+    def samples(self, values: Dict[Labels, Any]) -> Iterable[str]:
+        for labels, value in values.items():
+            yield f"{self.name}{_label_str(self.labelnames, labels)} {_fmt(value)}"
+
+    def render(self, values: Optional[Dict[Labels, Any]] = None) -> List[str]:
+        values = self.collect() if values is None else values
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples(values)]
+
+
+class Counter(Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def collect(self) -> Dict[Labels, Any]:
+        return dict(self._values)
+
+
+class Gauge(Metric):
+    """Current value per label set, set directly or read from a callback at collect time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[Labels, float]]] = None,
+    ):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+    def collect(self) -> Dict[Labels, Any]:
+        values = dict(self._values)
+        if self._callback is not None:
+            try:
+                values.update(self._callback())
+            except Exception as exc:
+                logger.warning("Gauge %s callback failed: %s", self.name, exc)
+        return values
+
+
+class Histogram(Metric):
+    """Fixed-bucket histogram per label set.
+
+    Each series is a flat list: one count per bucket (the last one is +Inf),
+    then the running sum, so observe() is a bisect and two additions.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, labels: Labels = ()) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def collect(self) -> Dict[Labels, Any]:
+        return {labels: list(series) for labels, series in self._series.items()}
+
+    def samples(self, values: Dict[Labels, Any]) -> Iterable[str]:
+        bounds = [*self.buckets, float("inf")]
+        for labels, series in values.items():
+            cumulative = 0.0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = f'le="{_fmt(bound)}"'
+                yield f"{self.name}_bucket{_label_str(self.labelnames, labels, le)} {_fmt(cumulative)}"
+            label_str = _label_str(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {_fmt(series[-1])}"
+            yield f"{self.name}_count{label_str} {_fmt(cumulative)}"
+
+
+def _merge(into: Dict[Labels, Any], values: Dict[Labels, Any]) -> None:
+    for labels, value in values.items():
+        current = into.get(labels)
+        if current is None:
+            into[labels] = list(value) if isinstance(value, list) else value
+        elif isinstance(current, list):
+            if len(current) == len(value):
+                into[labels] = [a + b for a, b in zip(current, value)]
+        else:
+            into[labels] = current + value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Dict[str, Dict[Labels, Any]]:
+        return {name: metric.collect() for name, metric in self._metrics.items()}
+
+    def render(self, others: Sequence[Dict[str, Dict[Labels, Any]]] = ()) -> str:
+        """Prometheus text for this registry, summed with other workers' snapshots."""
+        lines: List[str] = []
+        for name, metric in self._metrics.items():
+            values = metric.collect()
+            for other in others:
+                _merge(values, other.get(name, {}))
+            lines.extend(metric.render(values))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))
+
+
+def gauge(
+    name: str,
+    help: str,
+    labelnames: Sequence[str] = (),
+    callback: Optional[Callable[[], Dict[Labels, float]]] = None,
+) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labelnames, callback))
+
+
+def histogram(
+    name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))
+
+
+# ─── Cache stats ─────────────────────────────────────────────────────────────
+
+_cache_sizes: Dict[str, Callable[[], int]] = {}
+
+CACHE_REQUESTS = counter("eyeradar_cache_requests_total", "Cache lookups by result", ("cache", "result"))
+CACHE_ENTRIES = gauge(
+    "eyeradar_cache_entries", "Entries currently held per cache", ("cache",),
+    callback=lambda: {(name,): float(size()) for name, size in _cache_sizes.items()},
+)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc((cache, "hit" if hit else "miss"))
+
+
+def track_cache_size(cache: str, size: Callable[[], int]) -> None:
+    """Report len(cache) under eyeradar_cache_entries{cache=...}."""
+    _cache_sizes[cache] = size
+
+
+# ─── Cross-worker aggregation ────────────────────────────────────────────────
+
+def _encode(snapshot: Dict[str, Dict[Labels, Any]]) -> str:
+    return json.dumps({name: [[list(labels), value] for labels, value in values.items()]
+                       for name, values in snapshot.items()})
+
+
+def _decode(raw: str) -> Dict[str, Dict[Labels, Any]]:
+    return {name: {tuple(labels): value for labels, value in series}
+            for name, series in json.loads(raw).items()}
+
+
+def _write_snapshot(path: Path, payload: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(payload)
+    os.replace(tmp, path)
+
+
+def _read_snapshots(directory: Path, own: Path) -> List[Dict[str, Dict[Labels, Any]]]:
+    snapshots = []
+    now = time.time()
+    for path in directory.glob("*.json"):
+        if path == own:
+            continue
+        try:
+            if now - path.stat().st_mtime > STALE_AFTER:
+                path.unlink(missing_ok=True)
+                continue
+            snapshots.append(_decode(path.read_text()))
+        except (OSError, ValueError) as exc:
+            logger.debug("Skipping metrics snapshot %s: %s", path, exc)
+    return snapshots
+
+
+class MetricsExporter:
+    """Periodically publishes this worker's registry for the other workers' /metrics."""
+
+    def __init__(self, registry: Registry = REGISTRY, directory: Path = METRICS_DIR):
+        self.registry = registry
+        self.directory = directory
+        self.path = directory / f"{os.getpid()}.json"
+        self._task: Optional[asyncio.Task] = None
+
+    async def export(self) -> None:
+        payload = _encode(self.registry.snapshot())
+        try:
+            await executors.run_io("io", _write_snapshot, self.path, payload)
+        except OSError as exc:
+            logger.warning("Could not write metrics snapshot: %s", exc)
+
+    async def render(self) -> str:
+        """This worker's live metrics summed with every other worker's last snapshot."""
+        others = await executors.run_io("io", _read_snapshots, self.directory, self.path)
+        return self.registry.render(others)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(EXPORT_INTERVAL)
+            await self.export()
+
+    def start(self) -> None:
+        # The pid is only final once uvicorn has forked/spawned this worker
+        self.path = self.directory / f"{os.getpid()}.json"
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(), name="metrics-exporter")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.path.unlink(missing_ok=True)
+
+
+exporter = MetricsExporter()
@@ -0,0 +1,118 @@
+"""
+Points ledger maintenance: rebuild the derived balances and check them.
+
+points_ledger is the source of truth for points. Each entry stores the
+student's balance after it (balance_after), points_balances holds the running
+total per student, and students.total_points mirrors it for reads. The append
+paths in app.database keep all three in step; these jobs rebuild them from the
+ledger (after imports or manual fixes) and verify them.
+
+    python -m app.services.points_ledger check      # exit 1 on any mismatch
+    python -m app.services.points_ledger rebuild
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List, Optional
+
+from app import database as db
+
+logger = logging.getLogger(__name__)
+
+MAX_EXAMPLES = 20  # mismatches kept in the report; the rest are only counted
+
+
+class _Report:
+    def __init__(self, max_examples: int):
+        self.max_examples = max_examples
+        self.students = 0
+        self.entries = 0
+        self.mismatches: Dict[str, int] = {}
+        self.examples: List[str] = []
+
+    def mismatch(self, kind: str, student_id: str, detail: str) -> None:
+        self.mismatches[kind] = self.mismatches.get(kind, 0) + 1
+        if len(self.examples) < self.max_examples:
+            self.examples.append(f"{kind} {student_id}: {detail}")
+
+    def close_student(self, row, running: int, entries: int, last_seq: Optional[int]) -> None:
+        self.students += 1
+        sid = row["student_id"]
+        if entries and row["balance"] is None:
+            self.mismatch("snapshot_missing", sid, f"{entries} entries, no points_balances row")
+        elif row["balance"] is not None and (row["balance"], row["entries"], row["last_seq"]) != (running, entries, last_seq):
+            self.mismatch("snapshot", sid, f"points_balances ({row['balance']}, {row['entries']}, "
+                                           f"{row['last_seq']}) != ledger ({running}, {entries}, {last_seq})")
+        if (row["total_points"] or 0) != running:
+            self.mismatch("total_points", sid, f"students.total_points {row['total_points']} != ledger {running}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "students": self.students,
+            "entries": self.entries,
+            "mismatches": dict(self.mismatches),
+            "examples": list(self.examples),
+        }
+
+
+async def check_points_ledger(max_examples: int = MAX_EXAMPLES) -> Dict[str, Any]:
+    """Replay the ledger and compare every derived value with it.
+
+    Checks each entry's balance_after, each student's points_balances row
+    and students.total_points. Streams the ledger once, in student and seq
+    order, keeping only the current student's running sum in memory.
+    """
+    report = _Report(max_examples)
+    current = None
+    running = entries = 0
+    last_seq: Optional[int] = None
+    async for row in db.iter_points_audit():
+        if current is None or row["student_id"] != current["student_id"]:
+            if current is not None:
+                report.close_student(current, running, entries, last_seq)
+            current, running, entries, last_seq = row, 0, 0, None
+        if row["seq"] is None:
+            continue
+        running += row["amount"]
+        entries += 1
+        last_seq = row["seq"]
+        report.entries += 1
+        if row["balance_after"] != running:
+            report.mismatch("balance_after", row["student_id"],
+                            f"entry {row['seq']} has {row['balance_after']}, running sum {running}")
+    if current is not None:
+        report.close_student(current, running, entries, last_seq)
+    return report.as_dict()
+
+
+async def rebuild_points_balances() -> None:
+    """Recompute every derived balance from the ledger."""
+    await db.rebuild_points_balances()
+    logger.info("Rebuilt points balances from the ledger")
+
+
+async def _run(command: str) -> int:
+    await db.init_db()
+    try:
+        if command == "rebuild":
+            await rebuild_points_balances()
+            return 0
+        result = await check_points_ledger()
+        logger.info("Checked %d ledger entries of %d students", result["entries"], result["students"])
+        for example in result["examples"]:
+            logger.warning("%s", example)
+        if result["mismatches"]:
+            logger.error("Ledger mismatches: %s", result["mismatches"])
+            return 1
+        return 0
+    finally:
+        await db.close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("check", "rebuild"))
+    sys.exit(asyncio.run(_run(parser.parse_args().command)))
@@ -0,0 +1,251 @@
+"""
+In-memory shop catalog and owned-item sets, kept current with LISTEN/NOTIFY.
+
+The catalog changes a few times a year and is read on every shop visit, so
+instead of querying shop_items per request:
+
+  - the active items are loaded into an immutable CatalogSnapshot with a
+    version number, per-category slices and each slice's JSON body and ETag
+    already computed, so a request only picks a prepared body (or a 304)
+  - each student's owned item ids are cached the same way (LRU), with their
+    own body and ETag
+  - triggers on shop_items and user_purchases NOTIFY "shop_changed"; a
+    dedicated listener connection reloads the catalog or drops a student's
+    owned set when one arrives, in every worker
+
+ETags are content hashes, so both workers hand out the same tag for the same
+catalog. While the listener is not connected nothing is cached: every read
+goes to the database until it is back, so a missed notification can never
+leave a worker serving stale data.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from app import database as db
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "shop_changed"
+MAX_OWNED = 10_000        # students whose owned-item set is kept in memory (LRU)
+RECONNECT_DELAY = 5.0     # seconds between listener reconnect attempts
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+# ─── Snapshots ───────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Body:
+    """A prepared JSON response body and its ETag."""
+
+    content: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, value: Any) -> "Body":
+        content = _dumps(value)
+        return cls(content, _etag(content))
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """The active shop items at one version. Shared between requests; never mutated."""
+
+    version: int
+    items: Tuple[Mapping[str, Any], ...]
+    # category -> items, in cost order
+    by_category: Mapping[str, Tuple[Mapping[str, Any], ...]]
+    # category (None for the whole catalog) -> prepared body
+    bodies: Mapping[Optional[str], Body]
+
+    @classmethod
+    def build(cls, version: int, rows: List[Dict[str, Any]]) -> "CatalogSnapshot":
+        items = tuple(MappingProxyType(dict(row)) for row in rows)
+        grouped: Dict[str, List[Mapping[str, Any]]] = {}
+        for item in items:
+            grouped.setdefault(item["category"], []).append(item)
+        by_category = {category: tuple(group) for category, group in grouped.items()}
+        bodies: Dict[Optional[str], Body] = {None: Body.of([dict(item) for item in items])}
+        for category, group in by_category.items():
+            bodies[category] = Body.of([dict(item) for item in group])
+        return cls(version, items, MappingProxyType(by_category), MappingProxyType(bodies))
+
+    def body(self, category: Optional[str] = None) -> Body:
+        """The prepared body for a category (empty list for an unknown one)."""
+        return self.bodies.get(category) or _EMPTY
+
+
+_EMPTY = Body.of([])
+
+
+@dataclass(frozen=True)
+class Owned:
+    """A student's owned item ids and their prepared body."""
+
+    item_ids: FrozenSet[str]
+    body: Body
+
+
+# ─── Cache ───────────────────────────────────────────────────────────────────
+
+class ShopCatalog:
+    """Catalog snapshot and per-student owned sets, invalidated by NOTIFY."""
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        # The last snapshot loaded, cached or not; an unchanged reload keeps its version
+        self._latest: Optional[CatalogSnapshot] = None
+        self._loading: Optional[asyncio.Task] = None
+        self._stale = False
+        self._owned: "OrderedDict[str, Owned]" = OrderedDict()
+        self._owned_loads: Dict[str, asyncio.Task] = {}
+        self._listening = False
+        self._task: Optional[asyncio.Task] = None
+
+    # ── Catalog ──
+
+    async def snapshot(self) -> CatalogSnapshot:
+        """The current catalog; loads it on first use or after a change."""
+        snapshot = self._snapshot
+        metrics.cache_lookup("shop_catalog", snapshot is not None)
+        if snapshot is not None:
+            return snapshot
+        if self._loading is None or self._loading.done():
+            self._loading = asyncio.ensure_future(self._load())
+        return await asyncio.shield(self._loading)
+
+    async def _load(self) -> CatalogSnapshot:
+        while True:
+            self._stale = False
+            rows = await db.get_shop_items()
+            latest = self._latest
+            snapshot = CatalogSnapshot.build(latest.version + 1 if latest else 1, rows)
+            if latest is not None and latest.bodies[None] == snapshot.bodies[None]:
+                snapshot = latest
+            else:
+                self._latest = snapshot
+                logger.info("Shop catalog v%d loaded: %d items", snapshot.version, len(snapshot.items))
+            # A change notified while the query ran may not be in these rows
+            if not self._stale:
+                if self._listening:
+                    self._snapshot = snapshot
+                return snapshot
+
+    def _catalog_changed(self) -> None:
+        self._stale = True
+        self._snapshot = None
+        if self._listening and (self._loading is None or self._loading.done()):
+            # Warm the new version now rather than on the next request
+            self._loading = asyncio.ensure_future(self._load())
+            self._loading.add_done_callback(_log_failure)
+
+    # ── Owned items ──
+
+    async def owned(self, student_id: str) -> Owned:
+        """The item ids a student owns, with their prepared body."""
+        owned = self._owned.get(student_id)
+        metrics.cache_lookup("shop_owned", owned is not None)
+        if owned is not None:
+            self._owned.move_to_end(student_id)
+            return owned
+        task = self._owned_loads.get(student_id)
+        if task is None:
+            task = self._owned_loads[student_id] = asyncio.ensure_future(self._load_owned(student_id))
+        return await asyncio.shield(task)
+
+    async def _load_owned(self, student_id: str) -> Owned:
+        try:
+            item_ids = await db.get_student_purchases(student_id)
+            owned = Owned(frozenset(item_ids), Body.of(sorted(item_ids)))
+            # Only cache if no purchase was notified while the query ran
+            if self._listening and self._owned_loads.get(student_id) is asyncio.current_task():
+                self._owned[student_id] = owned
+                while len(self._owned) > MAX_OWNED:
+                    self._owned.popitem(last=False)
+            return owned
+        finally:
+            if self._owned_loads.get(student_id) is asyncio.current_task():
+                del self._owned_loads[student_id]
+
+    def forget_owned(self, student_id: str) -> None:
+        """Drop a student's cached set (after a purchase in this worker, before its NOTIFY arrives)."""
+        self._owned.pop(student_id, None)
+        self._owned_loads.pop(student_id, None)
+
+    # ── Notifications ──
+
+    def _on_notify(self, payload: str) -> None:
+        if payload == "catalog":
+            self._catalog_changed()
+        elif payload.startswith("owned:"):
+            self.forget_owned(payload[len("owned:"):])
+
+    def _reset(self) -> None:
+        self._stale = True
+        self._snapshot = None
+        self._owned.clear()
+        self._owned_loads.clear()
+
+    async def _listen_loop(self) -> None:
+        while True:
+            try:
+                conn = await db.listen(CHANNEL, self._on_notify)
+            except Exception as exc:
+                logger.warning("Shop catalog listener could not connect: %s", exc)
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: closed.set())
+            # Anything may have changed while nobody was listening
+            self._reset()
+            self._listening = True
+            try:
+                await closed.wait()
+                logger.warning("Shop catalog listener disconnected; caching paused until it is back")
+            finally:
+                self._listening = False
+                self._reset()
+                if not conn.is_closed():
+                    await conn.close()
+
+    def start(self) -> None:
+        """Start the NOTIFY listener (called from the app lifespan)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen_loop(), name="shop-catalog-listen")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Shop catalog reload failed: %s", task.exception())
+
+
+catalog = ShopCatalog()
+
+metrics.track_cache_size("shop_owned", lambda: len(catalog._owned))
+metrics.gauge(
+    "eyeradar_shop_catalog_version", "Version of the shop catalog snapshot served by this worker",
+    callback=lambda: {(): float(catalog._snapshot.version if catalog._snapshot else 0)},
+)
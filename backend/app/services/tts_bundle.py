@@ -0,0 +1,278 @@
+"""
+Pre-built archive of the speech for the static content pools.
+
+The word lists, rhyme pairs, phrases, age word banks, pseudo-words, image
+labels and UI strings of app.services.content_generator are known at build
+time. The build synthesizes each of them in the voice the client gets for
+its language, at the rates the games play, and packs the clips into one file:
+
+  - the magic, then the MP3s back to back
+  - an index of (cache key digest, offset, length) entries, sorted by key
+  - a trailer: index offset, entry count, magic
+
+At runtime the archive is memory-mapped read-only, so the page cache shares
+it between uvicorn workers. The TTS router looks a clip up here before the
+disk cache and answers with a memoryview of the mapping: the server writes
+it to the socket without a copy in Python, a file open or a stat.
+
+    python -m app.services.tts_bundle
+    python -m app.services.tts_bundle --backend benchmarks.standins:tts_backend --parallel 64
+
+Clips already in the current archive are reused, so a rebuild only
+synthesizes new strings. The archive is replaced atomically; running workers
+keep serving the one they mapped until they restart.
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import edge_tts
+
+from app.services import content_generator as cg
+from app.services import metrics
+from app.services.tts_cache import cache_key
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FILE = Path(os.getenv(
+    "TTS_BUNDLE_FILE", str(Path(__file__).resolve().parents[2] / ".tts_bundle" / "speech.bundle"),
+))
+PARALLEL = 8      # clips synthesized at once while building
+RETRIES = 2       # further attempts per clip before it is left out
+
+_MAGIC = b"EYRTTS01"  # bump the version digits whenever the layout changes
+# sha256 digest of the cache key, offset, length
+_ENTRY = struct.Struct("<32sQI")
+# index offset, entry count, magic
+_TRAILER = struct.Struct("<QI8s")
+
+# async (text, voice, rate) -> MP3 bytes
+Backend = Callable[[str, str, str], Awaitable[bytes]]
+
+
+# ─── Reading ─────────────────────────────────────────────────────────────────
+
+class SpeechBundle:
+    """Read-only, memory-mapped view over a built speech archive."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < len(_MAGIC) + _TRAILER.size or self._mm[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a speech bundle")
+        index_offset, count, magic = _TRAILER.unpack_from(self._mm, len(self._mm) - _TRAILER.size)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is truncated")
+        index = self._mm[index_offset:index_offset + count * _ENTRY.size]
+        self._clips: Dict[str, Tuple[int, int]] = {
+            digest.hex(): (offset, length) for digest, offset, length in _ENTRY.iter_unpack(index)
+        }
+        self._view = memoryview(self._mm)
+        self.path = path
+        self.size = len(self._mm)
+
+    def get(self, key: str) -> Optional[memoryview]:
+        """The clip for a cache key, as a view into the mapping (no copy)."""
+        entry = self._clips.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._view[offset:offset + length]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._clips
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+
+_bundle: Optional[SpeechBundle] = None
+_loaded = False
+
+
+def load(path: Path = BUNDLE_FILE) -> Optional[SpeechBundle]:
+    """Open (or reopen) the archive; None if there is none, which just means no clip is bundled."""
+    global _bundle, _loaded
+    _loaded = True
+    try:
+        _bundle = SpeechBundle(path)
+        logger.info("TTS bundle %s: %d clips, %d bytes", path.name, len(_bundle), _bundle.size)
+    except FileNotFoundError:
+        _bundle = None
+    except (OSError, ValueError, struct.error) as exc:
+        logger.warning("TTS bundle unavailable (%s); every clip goes through the cache", exc)
+        _bundle = None
+    return _bundle
+
+
+def get(key: str) -> Optional[memoryview]:
+    """A bundled clip, or None."""
+    if not _loaded:
+        load()
+    if _bundle is None:
+        return None
+    view = _bundle.get(key)
+    metrics.cache_lookup("tts_bundle", view is not None)
+    return view
+
+
+def contains(key: str) -> bool:
+    if not _loaded:
+        load()
+    return _bundle is not None and key in _bundle
+
+
+# ─── Building ────────────────────────────────────────────────────────────────
+
+def _unique(values: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(v for v in values if isinstance(v, str) and v.strip()))
+
+
+def static_strings() -> Dict[str, List[str]]:
+    """Every static string the games can speak, per language, deduplicated, in a stable order."""
+    strings: Dict[str, List[str]] = {}
+    for lang, suffix in (("en", ""), ("el", "_EL")):
+        values: List[str] = []
+        for name in ("SIMPLE_WORDS", "MEDIUM_WORDS", "HARD_WORDS", "ADVANCED_WORDS", "SIGHT_WORDS", "PSEUDO_WORDS"):
+            values += getattr(cg, name + suffix)
+        values += [word for pair in getattr(cg, "RHYME_PAIRS" + suffix) for word in pair[:2]]
+        values += [phrase for phrases in getattr(cg, "PHRASES_BY_LEVEL" + suffix).values() for phrase in phrases]
+        values += [
+            word for tiers in cg.WORD_BANKS_BY_AGE.get(lang, {}).values()
+            for words in tiers.values() for word in words
+        ]
+        values += [image["label" if lang == "en" else "label_el"] for image in cg.EXERCISE_IMAGES]
+        values += [text[lang] for text in cg._STRINGS.values() if lang in text]
+        strings[lang] = _unique(values)
+    return strings
+
+
+def default_rates() -> List[str]:
+    """The plain rate and every rate a game plays at."""
+    from app.services.tts_prefetch import SPEAKABLE
+    from app.services.tts_synthesis import DEFAULT_RATE
+    return sorted({DEFAULT_RATE, *(rate for rate, _ in SPEAKABLE.values())})
+
+
+def clips(rates: Sequence[str]) -> Dict[str, Tuple[str, str, str]]:
+    """cache key -> (text, voice, rate) of every clip the archive holds."""
+    # Imported here: the synthesis path looks clips up in this module
+    from app.services.tts_synthesis import voice_for
+    jobs: Dict[str, Tuple[str, str, str]] = {}
+    for lang, texts in static_strings().items():
+        # Only the language's default voice: the client sends the bare language
+        # (frontend/src/lib/tts.ts), so other regional voices are never asked for
+        voice = voice_for(lang)
+        for rate in rates:
+            for text in texts:
+                jobs.setdefault(cache_key(text, voice, rate), (text, voice, rate))
+    return jobs
+
+
+async def edge_backend(text: str, voice: str, rate: str) -> bytes:
+    communicate = edge_tts.Communicate(text, voice, rate=rate)
+    return b"".join([chunk["data"] async for chunk in communicate.stream() if chunk["type"] == "audio"])
+
+
+def resolve_backend(spec: str) -> Backend:
+    """ "edge", or "module:function" naming another async (text, voice, rate) -> bytes."""
+    if spec == "edge":
+        return edge_backend
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError(f"Backend must be 'edge' or module:function, not {spec!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+async def build_bundle(
+    out_path: Path = BUNDLE_FILE,
+    backend: Backend = edge_backend,
+    parallel: int = PARALLEL,
+    rates: Optional[Sequence[str]] = None,
+) -> Dict[str, int]:
+    """Synthesize every static clip and write the archive atomically (temp file + rename).
+
+    Returns counts of clips written, reused from the previous archive,
+    synthesized and failed. A clip that still fails after RETRIES is left
+    out; it is synthesized on demand like any other.
+    """
+    jobs = clips(rates or default_rates())
+    try:
+        previous: Optional[SpeechBundle] = SpeechBundle(out_path)
+    except (OSError, ValueError, struct.error):
+        previous = None
+    stats = {"clips": 0, "reused": 0, "synthesized": 0, "failed": 0}
+    index: List[Tuple[bytes, int, int]] = []
+    limit = asyncio.Semaphore(parallel)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=out_path.name, suffix=".tmp", dir=out_path.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(_MAGIC)
+
+            def append(key: str, data) -> None:
+                index.append((bytes.fromhex(key), fh.tell(), len(data)))
+                fh.write(data)
+                stats["clips"] += 1
+
+            async def fetch(key: str, text: str, voice: str, rate: str) -> None:
+                old = previous.get(key) if previous is not None else None
+                if old is not None:
+                    append(key, old)
+                    stats["reused"] += 1
+                    return
+                async with limit:
+                    for attempt in range(RETRIES + 1):
+                        try:
+                            data = await backend(text, voice, rate)
+                            if data:
+                                break
+                            raise ValueError("no audio")
+                        except Exception as exc:
+                            error = exc
+                            if attempt < RETRIES:
+                                await asyncio.sleep(2 ** attempt)
+                    else:
+                        stats["failed"] += 1
+                        logger.warning("Left out %r (%s, %s): %s", text, voice, rate, error)
+                        return
+                append(key, data)
+                stats["synthesized"] += 1
+                if stats["synthesized"] % 500 == 0:
+                    logger.info("Synthesized %d of %d clips", stats["synthesized"], len(jobs))
+
+            await asyncio.gather(*(fetch(key, *job) for key, job in jobs.items()))
+            index.sort()
+            index_offset = fh.tell()
+            fh.write(b"".join(_ENTRY.pack(*entry) for entry in index))
+            fh.write(_TRAILER.pack(index_offset, len(index), _MAGIC))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, out_path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    logger.info("Built TTS bundle %s: %s", out_path.name, stats)
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=BUNDLE_FILE)
+    parser.add_argument("--backend", default="edge", help='"edge" or module:function')
+    parser.add_argument("--parallel", type=int, default=PARALLEL)
+    parser.add_argument("--rate", action="append", dest="rates", help="rate to bundle (repeatable); "
+                        "default: +0%% and the rates the games play at")
+    args = parser.parse_args()
+    result = asyncio.run(build_bundle(args.out, resolve_backend(args.backend), args.parallel, args.rates))
+    sys.exit(1 if result["failed"] else 0)
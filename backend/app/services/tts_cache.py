@@ -0,0 +1,363 @@
+"""
+On-disk cache of synthesized speech, bounded in bytes with LRU eviction.
+
+Clips live in TTS_CACHE_DIR as <key>.mp3. The cache keeps an in-memory index
+of key -> (stat result, last access) in LRU order, for eviction and the byte
+budget:
+
+  - the index is built lazily from the directory on first use, and rebuilt
+    every REINDEX_INTERVAL so clips written or evicted by the other uvicorn
+    workers (which share the directory) are accounted for
+  - a hit is served from the index without touching the disk. The index may
+    be behind the other workers, so a key missing from it is looked up on
+    disk and adopted if another worker wrote it, and a clip another worker
+    evicted is dropped when read() can't open it, so the caller treats it
+    as a miss. Cache lookups and reads use their own "tts_cache" task type,
+    so they don't queue behind writes, evictions or other blocking I/O
+  - writes go to a temp file that is renamed into place, so a reader never
+    sees a partial clip; a ClipWriter fills it while the clip is still being
+    synthesized and deletes it if the clip is abandoned. Directory scans,
+    writes and evictions run in the executors thread pool, off the event loop
+  - after a write, least recently used clips are deleted until the cache
+    fits in TTS_CACHE_MAX_MB
+  - access order is kept in memory and written back to the file's atime at
+    most once per TOUCH_INTERVAL, so the LRU order survives a restart
+
+Hits, misses and evictions are reported through app.services.metrics.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.services import executors, metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", str(Path(__file__).resolve().parents[2] / ".tts_cache")))
+MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "512")) * 1024 * 1024)
+REINDEX_INTERVAL = 600.0   # seconds before the index is rebuilt from the directory
+TOUCH_INTERVAL = 3600.0    # seconds between atime updates of a clip that keeps being hit
+SUFFIX = ".mp3"
+
+
+def cache_key(text: str, voice: str, rate: str) -> str:
+    raw = f"{text}|{voice}|{rate}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class TTSCache:
+    """Byte-bounded LRU cache of audio clips in one directory."""
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # key -> (stat result, last access, last access written to the file),
+        # least recently used first
+        self._index: "OrderedDict[str, Tuple[os.stat_result, float, float]]" = OrderedDict()
+        self._bytes = 0
+        self._indexed_at: Optional[float] = None
+        self._reindex: Optional[asyncio.Task] = None
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{SUFFIX}"
+
+    # ── Index ──
+
+    async def _ensure_index(self) -> None:
+        task = self._reindex
+        if task is None or (task.done() and (
+            self._indexed_at is None or time.monotonic() - self._indexed_at >= REINDEX_INTERVAL
+        )):
+            task = self._reindex = asyncio.ensure_future(self._rebuild_index())
+            task.add_done_callback(self._reindex_done)
+        if self._indexed_at is None:
+            # Nothing indexed yet: wait for the first scan (a failed one leaves every lookup a miss)
+            await asyncio.wait([task])
+        # Later rebuilds run in the background; lookups use the current index meanwhile
+
+    def _reindex_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.warning("TTS cache index rebuild failed: %s", task.exception())
+        if self._indexed_at is not None:
+            self._indexed_at = time.monotonic()  # keep the old index, retry after the interval
+
+    async def _rebuild_index(self) -> None:
+        started = time.time()
+        entries = await executors.run_io("io", _scan, self.directory)
+        # This worker knows accesses it hasn't written back yet
+        accessed = {key: entry[1] for key, entry in self._index.items()}
+        rebuilt = []
+        for key, st in entries:
+            on_disk = _last_access(st)
+            rebuilt.append((max(accessed.get(key, 0.0), on_disk), key, st, on_disk))
+        rebuilt.sort(key=lambda e: e[0])
+        index = OrderedDict((key, (st, access, on_disk)) for access, key, st, on_disk in rebuilt)
+        # Clips stored while the scan ran may have been missed by it
+        for key, entry in self._index.items():
+            if key not in index and entry[1] >= started:
+                index[key] = entry
+        self._index = index
+        self._bytes = sum(entry[0].st_size for entry in index.values())
+        self._indexed_at = time.monotonic()
+        await self._evict()
+
+    # ── Lookups and writes ──
+
+    async def get(self, key: str) -> Optional[os.stat_result]:
+        """The stat result of a cached clip (for serving it), or None on a miss."""
+        st = await self._lookup(key, touch=True)
+        metrics.cache_lookup("tts_disk", st is not None)
+        return st
+
+    async def contains(self, key: str) -> bool:
+        """Whether a clip is cached, without counting a lookup or touching its access time."""
+        return await self._lookup(key, touch=False) is not None
+
+    async def read(self, key: str) -> Optional[bytes]:
+        """The bytes of a clip get() just found; None if another worker evicted it meanwhile."""
+        try:
+            return await executors.run_io("tts_cache", self.path(key).read_bytes)
+        except FileNotFoundError:
+            self._drop(key)
+            return None
+
+    async def _lookup(self, key: str, touch: bool) -> Optional[os.stat_result]:
+        await self._ensure_index()
+        entry = self._index.get(key)
+        if entry is None:
+            # The other workers write to the same directory: the clip may be there anyway
+            st = await executors.run_io("tts_cache", _stat, self.path(key), None)
+            if st is None:
+                return None
+            entry = self._index.get(key)
+            if entry is None:
+                # Written by another worker: adopted, so it counts against the budget here too
+                access = _last_access(st)
+                entry = self._index[key] = (st, access, access)
+                self._bytes += st.st_size
+                await self._evict()
+        st, access, touched = entry
+        if touch:
+            access = time.time()
+            if access - touched >= TOUCH_INTERVAL:
+                if await executors.run_io("tts_cache", _stat, self.path(key), access) is None:
+                    # Evicted by another worker since the last rebuild
+                    self._drop(key)
+                    return None
+                touched = access
+        if key in self._index:
+            self._index[key] = (st, access, touched)
+            self._index.move_to_end(key)
+        return st
+
+    async def put(self, key: str, data: bytes) -> os.stat_result:
+        """Store a clip atomically and evict down to the budget; disk work runs in the thread pool."""
+        st = await executors.run_io("io", _write_atomic, self.directory, self.path(key), data)
+        await self._add(key, st)
+        return st
+
+    def writer(self, key: str) -> "ClipWriter":
+        """Store a clip chunk by chunk as it is produced."""
+        return ClipWriter(self, key)
+
+    async def _add(self, key: str, st: os.stat_result) -> None:
+        await self._ensure_index()
+        self._drop(key)
+        now = time.time()
+        self._index[key] = (st, now, now)
+        self._bytes += st.st_size
+        await self._evict()
+
+    def _drop(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0].st_size
+
+    async def _evict(self) -> None:
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, (st, _, _) = self._index.popitem(last=False)
+            self._bytes -= st.st_size
+            evicted.append(str(self.path(key)))
+            TTS_EVICTIONS.inc()
+            TTS_EVICTED_BYTES.inc(amount=st.st_size)
+        if evicted:
+            await executors.run_io("io", _unlink_all, evicted)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class ClipWriter:
+    """One clip written to a temp file while it streams, renamed into the cache on commit().
+
+    Chunks are buffered up to FLUSH_BYTES between thread pool writes. A disk
+    error doesn't fail the caller: the clip is just not cached.
+    """
+
+    FLUSH_BYTES = 64 * 1024
+
+    def __init__(self, cache: TTSCache, key: str):
+        self.cache = cache
+        self.key = key
+        self._file = None
+        self._tmp: Optional[str] = None
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._failed = False
+
+    async def write(self, data: bytes) -> None:
+        if self._failed:
+            return
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= self.FLUSH_BYTES:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        data, self._pending, self._pending_bytes = b"".join(self._pending), [], 0
+        try:
+            if self._file is None:
+                self._file, self._tmp = await executors.run_io(
+                    "io", _open_temp, self.cache.directory, self.cache.path(self.key),
+                )
+            await executors.run_io("io", self._file.write, data)
+        except OSError as exc:
+            logger.warning("Could not cache TTS audio: %s", exc)
+            self._failed = True
+            await self.abort()
+
+    async def commit(self) -> Optional[os.stat_result]:
+        """Move the finished clip into the cache; None if it couldn't be written."""
+        if not self._failed and self._pending:
+            await self._flush()
+        if self._failed or self._file is None:
+            await self.abort()
+            return None
+        file, tmp, self._file, self._tmp = self._file, self._tmp, None, None
+        try:
+            st = await executors.run_io("io", _finish_temp, file, tmp, self.cache.path(self.key))
+        except OSError as exc:
+            logger.warning("Could not cache TTS audio: %s", exc)
+            return None
+        await self.cache._add(self.key, st)
+        return st
+
+    async def abort(self) -> None:
+        """Delete the partial clip."""
+        self._pending, self._pending_bytes = [], 0
+        file, tmp, self._file, self._tmp = self._file, self._tmp, None, None
+        if file is not None:
+            await executors.run_io("io", _discard_temp, file, tmp)
+
+
+def _stat(path: Path, touch_at: Optional[float]) -> Optional[os.stat_result]:
+    """The clip's stat result, None if it is gone; with touch_at, its atime is set to it first."""
+    try:
+        st = os.stat(path)
+        if touch_at is not None:
+            # atime only: mtime feeds the ETag clients revalidate with
+            os.utime(path, (touch_at, st.st_mtime))
+        return st
+    except FileNotFoundError:
+        return None
+
+
+def _scan(directory: Path) -> List[Tuple[str, os.stat_result]]:
+    """(key, stat result) of every clip in directory; removes stale temp files."""
+    directory.mkdir(parents=True, exist_ok=True)
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.name.endswith(SUFFIX):
+                if entry.name.endswith(".tmp") and _older_than(entry, REINDEX_INTERVAL):
+                    # Left behind by a worker that died mid-write
+                    _unlink(entry.path)
+                continue
+            try:
+                entries.append((entry.name[: -len(SUFFIX)], entry.stat()))
+            except FileNotFoundError:
+                continue
+    return entries
+
+
+def _write_atomic(directory: Path, path: Path, data: bytes) -> os.stat_result:
+    """Write data to a temp file and rename it to path, so readers never see a partial file."""
+    file, tmp = _open_temp(directory, path)
+    try:
+        file.write(data)
+    except BaseException:
+        _discard_temp(file, tmp)
+        raise
+    return _finish_temp(file, tmp, path)
+
+
+def _open_temp(directory: Path, path: Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{path.stem}.", suffix=".tmp")
+    return os.fdopen(fd, "wb"), tmp
+
+
+def _finish_temp(file, tmp: str, path: Path) -> os.stat_result:
+    try:
+        with file:
+            file.flush()
+            st = os.fstat(file.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        _unlink(tmp)
+        raise
+    return st
+
+
+def _discard_temp(file, tmp: str) -> None:
+    try:
+        file.close()
+    except OSError:
+        pass
+    _unlink(tmp)
+
+
+def _unlink_all(paths: List[str]) -> None:
+    for path in paths:
+        _unlink(path)
+
+
+def _last_access(st: os.stat_result) -> float:
+    return max(st.st_atime, st.st_mtime)
+
+
+def _older_than(entry: os.DirEntry, seconds: float) -> bool:
+    try:
+        return time.time() - entry.stat().st_mtime > seconds
+    except FileNotFoundError:
+        return False
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("Could not remove TTS cache file %s: %s", path, exc)
+
+
+TTS_EVICTIONS = metrics.counter("eyeradar_tts_cache_evictions_total", "TTS clips evicted from the disk cache")
+TTS_EVICTED_BYTES = metrics.counter("eyeradar_tts_cache_evicted_bytes_total", "Bytes of TTS clips evicted")
+
+cache = TTSCache()
+
+metrics.track_cache_size("tts_disk", lambda: len(cache))
+metrics.gauge(
+    "eyeradar_tts_cache_bytes", "Bytes of TTS clips in the disk cache, as indexed by this worker",
+    callback=lambda: {(): float(cache._bytes)},
+)
@@ -0,0 +1,226 @@
+"""
+Background pre-synthesis of the speech an exercise session will play.
+
+The games speak a few fields of their items (the word to read aloud, a rhyme
+pair, a target word and its options), and every first play used to wait for
+edge-tts. When a session starts:
+
+  - speakable() picks those strings per item type, at the rate the game
+    plays them, so the clips are the ones the client would ask for
+  - each item gets extra_data["tts_keys"] = {text: cache key}; the client
+    fetches GET /api/v1/tts/clip/{key} instead of sending the text
+  - the clips are queued for a bounded pool of WORKERS tasks that synthesize
+    them into the TTS cache in the session's language
+
+The queue is per worker process, but the key may be asked for on any of them,
+so every queued clip is also written as a small job file next to the cache
+(JOBS_DIR). A clip asked for while still queued, here or in another worker,
+is started right away (claim()). When the queue is full further clips are
+dropped and get no job file: the clip endpoint answers 404 for them and the
+client falls back to the text endpoint.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.models import ExerciseItem
+from app.services import executors, metrics, tts_bundle
+from app.services.tts_cache import cache, cache_key
+from app.services.tts_synthesis import Synthesis, running, synthesis, voice_for
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("TTS_PREFETCH_WORKERS", "4"))   # clips synthesized at once per worker process
+MAX_QUEUED = 2_000                                      # clips waiting for a worker
+JOB_TTL = 3600.0                                        # seconds before a job file nobody finished is pruned
+
+# item_type -> (rate, spoken fields); "options" is ExerciseItem.options, the
+# rest are extra_data keys. Rates must match the games in
+# frontend/src/components/games (tts.speak rate 0.6 -> "-40%", 0.75 -> "-25%").
+SPEAKABLE: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "read_aloud": ("-40%", ("word",)),
+    "sound_matching": ("-25%", ("word1", "word2")),
+    "word_sound_match": ("-25%", ("target_word", "options")),
+    "word_image_match": ("-25%", ("target_word", "word_options")),
+}
+
+
+def speakable(item: ExerciseItem) -> Optional[Tuple[str, List[str]]]:
+    """(rate, distinct texts) the game of this item speaks, or None if it speaks nothing."""
+    spec = SPEAKABLE.get(item.item_type)
+    if spec is None:
+        return None
+    rate, fields = spec
+    texts: List[str] = []
+    for field in fields:
+        value: Any = item.options if field == "options" else item.extra_data.get(field)
+        for text in value if isinstance(value, (list, tuple)) else (value,):
+            if isinstance(text, str) and text.strip() and text not in texts:
+                texts.append(text)
+    return (rate, texts) if texts else None
+
+
+class TTSPrefetcher:
+    """Queue of clips to synthesize ahead of play, drained by a pool of worker tasks."""
+
+    def __init__(self, workers: int = WORKERS, max_queued: int = MAX_QUEUED, jobs_dir: Optional[Path] = None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.jobs_dir = jobs_dir or cache.directory / "jobs"
+        # key -> (text, voice, rate), oldest first
+        self._queue: "OrderedDict[str, Tuple[str, str, str]]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._pruned_at = 0.0
+
+    async def annotate(self, items: Sequence[ExerciseItem], lang: str) -> int:
+        """Give each speaking item its tts_keys and queue the clips; returns how many were queued."""
+        voice = voice_for(lang)
+        queued: Dict[str, Tuple[str, str, str]] = {}
+        for item in items:
+            spoken = speakable(item)
+            if spoken is None:
+                continue
+            rate, texts = spoken
+            keys = {}
+            for text in texts:
+                key = keys[text] = cache_key(text, voice, rate)
+                if self._enqueue(key, text, voice, rate):
+                    queued[key] = (text, voice, rate)
+            item.extra_data = {**item.extra_data, "tts_keys": keys}
+        if queued:
+            # Before the keys are handed out, so whichever worker gets the request can claim them
+            try:
+                await executors.run_io("io", _write_jobs, self.jobs_dir, queued)
+            except OSError as exc:
+                logger.warning("TTS prefetch jobs not shared: %s", exc)
+        return len(queued)
+
+    def _enqueue(self, key: str, text: str, voice: str, rate: str) -> bool:
+        if key in self._queue or tts_bundle.contains(key) or running(key) is not None:
+            return False
+        if len(self._queue) >= self.max_queued:
+            TTS_PREFETCH.inc(("dropped",))
+            return False
+        self._queue[key] = (text, voice, rate)
+        self._wakeup.set()
+        TTS_PREFETCH.inc(("queued",))
+        return True
+
+    async def claim(self, key: str) -> Optional[Synthesis]:
+        """The synthesis of a clip whose key was handed out: in progress, or started now if queued.
+
+        A key queued by another worker is found through its job file; None
+        means no worker knows the key (dropped, finished and evicted, or never
+        handed out).
+        """
+        job = self._queue.pop(key, None)
+        if job is None:
+            current = running(key)
+            if current is not None:
+                return current
+            job = await executors.run_io("io", _read_job, self.jobs_dir, key)
+            if job is None:
+                return None
+        TTS_PREFETCH.inc(("claimed",))
+        return synthesis(key, *job)
+
+    async def _work(self) -> None:
+        while True:
+            while not self._queue:
+                self._wakeup.clear()
+                if time.monotonic() - self._pruned_at >= JOB_TTL:
+                    self._pruned_at = time.monotonic()
+                    await executors.run_io("io", _prune_jobs, self.jobs_dir, JOB_TTL)
+                    continue
+                await self._wakeup.wait()
+            key, (text, voice, rate) = self._queue.popitem(last=False)
+            try:
+                if await cache.contains(key):
+                    TTS_PREFETCH.inc(("cached",))
+                else:
+                    done = await synthesis(key, text, voice, rate).finish()
+                    TTS_PREFETCH.inc(("synthesized" if done else "failed",))
+                await executors.run_io("io", _unlink_job, self.jobs_dir, key)
+            except Exception as exc:
+                TTS_PREFETCH.inc(("failed",))
+                logger.warning("TTS prefetch of %s failed: %s", key, exc)
+
+    def start(self) -> None:
+        """Start the worker pool (called from the app lifespan)."""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._work(), name=f"tts-prefetch-{len(self._tasks)}"))
+
+    async def stop(self) -> None:
+        """Stop the workers; queued clips are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue.clear()
+
+
+# ─── Job files ───────────────────────────────────────────────────────────────
+
+def _write_jobs(directory: Path, jobs: Dict[str, Tuple[str, str, str]]) -> None:
+    """One <key>.json per clip, written to a temp file and renamed so readers never see half of one."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for key, (text, voice, rate) in jobs.items():
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump({"text": text, "voice": voice, "rate": rate}, fh)
+            os.replace(tmp, directory / f"{key}.json")
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+def _read_job(directory: Path, key: str) -> Optional[Tuple[str, str, str]]:
+    try:
+        with open(directory / f"{key}.json") as fh:
+            job = json.load(fh)
+        return job["text"], job["voice"], job["rate"]
+    except (OSError, ValueError, KeyError) as exc:
+        if not isinstance(exc, FileNotFoundError):
+            logger.warning("Unreadable TTS prefetch job %s: %s", key, exc)
+        return None
+
+
+def _unlink_job(directory: Path, key: str) -> None:
+    (directory / f"{key}.json").unlink(missing_ok=True)
+
+
+def _prune_jobs(directory: Path, ttl: float) -> None:
+    """Remove job files (and temp files) older than ttl: their worker stopped or dropped them."""
+    cutoff = time.time() - ttl
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+    except FileNotFoundError:
+        return
+
+
+TTS_PREFETCH = metrics.counter(
+    "eyeradar_tts_prefetch_total", "TTS clips handled by the session prefetcher, by outcome", ("outcome",),
+)
+
+prefetcher = TTSPrefetcher()
+
+metrics.gauge(
+    "eyeradar_tts_prefetch_queued", "TTS clips waiting for a prefetch worker",
+    callback=lambda: {(): float(len(prefetcher._queue))},
+)
@@ -0,0 +1,155 @@
+"""
+Speech synthesis with Microsoft Edge neural voices, shared by every TTS path.
+
+A clip is identified by its cache key (text, voice, rate). The first request
+for a clip that isn't cached starts a Synthesis; everything else that wants
+the same clip while it runs (other requests, the session prefetcher) follows
+that one instead of opening another edge-tts stream.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+
+import edge_tts
+
+from app.services import metrics, tts_bundle
+from app.services.instrumentation import span
+from app.services.tts_cache import cache
+
+logger = logging.getLogger(__name__)
+
+VOICE_MAP = {
+    "en": "en-US-AriaNeural",
+    "en-US": "en-US-AriaNeural",
+    "en-GB": "en-GB-SoniaNeural",
+    "el": "el-GR-AthinaNeural",
+    "el-GR": "el-GR-AthinaNeural",
+}
+DEFAULT_VOICE = "en-US-AriaNeural"
+DEFAULT_RATE = "+0%"
+
+# cache key -> the synthesis in progress for it
+_inflight: Dict[str, "Synthesis"] = {}
+
+TTS_COALESCED = metrics.counter(
+    "eyeradar_tts_coalesced_total", "TTS requests served by a synthesis another request started",
+)
+
+
+class SynthesisFailed(RuntimeError):
+    """The edge-tts stream of a clip broke off (the cause is logged once, by the synthesis)."""
+
+
+def voice_for(lang: str) -> str:
+    """The voice for a language code such as en, el, en-US or el-GR."""
+    return VOICE_MAP.get(lang, VOICE_MAP.get(lang.split("-")[0], DEFAULT_VOICE))
+
+
+def running(key: str) -> Optional["Synthesis"]:
+    """The synthesis in progress for a clip, if any."""
+    return _inflight.get(key)
+
+
+class Synthesis:
+    """One edge-tts stream, sent to every request for the clip as it arrives and teed into the cache.
+
+    Chunks stay in memory until the stream ends, so a request that joins late
+    gets what was already sent and then follows the live tail. If the last
+    listener goes away before the end, the stream is cancelled and the
+    partial clip deleted.
+    """
+
+    def __init__(self, key: str, text: str, voice: str, speed: str):
+        self.key = key
+        self.chunks: List[bytes] = []
+        self.complete = False
+        self.failed = False
+        self.listeners = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._run(text, voice, speed))
+        self.task.add_done_callback(self._finished)
+
+    async def _run(self, text: str, voice: str, speed: str) -> None:
+        writer = cache.writer(self.key)
+        try:
+            communicate = edge_tts.Communicate(text, voice, rate=speed)
+            with span("edge_tts", voice):
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        self.chunks.append(chunk["data"])
+                        self._notify()
+                        await writer.write(chunk["data"])
+        except BaseException:
+            await writer.abort()
+            raise
+        self.complete = True
+        self._notify()
+        # Still in _inflight while it is committed, so no request misses in between
+        await writer.commit()
+
+    def _finished(self, task: asyncio.Task) -> None:
+        if _inflight.get(self.key) is self:
+            del _inflight[self.key]
+        if task.cancelled() or task.exception() is not None:
+            if not task.cancelled():
+                logger.error("TTS generation failed: %s", task.exception())
+            self.failed = not self.complete
+            self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def audio(self) -> AsyncIterator[bytes]:
+        """The clip from its first byte, as fast as it is synthesized."""
+        self.listeners += 1
+        try:
+            sent = 0
+            while True:
+                if sent < len(self.chunks):
+                    data = b"".join(self.chunks[sent:])
+                    sent = len(self.chunks)
+                    yield data
+                    continue
+                if self.complete:
+                    return
+                if self.failed:
+                    raise SynthesisFailed(self.key)
+                await self._changed.wait()
+        finally:
+            self.listeners -= 1
+            if self.listeners == 0 and not self.complete and not self.task.done():
+                # Nobody is left to hear the rest: stop and drop the partial clip
+                self.task.cancel()
+
+    async def finish(self) -> bool:
+        """Wait for the whole clip, keeping the stream alive meanwhile; False if it failed."""
+        try:
+            async for _ in self.audio():
+                pass
+        except SynthesisFailed:
+            return False
+        return True
+
+
+def synthesis(key: str, text: str, voice: str, speed: str) -> Synthesis:
+    """The synthesis of a clip: the one in progress, or a new one."""
+    current = _inflight.get(key)
+    if current is not None:
+        TTS_COALESCED.inc()
+        return current
+    current = _inflight[key] = Synthesis(key, text, voice, speed)
+    return current
+
+
+async def clip(key: str, text: str, voice: str, speed: str) -> bytes:
+    """The whole clip: from the bundle or the cache, or synthesized (following one in progress)."""
+    bundled = tts_bundle.get(key)
+    if bundled is not None:
+        return bytes(bundled)
+    if await cache.get(key) is not None:
+        cached = await cache.read(key)
+        if cached is not None:
+            return cached
+    return b"".join([data async for data in synthesis(key, text, voice, speed).audio()])
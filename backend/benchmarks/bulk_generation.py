@@ -0,0 +1,71 @@
+"""
+Bulk vs looped template generation benchmark.
+
+For every game in ``BULK_GAME_IDS`` this generates M sessions × N items twice:
+by looping the game's template generator once per session, and with
+``generate_bulk_sessions``: sampling in the CPU process pool, the compact
+index arrays unpickled on the event loop, items built per session on read.
+"bulk" is the rate at which ready item sets arrive; "bulk+read" also reads
+every session as the dicts sessions store.
+
+    python benchmarks/bulk_generation.py --sessions 2000 --items 10
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services import content_generator as cg  # noqa: E402
+from app.services import executors  # noqa: E402
+
+
+async def run(args) -> None:
+    total = args.sessions * args.items
+    executors.start()
+    # Pay the lazy NumPy import and the worker start-up up front
+    cg.generate_bulk_items("backward_spell", 1, 1, 1)
+    await cg.generate_bulk_sessions("backward_spell", 1, 1, 1)
+
+    print(f"{args.sessions} sessions × {args.items} items, difficulty {args.difficulty}, lang {args.lang}")
+    print(f"{'game':22s} {'loop it/s':>11s} {'bulk it/s':>11s} {'speedup':>8s} "
+          f"{'bulk+read':>11s} {'speedup':>8s}")
+    try:
+        for game_id in sorted(cg.BULK_GAME_IDS):
+            template = cg.GENERATORS[game_id].template
+            ctx = cg.GenerationContext(lang=args.lang, seed=0)
+            start = time.perf_counter()
+            for _ in range(args.sessions):
+                template(args.difficulty, args.items, ctx)
+            loop_rate = total / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            bulk = await cg.generate_bulk_sessions(
+                game_id, args.difficulty, args.sessions, args.items, lang=args.lang, seed=0,
+            )
+            bulk_time = time.perf_counter() - start
+            for session in range(args.sessions):
+                bulk.session_dicts(session)
+            read_rate = total / (time.perf_counter() - start)
+            bulk_rate = total / bulk_time
+
+            print(f"{game_id:22s} {loop_rate:11.0f} {bulk_rate:11.0f} {bulk_rate / loop_rate:7.1f}x "
+                  f"{read_rate:11.0f} {read_rate / loop_rate:7.1f}x")
+    finally:
+        executors.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=10, help="items per session")
+    parser.add_argument("--difficulty", type=int, default=5)
+    parser.add_argument("--lang", default="en")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
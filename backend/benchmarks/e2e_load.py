@@ -0,0 +1,388 @@
+"""
+End-to-end load test: the real FastAPI app against a seeded local Postgres.
+
+The app runs in-process with its normal lifespan (pool, executors, history
+flusher). Only the external services are replaced (see standins.py): the
+Keycloak check, edge-tts and the LLM, which runs as a local
+OpenAI-compatible server with a fixed delay.
+
+--users virtual users loop for --duration seconds, each iteration picking a
+role by --mix:
+
+  student  session start -> 5 submits -> complete, then the gamification
+           summary (dashboard) and, half the time, a TTS request
+  parent   own students list, analytics overview and gamification summary
+           of a child, sometimes an adventure suggestion
+  teacher  all students list, an analytics report, sometimes an adventure
+           suggestion
+
+Reported as JSON per endpoint (route template): throughput, p50/p95/p99,
+errors, DB queries and DB time per request, plus pool saturation/waiters
+and event-loop lag, tagged with the git commit. --compare prints the p95
+and throughput change against an earlier result file.
+
+    createdb eyeradar_bench
+    export DATABASE_URL=postgres://localhost/eyeradar_bench
+    python benchmarks/e2e_load.py --seed-data --students 2000 --users 50 --duration 60
+    python benchmarks/e2e_load.py --users 50 --compare benchmarks/results/e2e-<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import seed_data  # noqa: E402
+import standins  # noqa: E402
+
+GAMES = (
+    "sound_safari", "rhyme_time_race", "flash_card_frenzy", "object_blitz", "backward_spell",
+    "story_recall", "letter_detective", "phrase_flash", "sight_word_sprint", "question_quest",
+    "vocabulary_builder", "word_image_match",
+)
+TTS_TEXTS = ("cat", "ship", "rainbow", "elephant", "the dog runs fast", "bright stars", "γάτα", "σπίτι")
+
+
+# ─── Request recording ───────────────────────────────────────────────────────
+
+class Recorder:
+    """Per-endpoint latency, status and DB use of every request after warm-up."""
+
+    def __init__(self):
+        self.recording = False
+        self.latency: Dict[str, List[float]] = defaultdict(list)
+        self.db_queries: Dict[str, List[int]] = defaultdict(list)
+        self.db_seconds: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, endpoint: str, status: int, seconds: float, queries: int, db_seconds: float) -> None:
+        if not self.recording:
+            return
+        self.latency[endpoint].append(seconds)
+        self.db_queries[endpoint].append(queries)
+        self.db_seconds[endpoint].append(db_seconds)
+        if status >= 400:
+            self.errors[endpoint] += 1
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Client:
+    """Calls the ASGI app directly (no sockets) and records each request."""
+
+    def __init__(self, app, recorder: Recorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def request(
+        self, method: str, path: str, token: str, body: Optional[dict] = None, query: str = "",
+    ) -> Tuple[int, Any]:
+        from app.services import instrumentation
+
+        raw = json.dumps(body).encode() if body is not None else b""
+        headers = [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())]
+        if body is not None:
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(raw)).encode())]
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": query.encode(), "headers": headers,
+            "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        }
+        sent = False
+        response: Dict[str, Any] = {"status": 500, "body": []}
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                await asyncio.sleep(3600)  # no disconnect while the app streams
+            sent = True
+            return {"type": "http.request", "body": raw, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        except Exception:  # ServerErrorMiddleware re-raises after sending the 500
+            response["status"] = 500
+        elapsed = time.perf_counter() - start
+
+        # log_requests set the trace in this task's context; the router set the route
+        trace = instrumentation.current_trace()
+        queries, db_seconds = trace.totals.get("db", (0, 0.0)) if trace else (0, 0.0)
+        route = scope.get("route")
+        endpoint = f"{method} {getattr(route, 'path', path)}"
+        self.recorder.add(endpoint, response["status"], elapsed, int(queries), db_seconds)
+
+        payload = b"".join(response["body"])
+        try:
+            data = json.loads(payload) if payload[:1] in (b"{", b"[") else None
+        except ValueError:
+            data = None
+        return response["status"], data
+
+
+# ─── Scenarios ───────────────────────────────────────────────────────────────
+
+async def student_flow(client: Client, rng: random.Random, students: int) -> None:
+    i = rng.randrange(students)
+    sid, token = seed_data.student_id(i), standins.bench_token("student", seed_data.student_sub(i))
+    status, session = await client.request(
+        "POST", "/api/v1/exercises/start", token, {"student_id": sid, "game_id": rng.choice(GAMES)},
+    )
+    if status == 200 and session:
+        for item in session["items"][:5]:
+            answer = item["correct_answer"] if rng.random() < 0.7 else (item.get("options") or ["?"])[-1]
+            await client.request("POST", f"/api/v1/exercises/{session['id']}/submit", token, {
+                "item_index": item["index"], "student_answer": answer, "response_time_ms": rng.randint(800, 6000),
+            })
+        await client.request("POST", f"/api/v1/exercises/{session['id']}/complete", token)
+    await client.request("GET", f"/api/v1/gamification/{sid}/summary", token)
+    if rng.random() < 0.5:
+        text = rng.choice(TTS_TEXTS) + ("" if rng.random() < 0.5 else f" {rng.randrange(1000)}")
+        await client.request("GET", "/api/v1/tts", token, query=f"text={text}&lang=en".replace(" ", "%20"))
+
+
+async def parent_flow(client: Client, rng: random.Random, students: int) -> None:
+    p = rng.randrange((students + 1) // 2)
+    token = standins.bench_token("parent", seed_data.parent_sub(p))
+    await client.request("GET", "/api/v1/students/parent/mine", token)
+    sid = seed_data.student_id(min(students - 1, 2 * p + rng.randrange(2)))
+    await client.request("GET", f"/api/v1/analytics/{sid}/overview", token)
+    await client.request("GET", f"/api/v1/gamification/{sid}/summary", token)
+    if rng.random() < 0.2:
+        await client.request("POST", "/api/v1/adventures/suggest", token, {"student_id": sid})
+
+
+async def teacher_flow(client: Client, rng: random.Random, students: int) -> None:
+    token = standins.bench_token("teacher", f"bench-teacher-{rng.randrange(20)}")
+    await client.request("GET", "/api/v1/students", token)
+    sid = seed_data.student_id(rng.randrange(students))
+    await client.request("GET", f"/api/v1/analytics/{sid}/report", token)
+    if rng.random() < 0.3:
+        await client.request("POST", "/api/v1/adventures/suggest", token, {"student_id": sid})
+
+
+FLOWS = {"student": student_flow, "parent": parent_flow, "teacher": teacher_flow}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        role, _, weight = part.partition("=")
+        if role.strip() not in FLOWS:
+            raise SystemExit(f"Unknown role in --mix: {role!r}")
+        weights[role.strip()] = float(weight)
+    return weights
+
+
+async def virtual_user(client: Client, seed: int, students: int, mix: Dict[str, float], deadline: float) -> int:
+    rng = random.Random(seed)
+    roles, weights = list(mix), list(mix.values())
+    iterations = 0
+    while time.monotonic() < deadline:
+        role = rng.choices(roles, weights)[0]
+        try:
+            await FLOWS[role](client, rng, students)
+        except Exception as exc:  # keep the user going; errors show up per endpoint
+            print(f"{role} flow failed: {exc!r}", file=sys.stderr)
+        iterations += 1
+    return iterations
+
+
+# ─── Pool sampling ───────────────────────────────────────────────────────────
+
+async def sample_pool(samples: List[Dict[str, int]], stop: asyncio.Event, interval: float = 0.01) -> None:
+    from app.database import pool_stats
+
+    while not stop.is_set():
+        samples.append(pool_stats())
+        await asyncio.sleep(interval)
+
+
+def pool_report(samples: List[Dict[str, int]]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    waiters = [s["waiters"] for s in samples]
+    saturation = [s["in_use"] / s["max"] if s["max"] else 0.0 for s in samples]
+    return {
+        "samples": len(samples),
+        "max_size": max(s["max"] for s in samples),
+        "waiters_mean": statistics.fmean(waiters),
+        "waiters_max": max(waiters),
+        "waiting_fraction": sum(1 for w in waiters if w) / len(waiters),
+        "saturation_mean": statistics.fmean(saturation),
+        "saturation_p95": _percentile(saturation, 0.95),
+    }
+
+
+# ─── Report ──────────────────────────────────────────────────────────────────
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_report(recorder: Recorder, duration: float, pool: Dict[str, float], lag: Dict[str, float], args) -> dict:
+    endpoints = {}
+    total = 0
+    for endpoint, latencies in sorted(recorder.latency.items()):
+        total += len(latencies)
+        queries = recorder.db_queries[endpoint]
+        endpoints[endpoint] = {
+            "requests": len(latencies),
+            "rps": len(latencies) / duration,
+            "errors": recorder.errors.get(endpoint, 0),
+            "p50_ms": _percentile(latencies, 0.50) * 1000,
+            "p95_ms": _percentile(latencies, 0.95) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+            "db_queries_mean": statistics.fmean(queries),
+            "db_queries_max": max(queries),
+            "db_ms_mean": statistics.fmean(recorder.db_seconds[endpoint]) * 1000,
+        }
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "students": args.students, "users": args.users, "duration_s": args.duration, "mix": args.mix,
+            "llm_latency_ms": args.llm_latency_ms, "tts_latency_ms": args.tts_latency_ms,
+        },
+        "throughput_rps": total / duration,
+        "requests": total,
+        "errors": sum(recorder.errors.values()),
+        "endpoints": endpoints,
+        "db_pool": pool,
+        "event_loop_lag": lag,
+    }
+
+
+def compare(report: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nvs {baseline_path.name} (commit {baseline.get('commit')})")
+    print(f"{'endpoint':52s} {'p95 ms':>10s} {'Δ p95':>8s} {'rps':>8s} {'Δ rps':>8s}")
+    for endpoint, stats in report["endpoints"].items():
+        old = baseline["endpoints"].get(endpoint)
+        if old is None:
+            print(f"{endpoint:52s} {stats['p95_ms']:10.1f} {'new':>8s} {stats['rps']:8.1f}")
+            continue
+        dp95 = (stats["p95_ms"] / old["p95_ms"] - 1) * 100 if old["p95_ms"] else 0.0
+        drps = (stats["rps"] / old["rps"] - 1) * 100 if old["rps"] else 0.0
+        print(f"{endpoint:52s} {stats['p95_ms']:10.1f} {dp95:+7.1f}% {stats['rps']:8.1f} {drps:+7.1f}%")
+    old_total = baseline.get("throughput_rps") or 0
+    if old_total:
+        print(f"{'total throughput':52s} {'':10s} {'':8s} {report['throughput_rps']:8.1f} "
+              f"{(report['throughput_rps'] / old_total - 1) * 100:+7.1f}%")
+
+
+def print_summary(report: dict) -> None:
+    print(f"{report['requests']} requests, {report['throughput_rps']:.1f} req/s, {report['errors']} errors "
+          f"(commit {report['commit']})")
+    print(f"{'endpoint':52s} {'n':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'db q':>6s} {'db ms':>7s}")
+    for endpoint, s in report["endpoints"].items():
+        print(f"{endpoint:52s} {s['requests']:6d} {s['p50_ms']:8.1f} {s['p95_ms']:8.1f} {s['p99_ms']:8.1f} "
+              f"{s['db_queries_mean']:6.1f} {s['db_ms_mean']:7.1f}")
+    pool = report["db_pool"]
+    if pool:
+        print(f"pool: saturation mean {pool['saturation_mean']:.2f} p95 {pool['saturation_p95']:.2f}, "
+              f"waiters mean {pool['waiters_mean']:.2f} max {pool['waiters_max']}, "
+              f"waiting {pool['waiting_fraction'] * 100:.1f}% of samples")
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+
+async def run(args) -> dict:
+    # Imported here: the OpenAI settings are read from the environment at import time
+    import main
+    from app.services import instrumentation
+
+    standins.install_auth(main.app)
+    standins.install_tts(args.tts_latency_ms)
+    mix = parse_mix(args.mix)
+
+    async with main.lifespan(main.app):
+        if not getattr(main.app.state, "db_ready", False):
+            raise SystemExit("Database is not reachable; check DATABASE_URL")
+        if args.seed_data:
+            await seed_data.reset()
+            counts = await seed_data.seed(args.students, args.sessions, args.seed)
+            print(f"seeded {counts}")
+
+        recorder = Recorder()
+        client = Client(main.app, recorder)
+        start = time.monotonic()
+        deadline = start + args.warmup + args.duration
+        users = [
+            asyncio.create_task(virtual_user(client, n, args.students, mix, deadline))
+            for n in range(args.users)
+        ]
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        instrumentation.loop_lag.reset()
+        pool_samples: List[Dict[str, int]] = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_pool(pool_samples, stop))
+        measured_from = time.monotonic()
+        await asyncio.gather(*users)
+        duration = time.monotonic() - measured_from
+        stop.set()
+        await sampler
+        return build_report(recorder, duration, pool_report(pool_samples), instrumentation.loop_lag.snapshot(), args)
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    seed_data.add_arguments(parser)
+    parser.add_argument("--seed-data", action="store_true", help="reset and seed before the run")
+    parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds first")
+    parser.add_argument("--mix", default="student=70,parent=20,teacher=10")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--tts-latency-ms", type=float, default=150)
+    parser.add_argument("--out", type=Path, help="result file (default benchmarks/results/e2e-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier result file to compare against")
+    args = parser.parse_args()
+    seed_data.ensure_local(args.allow_remote)
+
+    llm, base_url = standins.start_llm(args.llm_latency_ms)
+    try:
+        standins.use_llm(base_url)
+        report = asyncio.run(run(args))
+    finally:
+        llm.terminate()
+
+    out = args.out or BACKEND_DIR / "benchmarks" / "results" / f"e2e-{report['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print_summary(report)
+    print(f"\nwritten to {out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,106 @@
+"""
+Event-loop lag with CPU-bound work inline vs. through app.services.executors.
+
+Runs each workload (PDF text extraction, base64 of an uploaded image, bulk
+item generation) a few times concurrently on one event loop, once called
+directly on the loop and once through executors.run_cpu, while
+LoopLagMonitor samples how late the loop wakes up. The lag is what every
+other request on the worker would wait.
+
+    python benchmarks/event_loop_lag.py --repeat 4
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services import executors  # noqa: E402
+from app.services.instrumentation import loop_lag  # noqa: E402
+from app.services.assessment_parser import _b64encode, _extract_pdf_text  # noqa: E402
+from app.services.content_generator import generate_bulk_items  # noqa: E402
+
+
+def make_pdf(pages: int) -> bytes:
+    """A text PDF with `pages` pages of report-like lines."""
+    import pypdf
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = pypdf.PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    lines = " ".join(
+        f"BT /F1 10 Tf 40 {780 - 14 * i} Td (Phonological awareness standard score {80 + i} percentile {i}) Tj ET"
+        for i in range(50)
+    )
+    for _ in range(pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): writer._add_object(font)}),
+        })
+        stream = DecodedStreamObject()
+        stream.set_data(lines.encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+async def measure(label: str, make_calls, repeat: int) -> None:
+    loop_lag.reset()
+    await asyncio.sleep(0.2)  # let the monitor take a baseline sample
+    loop_lag.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(make_calls() for _ in range(repeat)))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(loop_lag.interval * 2)
+    lag = loop_lag.snapshot()
+    print(f"{label:28s} {elapsed * 1000:9.0f} {lag['mean_ms']:10.1f} {lag['max_ms']:9.1f}")
+
+
+async def run(repeat: int, pdf_pages: int, image_mb: int) -> None:
+    pdf = make_pdf(pdf_pages)
+    image = os.urandom(image_mb * 1024 * 1024)
+    bulk_args = ("sound_safari", 5, 2000, 10)
+
+    async def inline(fn, *args):
+        return fn(*args)
+
+    workloads = [
+        (f"pdf ({pdf_pages} pages)", _extract_pdf_text, (pdf,), "pdf"),
+        (f"base64 ({image_mb} MB)", _b64encode, (image,), "encode"),
+        ("bulk (2000×10 items)", generate_bulk_items, bulk_args, "bulk"),
+    ]
+
+    executors.start()
+    loop_lag.start()
+    # Spawn the worker processes before timing
+    await asyncio.gather(*(executors.run_cpu("bulk", _b64encode, b"") for _ in range(executors.PROCESS_WORKERS)))
+    print(f"{repeat} concurrent calls per workload, {executors.PROCESS_WORKERS} processes")
+    print(f"{'workload':28s} {'wall ms':>9s} {'lag mean':>10s} {'lag max':>9s}")
+    for label, fn, args, task_type in workloads:
+        await measure(f"{label} inline", lambda: inline(fn, *args), repeat)
+        await measure(f"{label} executor", lambda: executors.run_cpu(task_type, fn, *args), repeat)
+    await loop_lag.stop()
+    executors.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=4, help="concurrent calls per workload")
+    parser.add_argument("--pdf-pages", type=int, default=40)
+    parser.add_argument("--image-mb", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat, args.pdf_pages, args.image_mb))
+
+
+if __name__ == "__main__":
+    main()
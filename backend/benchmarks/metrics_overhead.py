@@ -0,0 +1,150 @@
+"""
+Per-request cost of the metrics and tracing in the log_requests middleware.
+
+  - middleware: main.log_requests vs. the previous log-only middleware, each
+    called directly with a prepared request and a call_next that returns at
+    once (no event loop, no routing), so the difference is exactly the
+    work log_requests adds per request. The handler tags the role and runs
+    one db span in both cases.
+  - asgi: a small FastAPI app served through each middleware with raw ASGI
+    calls, in paired, alternating batches. This is the end-to-end view, but
+    it carries several µs of noise either way, so it is informational only
+
+Exits non-zero if the middleware overhead exceeds --budget-us (20 µs).
+
+    python benchmarks/metrics_overhead.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+import main  # noqa: E402
+from app.services import instrumentation  # noqa: E402
+
+ROUTE = Route("/api/v1/students/{student_id}", lambda request: None)
+
+
+async def _baseline_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if request.url.path not in ("/health", "/"):
+        main.logger.info("%s %s %d %.0fms", request.method, request.url.path, response.status_code, elapsed_ms)
+    return response
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"accept", b"application/json"), (b"authorization", b"Bearer x")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+
+def _drive(middleware, n: int) -> float:
+    """Microseconds per call of middleware around a handler doing one db span."""
+    response = JSONResponse({"id": "s1", "name": "Bench"})
+
+    async def call_next(request):
+        request.scope["route"] = ROUTE
+        instrumentation.tag_role("teacher")
+        with instrumentation.span("db", "get_student"):
+            pass
+        return response
+
+    start = time.perf_counter()
+    for i in range(n):
+        coro = middleware(Request(_scope(f"/api/v1/students/s{i}")), call_next)
+        try:
+            coro.send(None)
+        except StopIteration:
+            pass
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def middleware_overhead(n: int) -> tuple:
+    """(baseline µs, instrumented µs, overhead µs), best of five."""
+    baseline = min(_drive(_baseline_middleware, n) for _ in range(5))
+    instrumented = min(_drive(main.log_requests, n) for _ in range(5))
+    return baseline, instrumented, instrumented - baseline
+
+
+def _app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/students/{student_id}")
+    async def get_student(student_id: str):
+        instrumentation.tag_role("teacher")
+        return {"id": student_id, "name": "Bench"}
+
+    app.middleware("http")(middleware)
+    return app
+
+
+async def _batch(app: FastAPI, size: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(size):
+        await app(_scope(f"/api/v1/students/s{i}"), receive, send)
+    return (time.perf_counter() - start) / size * 1e6
+
+
+async def asgi(n: int, batch: int = 50) -> tuple:
+    """(baseline µs, instrumented µs, overhead µs) per request, medians of paired batches."""
+    baseline, instrumented = _app(_baseline_middleware), _app(main.log_requests)
+    for app in (baseline, instrumented):
+        await _batch(app, 200)  # warm-up
+    base_us, instr_us, diffs = [], [], []
+    for pair in range(max(n // batch, 1)):
+        # Flip the order every pair so drift hits both apps equally
+        if pair % 2:
+            b, i = await _batch(baseline, batch), await _batch(instrumented, batch)
+        else:
+            i, b = await _batch(instrumented, batch), await _batch(baseline, batch)
+        base_us.append(b)
+        instr_us.append(i)
+        diffs.append(i - b)
+    return statistics.median(base_us), statistics.median(instr_us), statistics.median(diffs)
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--budget-us", type=float, default=20.0)
+    parser.add_argument("--skip-asgi", action="store_true")
+    args = parser.parse_args()
+    # Log output costs the same with or without metrics; keep it out of the numbers
+    logging.getLogger().setLevel(logging.WARNING)
+    main.logger.setLevel(logging.WARNING)
+
+    base_us, instr_us, overhead_us = middleware_overhead(args.requests)
+    print(f"middleware baseline      {base_us:8.2f} µs/request")
+    print(f"middleware log_requests  {instr_us:8.2f} µs/request")
+    print(f"middleware overhead      {overhead_us:8.2f} µs/request (budget {args.budget_us:.0f} µs)")
+    if not args.skip_asgi:
+        base_us, instr_us, diff_us = asyncio.run(asgi(args.requests))
+        print(f"asgi baseline            {base_us:8.2f} µs/request")
+        print(f"asgi log_requests        {instr_us:8.2f} µs/request")
+        print(f"asgi difference          {diff_us:8.2f} µs/request (informational)")
+    sys.exit(0 if overhead_us <= args.budget_us else 1)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,369 @@
+"""
+Microbenchmarks for the pure functions on the session path, with stored baselines.
+
+Each case calls one function with fixed, realistic inputs (seeded RNGs, no
+database, no AI): level info and titles, difficulty and trend calculation,
+the exercise agent's area selection and game scoring, adventure world
+normalization and every synchronous template generator.
+
+Timings are the best of --rounds x --repeat runs, each long enough to be
+stable, taken in round-robin passes over the cases. They are stored
+relative to a fixed pure-Python calibration loop measured alternately with
+each case, which absorbs clock speed and load. The ratio
+still depends on the interpreter and the CPU: the baseline records the
+Python version and machine it was measured on, and should be regenerated
+with --update when either changes.
+
+A slowdown can also belong to one process rather than to the code (memory
+layout, which core it landed on): the same case then reads slow for every
+repeat in that process and normal in the next. A case whose relative time
+grows by more than --threshold (default 25%) over
+benchmarks/baselines/microbench.json is therefore measured again in up to
+--isolated fresh processes, and fails the run only if none of them is
+within the threshold.
+
+    python benchmarks/microbench.py                   # check against the baseline
+    python benchmarks/microbench.py -k level          # only cases matching "level"
+    python benchmarks/microbench.py --update          # record a new baseline
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.games.game_definitions import get_all_games  # noqa: E402
+from app.models_enhanced import DyslexiaType, SeverityLevel  # noqa: E402
+from app.routers.adventures import _normalize_worlds_input  # noqa: E402
+from app.services import content_generator  # noqa: E402
+from app.services.adaptive_difficulty import analyze_performance_trend, calculate_difficulty_level  # noqa: E402
+from app.services.adventure_builder import suggest_adventure  # noqa: E402
+from app.services.exercise_agent import ExerciseSelectionAgent  # noqa: E402
+from app.services.gamification_service import (  # noqa: E402
+    calculate_level_info, calculate_level_infos, get_level_title,
+)
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "microbench.json"
+SEED = 1234
+
+# name -> setup() returning a zero-argument callable; setup runs once, outside the timing
+CASES: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+# ─── Inputs ──────────────────────────────────────────────────────────────────
+
+def _history(rng: random.Random, n: int) -> List[Dict]:
+    games = get_all_games()
+    history = []
+    for _ in range(n):
+        game = rng.choice(games)
+        history.append({"game_id": game.id, "deficit_area": game.deficit_area.value, "accuracy": rng.random()})
+    return history
+
+
+def _accuracies(rng: random.Random, n: int) -> List[float]:
+    return [round(min(1.0, max(0.0, rng.gauss(0.72, 0.15))), 2) for _ in range(n)]
+
+
+# ─── Cases ───────────────────────────────────────────────────────────────────
+
+@case("calculate_level_info")
+def _level_info():
+    rng = random.Random(SEED)
+    # Spread from new students to the level cap, where the level loop runs longest
+    xps = [rng.randint(0, 40_000) for _ in range(100)]
+
+    def run():
+        for xp in xps:
+            calculate_level_info(xp)
+    return run
+
+
+@case("calculate_level_infos")
+def _level_infos():
+    rng = random.Random(SEED)
+    # The same 100 students as calculate_level_info, in one batch
+    xps = [rng.randint(0, 40_000) for _ in range(100)]
+
+    def run():
+        calculate_level_infos(xps)
+    return run
+
+
+@case("get_level_title")
+def _level_title():
+    levels = list(range(1, 51)) * 2
+
+    def run():
+        for level in levels:
+            get_level_title(level)
+    return run
+
+
+@case("calculate_difficulty_level")
+def _difficulty():
+    rng = random.Random(SEED)
+    inputs = [
+        (rng.randint(6, 15), rng.randint(1, 5), rng.randint(1, 10), _accuracies(rng, rng.choice((0, 3, 5, 10))))
+        for _ in range(100)
+    ]
+
+    def run():
+        for age, severity, level, accuracies in inputs:
+            calculate_difficulty_level(age, severity, level, accuracies)
+    return run
+
+
+@case("analyze_performance_trend")
+def _trend():
+    rng = random.Random(SEED)
+    inputs = [_accuracies(rng, rng.choice((4, 5, 10, 20))) for _ in range(100)]
+
+    def run():
+        for accuracies in inputs:
+            analyze_performance_trend(accuracies)
+    return run
+
+
+@case("agent._select_deficit_area")
+def _select_area():
+    rng = random.Random(SEED)
+    agent = ExerciseSelectionAgent()
+    inputs = []
+    for _ in range(100):
+        diag = {
+            "phonological_severity": rng.randint(1, 5),
+            "rapid_naming_severity": rng.randint(1, 5),
+            "working_memory_severity": rng.randint(1, 5),
+            "reading_fluency_severity": rng.randint(1, 5),
+        }
+        inputs.append((rng.choice(list(DyslexiaType)), diag, _history(rng, 25)))
+
+    def run():
+        for dyslexia_type, diag, history in inputs:
+            agent._select_deficit_area(dyslexia_type, diag, history, None)
+    return run
+
+
+@case("agent._score_game")
+def _score_game():
+    rng = random.Random(SEED)
+    agent = ExerciseSelectionAgent()
+    games = get_all_games()
+    history = _history(rng, 25)
+    inputs = [
+        (rng.choice(games), rng.randint(6, 15), rng.choice(list(DyslexiaType)), rng.choice(list(SeverityLevel)))
+        for _ in range(100)
+    ]
+
+    def run():
+        for game, age, dyslexia_type, severity in inputs:
+            agent._score_game(game, age, dyslexia_type, severity, history)
+    return run
+
+
+@case("_normalize_worlds_input")
+def _normalize_worlds():
+    suggestion = suggest_adventure(student={"age": 9, "diagnostic": {"dyslexia_type": "mixed"}})
+    worlds = [world.model_dump() for world in suggestion["suggested_worlds"]]
+    # A teacher edit: one duplicate and one disallowed game per world
+    for world in worlds:
+        world["game_ids"] = world["game_ids"] + world["game_ids"][:1] + ["dungeon_forest"]
+
+    def run():
+        _normalize_worlds_input(worlds)
+    return run
+
+
+def _generator_case(fn, lang: str):
+    def setup():
+        # A fixed set of seeds per call, so every run generates the same items
+        def run():
+            for seed in range(8):
+                fn(5, 10, content_generator.GenerationContext(lang=lang, seed=seed))
+        return run
+    return setup
+
+
+for _spec in sorted(content_generator.GENERATORS.values(), key=lambda s: s.template.__name__):
+    if _spec.is_async or f"generator.{_spec.template.__name__}[en]" in CASES:
+        continue
+    for _lang in ("en", "el"):
+        if _lang == "en" or _lang in _spec.languages:
+            CASES[f"generator.{_spec.template.__name__}[{_lang}]"] = _generator_case(_spec.template, _lang)
+
+
+# ─── Timing ──────────────────────────────────────────────────────────────────
+
+def _calibration():
+    """Fixed pure-Python workload that every result is expressed relative to."""
+    data = {f"k{i}": i for i in range(200)}
+
+    def run():
+        total = 0
+        for key, value in sorted(data.items()):
+            if value % 3:
+                total += len(key) * value
+        return total
+    return run
+
+
+def _calls_for(fn: Callable[[], object], target: float) -> int:
+    """Calls of fn that take about `target` seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target / 4:
+            return max(1, int(number * target / max(elapsed, 1e-9)))
+        number *= 4
+
+
+def _timed(fn: Callable[[], object], number: int) -> float:
+    random.seed(SEED)
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number
+
+
+def measure(fn: Callable[[], object], calibration: Callable[[], object], repeat: int,
+            target: float = 0.005) -> Tuple[float, float]:
+    """Best seconds per call of fn and of the calibration, measured alternately.
+
+    Alternating keeps both exposed to the same machine speed, so their ratio
+    holds steady even when frequency scaling or neighbours move both.
+    """
+    number, calibration_number = _calls_for(fn, target), _calls_for(calibration, target / 2)
+    best, best_calibration = float("inf"), float("inf")
+    # Like timeit: a collection landing in one run but not another is noise
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            best_calibration = min(best_calibration, _timed(calibration, calibration_number))
+            best = min(best, _timed(fn, number))
+    finally:
+        gc.enable()
+    return best, best_calibration
+
+
+def run_cases(names: List[str], rounds: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Per case: best seconds per call over `rounds` round-robin passes of `repeat` runs each.
+
+    Round robin rather than one case after another: a slow stretch of the
+    machine then costs each case the runs of one round, not all of its runs.
+    The case and its calibration keep separate bests, as in measure().
+    """
+    fns = {name: CASES[name]() for name in names}
+    calibration = _calibration()
+    best = {name: (float("inf"), float("inf")) for name in names}
+    for _ in range(rounds):
+        for name in names:
+            seconds, calibration_seconds = measure(fns[name], calibration, repeat)
+            best[name] = (min(best[name][0], seconds), min(best[name][1], calibration_seconds))
+    return {
+        name: {"us": seconds * 1e6, "relative": seconds / calibration_seconds}
+        for name, (seconds, calibration_seconds) in best.items()
+    }
+
+
+def _best(*results: Dict[str, float]) -> Dict[str, float]:
+    return min(results, key=lambda r: r["relative"])
+
+
+def run_isolated(name: str, repeat: int) -> Dict[str, float]:
+    """run_case in a fresh interpreter, so nothing of this process's state carries over."""
+    out = subprocess.run(
+        [sys.executable, __file__, "--case", name, "--rounds", "1", "--repeat", str(repeat)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out)
+
+
+def _change(result: Dict[str, float], old: Dict[str, float]) -> float:
+    return result["relative"] / old["relative"] - 1
+
+
+def _machine() -> str:
+    return f"{platform.python_implementation()} {platform.python_version()} {platform.machine()}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", default="", help="only cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=5, help="round-robin passes over the cases")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of a case per round")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--isolated", type=int, default=3, help="fresh processes a flagged case is re-measured in")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--case", help=argparse.SUPPRESS)  # one exact case, result as JSON (for run_isolated)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_cases([args.case], args.rounds, args.repeat)[args.case]))
+        return
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline = stored.get("cases", {})
+    if baseline and stored.get("machine") != _machine():
+        print(f"baseline measured on {stored.get('machine', 'an unrecorded machine')}, this is {_machine()}: "
+              f"differences may be the interpreter or CPU; regenerate it with --update\n")
+
+    results = run_cases([name for name in CASES if args.pattern in name], args.rounds, args.repeat)
+    print(f"{'case':52s} {'µs/call':>10s} {'relative':>9s} {'baseline':>9s} {'change':>8s}")
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:52s} {result['us']:10.2f} {result['relative']:9.2f} {'-':>9s} {'new':>8s}")
+            continue
+        # Only a slowdown that every fresh process shows counts
+        for _ in range(args.isolated):
+            if args.update or _change(result, old) <= args.threshold:
+                break
+            result = results[name] = _best(result, run_isolated(name, args.rounds * args.repeat))
+        change = _change(result, old)
+        flag = ""
+        if change > args.threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:52s} {result['us']:10.2f} {result['relative']:9.2f} {old['relative']:9.2f} "
+              f"{change * 100:+7.1f}%{flag}")
+
+    if args.update:
+        merged = dict(baseline)
+        merged.update({name: {"relative": round(r["relative"], 3)} for name, r in results.items()})
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "calibration": "sorted dict scan, 200 keys",
+            "machine": _machine(),
+            "cases": dict(sorted(merged.items())),
+        }, indent=2) + "\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
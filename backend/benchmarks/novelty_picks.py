@@ -0,0 +1,77 @@
+"""
+Novelty engine benchmark: generation cost vs. a student's history length.
+
+For each generator that picks through the novelty engine, a fresh student
+first plays H items of history (H = 0 … 10k), then ``--items`` more items are
+timed. Per-item cost should stay flat as H grows, and the total should scale
+with the item count only. The anonymous column is the same generator without
+a student (uniform picks, no history).
+
+The database is replaced by an in-memory stand-in so only the picking is
+measured.
+
+    python benchmarks/novelty_picks.py --items 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database as db  # noqa: E402
+from app.services import content_generator as cg  # noqa: E402
+from app.services.content_history import NOVELTY_TYPES, history  # noqa: E402
+
+# Synchronous generators that pick through the novelty engine
+GENERATORS = {
+    game_id: spec.template for game_id, spec in sorted(cg.GENERATORS.items())
+    if spec.content_types and not spec.is_async
+}
+HISTORY_LENGTHS = (0, 100, 1_000, 10_000)
+
+
+async def _no_history(student_id, content_types, limit=50):
+    return {ctype: [] for ctype in content_types}
+
+
+def _time_items(fn, student_id, items: int, difficulty: int, lang: str) -> float:
+    """Microseconds per item for `items` items, generated in sessions of 10."""
+    ctx = cg.GenerationContext(lang=lang, student_id=student_id, seed=0)
+    start = time.perf_counter()
+    for _ in range(items // 10):
+        fn(difficulty, 10, ctx)
+    return (time.perf_counter() - start) / max(items, 1) * 1e6
+
+
+async def run(items: int, difficulty: int, lang: str) -> None:
+    db.get_recent_content_by_type = _no_history
+    header = "".join(f"{f'H={h}':>10s}" for h in HISTORY_LENGTHS)
+    print(f"µs per item, {items} items, difficulty {difficulty}, lang {lang}")
+    print(f"{'generator':20s} {'anonymous':>10s}{header}")
+    for game_id, fn in GENERATORS.items():
+        anonymous = min(_time_items(fn, None, items, difficulty, lang) for _ in range(3))
+        row = []
+        for h in HISTORY_LENGTHS:
+            student_id = f"bench-{game_id}-{h}"
+            await history.warm(student_id, NOVELTY_TYPES)
+            _time_items(fn, student_id, h, difficulty, lang)  # build up history
+            history._pending.clear()
+            row.append(min(_time_items(fn, student_id, items, difficulty, lang) for _ in range(3)))
+            history._pending.clear()
+        print(f"{game_id:20s} {anonymous:10.2f}" + "".join(f"{us:10.2f}" for us in row))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--difficulty", type=int, default=5)
+    parser.add_argument("--lang", default="en")
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.difficulty, args.lang))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Concurrent generation for many students, with per-student isolation checks.
+
+Generates one session for each of --students students concurrently in one
+event loop (asyncio.gather over generate_for_context), each with its own
+GenerationContext (id, age, language, seed). Then it checks that:
+
+  - every student's items are identical to a sequential run with the same
+    seeds, i.e. interleaving with other students changed nothing
+  - age-banded games only used words from that student's age word bank
+  - Greek students got Greek content and English students English content
+  - the novelty history recorded for a student holds exactly that
+    student's picks
+
+The database is replaced by an in-memory stand-in. Exits non-zero on failure.
+
+    python benchmarks/parallel_students.py --students 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database as db  # noqa: E402
+from app.services import content_generator as cg  # noqa: E402
+from app.services.content_history import ContentHistory  # noqa: E402
+
+GAMES = ("backward_spell", "story_recall", "object_blitz", "phrase_flash", "decoding_read_aloud", "dual_task_challenge")
+AGES = (6, 10, 15, None)
+DIFFICULTY = 5
+ITEMS = 10
+
+
+async def _no_history(student_id, content_types, limit=50):
+    await asyncio.sleep(0)  # let other students run, as a real query would
+    return {ctype: [] for ctype in content_types}
+
+
+def contexts(n: int, history: ContentHistory) -> list:
+    # Game, age and language vary independently, so every game is checked
+    # for every age in both languages once there are enough students.
+    return [
+        cg.GenerationContext(
+            lang="el" if (i // (len(GAMES) * len(AGES))) % 2 else "en",
+            student_id=f"student-{i}",
+            student_age=AGES[(i // len(GAMES)) % len(AGES)],
+            seed=i,
+            novelty=history,
+        )
+        for i in range(n)
+    ]
+
+
+def _is_greek(text: str) -> bool:
+    return any("Ͱ" <= ch <= "Ͽ" for ch in text)
+
+
+def check(ctxs: list, concurrent: list, sequential: list, history: ContentHistory) -> list:
+    errors = []
+    recorded = defaultdict(list)
+    for student_id, content_type, key, _ in history._pending:
+        recorded[(student_id, content_type)].append(key)
+
+    for i, (ctx, items, expected) in enumerate(zip(ctxs, concurrent, sequential)):
+        game_id = GAMES[i % len(GAMES)]
+        if [it.model_dump() for it in items] != [it.model_dump() for it in expected]:
+            errors.append(f"{ctx.student_id}: concurrent output differs from sequential run")
+        if game_id == "backward_spell":
+            bank = set(cg.get_word_bank(DIFFICULTY, ctx.lang, ctx.student_age))
+            words = [it.extra_data["original_word"] for it in items]
+            if not set(words) <= bank:
+                errors.append(f"{ctx.student_id}: words outside the age {ctx.student_age} bank")
+            if recorded[(ctx.student_id, "word")] != words:
+                errors.append(f"{ctx.student_id}: recorded history does not match its own picks")
+        if game_id == "dual_task_challenge":
+            bank = set(cg.get_word_bank(min(DIFFICULTY, 4), "en", ctx.student_age))
+            if not {it.extra_data["remember_word"] for it in items} <= bank:
+                errors.append(f"{ctx.student_id}: words outside the age {ctx.student_age} bank")
+        if game_id == "story_recall":
+            passage = items[0].extra_data["passage"]
+            if _is_greek(passage) != (ctx.lang == "el"):
+                errors.append(f"{ctx.student_id}: passage in the wrong language")
+            if len(recorded[(ctx.student_id, "passage")]) != 1:
+                errors.append(f"{ctx.student_id}: expected exactly one recorded passage")
+    return errors
+
+
+async def run(students: int) -> int:
+    # An unknown id would silently fall through to the default generator
+    unknown = [game_id for game_id in GAMES if game_id not in cg.GENERATORS]
+    if unknown:
+        raise SystemExit(f"not registered generators: {', '.join(unknown)}")
+    db.get_recent_content_by_type = _no_history
+
+    parallel_history = ContentHistory()
+    ctxs = contexts(students, parallel_history)
+    start = time.perf_counter()
+    concurrent = await asyncio.gather(*(
+        cg.generate_for_context(ctx, GAMES[i % len(GAMES)], DIFFICULTY, ITEMS) for i, ctx in enumerate(ctxs)
+    ))
+    elapsed = time.perf_counter() - start
+
+    sequential = []
+    for i, ctx in enumerate(contexts(students, ContentHistory())):
+        sequential.append(await cg.generate_for_context(ctx, GAMES[i % len(GAMES)], DIFFICULTY, ITEMS))
+
+    errors = check(ctxs, concurrent, sequential, parallel_history)
+    print(f"{students} students × {ITEMS} items concurrently in {elapsed * 1000:.0f} ms "
+          f"({students * ITEMS / elapsed:.0f} items/s)")
+    for error in errors[:20]:
+        print("FAIL", error)
+    print("isolation ok" if not errors else f"{len(errors)} isolation failures")
+    return 1 if errors else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.students)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Concurrency check for shop purchases against a local Postgres.
+
+Fires parallel db.purchase_item calls for a throwaway student and throwaway
+items; they race on every connection in the app's pool:
+
+  - same item: --purchases concurrent buys of one item must give exactly one
+    success, one purchase row, one ledger entry and one debit
+  - many items: --purchases concurrent buys of different items with points
+    for only --affordable of them must give exactly that many successes, a
+    balance that never goes negative, and a ledger and balance snapshot that
+    agree with it
+
+Everything is created under "bench-purchase-" ids and removed afterwards.
+Exits non-zero on any violation.
+
+    DATABASE_URL=postgres://localhost/eyeradar_bench python benchmarks/purchase_concurrency.py
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database as db  # noqa: E402
+import seed_data  # noqa: E402
+
+STUDENT_ID = "bench-purchase-student"
+ITEM_PREFIX = "bench-purchase-item-"
+COST = 50
+
+
+async def _setup(items: int, balance: int) -> None:
+    await _cleanup()
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute(
+            "INSERT INTO students (id, name, age, grade) VALUES ($1, 'Bench Buyer', 9, 4)", STUDENT_ID,
+        )
+        await conn.executemany(
+            "INSERT INTO shop_items (id, name, category, cost, rarity) VALUES ($1, $1, 'bench', $2, 'common')",
+            [(f"{ITEM_PREFIX}{i}", COST) for i in range(items)],
+        )
+    await db.append_points_ledger([(STUDENT_ID, balance, "bench_credit", None, None)])
+
+
+async def _cleanup() -> None:
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute("DELETE FROM students WHERE id = $1", STUDENT_ID)
+        await conn.execute("DELETE FROM shop_items WHERE id LIKE $1", f"{ITEM_PREFIX}%")
+
+
+async def _buy_all(item_ids: List[str]) -> Dict[str, int]:
+    """Buy every item id at once; returns outcome -> count."""
+    async def buy(item_id: str) -> str:
+        try:
+            await db.purchase_item(STUDENT_ID, item_id)
+            return "ok"
+        except ValueError as exc:
+            return str(exc)
+
+    outcomes: Dict[str, int] = {}
+    for outcome in await asyncio.gather(*(buy(item_id) for item_id in item_ids)):
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return outcomes
+
+
+async def _state() -> Dict[str, int]:
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT (SELECT total_points FROM students WHERE id = $1) AS balance,
+                   (SELECT balance FROM points_balances WHERE student_id = $1) AS snapshot,
+                   (SELECT COUNT(*) FROM user_purchases WHERE student_id = $1) AS purchases,
+                   (SELECT COUNT(*) FROM points_ledger WHERE student_id = $1) AS ledger_rows,
+                   (SELECT COALESCE(SUM(amount), 0) FROM points_ledger WHERE student_id = $1) AS ledger_sum
+            """,
+            STUDENT_ID,
+        )
+    return dict(row)
+
+
+def _check(name: str, outcomes: Dict[str, int], state: Dict[str, int], successes: int, balance: int,
+           elapsed: float) -> List[str]:
+    print(f"{name:12s} {elapsed * 1000:7.0f} ms  outcomes {outcomes}  state {state}")
+    expected = {
+        "successes": (outcomes.get("ok", 0), successes),
+        "balance": (state["balance"], balance - successes * COST),
+        "snapshot": (state["snapshot"], balance - successes * COST),
+        "purchases": (state["purchases"], successes),
+        # The opening credit plus one debit per purchase
+        "ledger_rows": (state["ledger_rows"], 1 + successes),
+        "ledger_sum": (state["ledger_sum"], balance - successes * COST),
+    }
+    errors = [f"{name}: {key} is {got}, expected {want}" for key, (got, want) in expected.items() if got != want]
+    if state["balance"] < 0:
+        errors.append(f"{name}: balance went negative ({state['balance']})")
+    return errors
+
+
+async def same_item(purchases: int) -> List[str]:
+    balance = COST * purchases
+    await _setup(1, balance)
+    start = time.perf_counter()
+    outcomes = await _buy_all([f"{ITEM_PREFIX}0"] * purchases)
+    return _check("same item", outcomes, await _state(), 1, balance, time.perf_counter() - start)
+
+
+async def many_items(purchases: int, affordable: int) -> List[str]:
+    balance = COST * affordable
+    await _setup(purchases, balance)
+    start = time.perf_counter()
+    outcomes = await _buy_all([f"{ITEM_PREFIX}{i}" for i in range(purchases)])
+    return _check("many items", outcomes, await _state(), affordable, balance, time.perf_counter() - start)
+
+
+async def run(args) -> List[str]:
+    seed_data.ensure_local(args.allow_remote)
+    await db.init_db()
+    try:
+        errors = await same_item(args.purchases)
+        errors += await many_items(args.purchases, args.affordable)
+        return errors
+    finally:
+        await _cleanup()
+        await db.close_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--purchases", type=int, default=100)
+    parser.add_argument("--affordable", type=int, default=37, help="items the balance covers in the many-items case")
+    parser.add_argument("--allow-remote", action="store_true")
+    args = parser.parse_args()
+    errors = asyncio.run(run(args))
+    for error in errors:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Seed a local Postgres with realistic benchmark data.
+
+Creates --students students (ages 6-15, 80% English / 20% Greek, half with a
+dyslexia diagnostic), one parent account per two students, --sessions
+completed sessions per student with items and results, a points-ledger row
+per session, an adventure map per student and some content history. All
+rows use "bench-" ids, so --reset removes exactly what a previous run made.
+
+Uses the app's own migrations and connection pool (DATABASE_URL). Refuses to
+touch a non-local database unless --allow-remote is given.
+
+    DATABASE_URL=postgres://localhost/eyeradar_bench python benchmarks/seed_data.py --students 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app import database as db  # noqa: E402
+from app.games.game_definitions import get_all_games  # noqa: E402
+from app.services.adventure_builder import suggest_adventure  # noqa: E402
+
+BATCH = 5_000
+INTERESTS = ("animals", "space", "sports", "music", "dinosaurs", "ocean", "robots", "art", "cooking")
+DYSLEXIA_TYPES = ("phonological", "surface", "rapid_naming", "visual", "double_deficit", "mixed")
+SEVERITIES = ("mild", "moderate", "severe")
+DEFICIT_AREAS = (
+    "phonological_awareness", "rapid_naming", "working_memory",
+    "visual_processing", "reading_fluency", "comprehension",
+)
+CONTENT_TYPES = ("word", "passage", "phrase")
+
+
+def student_id(i: int) -> str:
+    return f"bench-s{i:05d}"
+
+
+def student_sub(i: int) -> str:
+    return f"bench-student-{i}"
+
+
+def parent_sub(i: int) -> str:
+    return f"bench-parent-{i}"
+
+
+def parent_uuid(i: int) -> uuid.UUID:
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"eyeradar-bench/parent/{i}")
+
+
+def ensure_local(allow_remote: bool) -> None:
+    host = urlparse(os.getenv("DATABASE_URL", "")).hostname or ""
+    if not allow_remote and host not in ("localhost", "127.0.0.1", "::1", ""):
+        sys.exit(f"Refusing to seed non-local database host {host!r} (use --allow-remote)")
+
+
+def _student(i: int, rng: random.Random) -> Dict[str, Any]:
+    age = rng.randint(6, 15)
+    diagnostic = {}
+    if rng.random() < 0.5:
+        diagnostic = {"dyslexia_type": rng.choice(DYSLEXIA_TYPES), "severity_level": rng.choice(SEVERITIES)}
+    return {
+        "id": student_id(i),
+        "keycloak_id": student_sub(i),
+        "name": f"Bench Student {i}",
+        "age": age,
+        "grade": max(1, min(12, age - 5)),
+        "language": "el" if rng.random() < 0.2 else "en",
+        "interests": rng.sample(INTERESTS, 2),
+        "diagnostic": diagnostic,
+        "current_levels": {area: rng.randint(1, 6) for area in DEFICIT_AREAS},
+        "assessment": {"deficits": {area: {"severity": rng.randint(1, 5)} for area in DEFICIT_AREAS}},
+    }
+
+
+def _session(sid: str, j: int, game, rng: random.Random, now: datetime) -> tuple:
+    total = 10
+    results = []
+    for k in range(total):
+        correct = rng.random() < 0.7
+        results.append({
+            "item_index": k, "is_correct": correct, "student_answer": "a" if correct else "b",
+            "correct_answer": "a", "response_time_ms": rng.randint(800, 6000), "points_earned": 10 if correct else 2,
+        })
+    items = [
+        {"index": k, "question": f"Question {k}", "options": ["a", "b", "c", "d"], "correct_answer": "a",
+         "hint": None, "item_type": "multiple_choice", "extra_data": {}}
+        for k in range(total)
+    ]
+    correct_count = sum(r["is_correct"] for r in results)
+    started = now - timedelta(days=rng.uniform(0, 90))
+    points = correct_count * 10 + (total - correct_count) * 2
+    return (
+        f"{sid}-x{j:03d}", sid, game.id, game.name, game.deficit_area.value, rng.randint(1, 8),
+        items, results, started, started + timedelta(minutes=rng.uniform(2, 12)), total, correct_count,
+        correct_count / total, sum(r["response_time_ms"] for r in results) / total, points, [], "completed",
+    )
+
+
+async def _insert(conn, sql: str, rows: List[tuple]) -> None:
+    for start in range(0, len(rows), BATCH):
+        await conn.executemany(sql, rows[start:start + BATCH])
+
+
+async def reset() -> None:
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute("DELETE FROM students WHERE id LIKE 'bench-%'")
+        await conn.execute("DELETE FROM users WHERE keycloak_id LIKE 'bench-%'")
+
+
+async def seed(students: int, sessions: int, seed: int = 0) -> Dict[str, int]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    games = [g for g in get_all_games() if not g.id.startswith("dungeon_")]
+    student_rows = [_student(i, rng) for i in range(students)]
+    parents = (students + 1) // 2
+
+    session_rows, ledger_rows, adventure_rows, history_rows = [], [], [], []
+    for i, student in enumerate(student_rows):
+        sid = student["id"]
+        for j in range(sessions):
+            row = _session(sid, j, rng.choice(games), rng, now)
+            session_rows.append(row)
+            ledger_rows.append((uuid.uuid4(), sid, row[14], "session_complete", row[0], row[9]))
+        suggestion = suggest_adventure(student=student)
+        adventure_rows.append((
+            f"bench-a{i:05d}", sid, "bench", "My Adventure",
+            [world.model_dump(mode="json") for world in suggestion["suggested_worlds"]],
+            suggestion["theme_config"].model_dump(mode="json"),
+            "active", now, now,
+        ))
+        for ctype in CONTENT_TYPES:
+            for k in range(20):
+                history_rows.append((uuid.uuid4(), sid, ctype, f"bench-{ctype}-{rng.randint(0, 500)}",
+                                     now - timedelta(minutes=k)))
+
+    pool = await db.get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await _insert(conn, "INSERT INTO users (id, keycloak_id, email, full_name) VALUES ($1, $2, $3, $4)", [
+                (parent_uuid(p), parent_sub(p), f"{parent_sub(p)}@bench.local", f"Bench Parent {p}")
+                for p in range(parents)
+            ])
+            await _insert(conn, """
+                INSERT INTO students (id, keycloak_id, name, age, grade, language, interests, diagnostic,
+                                      current_levels, assessment, total_points, xp, created_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)""", [
+                (s["id"], s["keycloak_id"], s["name"], s["age"], s["grade"], s["language"], s["interests"],
+                 s["diagnostic"], s["current_levels"], s["assessment"], 0, 0, now - timedelta(days=120))
+                for s in student_rows
+            ])
+            await _insert(conn, "INSERT INTO parent_student (parent_id, student_id) VALUES ($1, $2)", [
+                (parent_uuid(i // 2), student_id(i)) for i in range(students)
+            ])
+            await _insert(conn, """
+                INSERT INTO exercise_sessions (id, student_id, game_id, game_name, deficit_area, difficulty_level,
+                    items, results, started_at, completed_at, total_items, correct_count, accuracy,
+                    avg_response_time_ms, points_earned, badges_earned, status)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17)""",
+                session_rows)
+            await _insert(conn, """
+                INSERT INTO points_ledger (id, student_id, amount, reason, session_id, created_at)
+                VALUES ($1, $2, $3, $4, $5, $6)""", ledger_rows)
+            await _insert(conn, """
+                INSERT INTO adventure_maps (id, student_id, created_by, title, worlds, theme_config, status,
+                                            created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)""", adventure_rows)
+            await _insert(conn, """
+                INSERT INTO content_history (id, student_id, content_type, content_hash, used_at)
+                VALUES ($1, $2, $3, $4, $5)""", history_rows)
+            # Points and XP consistent with the ledger
+            await conn.execute("""
+                UPDATE students s SET total_points = l.total, xp = l.total,
+                       last_session_date = l.last, current_streak = 1, longest_streak = 3
+                FROM (SELECT student_id, SUM(amount) AS total, MAX(created_at) AS last
+                      FROM points_ledger WHERE student_id LIKE 'bench-%' GROUP BY student_id) l
+                WHERE s.id = l.student_id""")
+        # Badge counters and ledger balances are normally kept up by session completion
+        await db.rebuild_area_stats()
+        await db.rebuild_points_balances()
+        await conn.execute("ANALYZE")
+    return {
+        "students": students, "parents": parents, "sessions": len(session_rows),
+        "ledger": len(ledger_rows), "adventures": len(adventure_rows), "content_history": len(history_rows),
+    }
+
+
+async def run(args) -> None:
+    ensure_local(args.allow_remote)
+    await db.init_db()
+    try:
+        if args.reset:
+            await reset()
+        start = time.perf_counter()
+        counts = await seed(args.students, args.sessions, args.seed)
+        print(f"seeded {counts} in {time.perf_counter() - start:.1f}s")
+    finally:
+        await db.close_db()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=25, help="completed sessions per student")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--allow-remote", action="store_true")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--reset", action="store_true", help="delete earlier bench rows first")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
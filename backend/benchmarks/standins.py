@@ -0,0 +1,173 @@
+"""
+Local stand-ins for the external services, for benchmarks that drive the real app.
+
+  - auth: a verify_token override that trusts "Bearer bench:<role>:<sub>"
+    tokens instead of checking Keycloak signatures
+  - edge-tts: a Communicate replacement that streams silent MP3-sized chunks
+    after a fixed delay, and tts_backend for building the speech bundle
+    (python -m app.services.tts_bundle --backend benchmarks.standins:tts_backend)
+  - LLM: an OpenAI-compatible server (/v1/models, /v1/chat/completions) with
+    a fixed delay, started as a subprocess so it doesn't share the measured
+    event loop. It answers with an empty JSON object, so callers pay the
+    LLM round trip and then take their template fallback.
+
+    python benchmarks/standins.py llm --port 8765 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+# ─── Auth ────────────────────────────────────────────────────────────────────
+
+def bench_token(role: str, sub: str) -> str:
+    return f"bench:{role}:{sub}"
+
+
+def install_auth(app) -> None:
+    """Replace Keycloak token verification in app with the bench token scheme."""
+    from app.auth import security, verify_token
+    from app.services import instrumentation
+
+    async def standin_verify_token(
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    ) -> Dict[str, Any]:
+        token = credentials.credentials if credentials else ""
+        parts = token.split(":", 2)
+        if len(parts) != 3 or parts[0] != "bench":
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+        _, role, sub = parts
+        instrumentation.tag_role(role)
+        return {
+            "sub": sub,
+            "email": f"{sub}@bench.local",
+            "name": sub,
+            "preferred_username": sub,
+            "realm_access": {"roles": [role]},
+        }
+
+    app.dependency_overrides[verify_token] = standin_verify_token
+
+
+# ─── edge-tts ────────────────────────────────────────────────────────────────
+
+def install_tts(latency_ms: float, chunks: int = 6, chunk_bytes: int = 4096, interval_ms: float = 0):
+    """Make edge_tts.Communicate stream `chunks` audio chunks after latency_ms,
+    interval_ms apart (edge-tts sends audio as the service produces it).
+
+    Returns the stand-in class; its `streams` attribute counts syntheses started.
+    """
+    import edge_tts
+
+    class StandinCommunicate:
+        streams = 0
+
+        def __init__(self, text: str, voice: str, rate: str = "+0%", **kwargs: Any):
+            self.text = text
+
+        async def stream(self):
+            StandinCommunicate.streams += 1
+            await asyncio.sleep(latency_ms / 1000)
+            for _ in range(chunks):
+                yield {"type": "audio", "data": b"\xff\xf3" + b"\x00" * (chunk_bytes - 2)}
+                await asyncio.sleep(interval_ms / 1000)
+
+    edge_tts.Communicate = StandinCommunicate
+    return StandinCommunicate
+
+
+TTS_BACKEND_LATENCY_MS = float(os.getenv("STANDIN_TTS_LATENCY_MS", "5"))
+TTS_BACKEND_BYTES = 4096
+
+
+async def tts_backend(text: str, voice: str, rate: str) -> bytes:
+    """A tts_bundle backend: one silent MP3-sized clip per call, after STANDIN_TTS_LATENCY_MS."""
+    await asyncio.sleep(TTS_BACKEND_LATENCY_MS / 1000)
+    return b"\xff\xf3" + b"\x00" * (TTS_BACKEND_BYTES - 2)
+
+
+# ─── LLM ─────────────────────────────────────────────────────────────────────
+
+def llm_app(latency_ms: float):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "bench-llm", "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: Dict[str, Any]):
+        await asyncio.sleep(latency_ms / 1000)
+        return {
+            "id": "bench",
+            "object": "chat.completion",
+            "model": body.get("model", "bench-llm"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "{}"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_llm(latency_ms: float) -> tuple:
+    """Start the LLM stand-in in a subprocess; returns (process, base_url)."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "llm", "--port", str(port), "--latency-ms", str(latency_ms)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return proc, f"http://127.0.0.1:{port}/v1"
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("LLM stand-in did not start")
+
+
+def use_llm(base_url: str) -> None:
+    """Point the app's OpenAI settings at the stand-in (call before importing main)."""
+    os.environ["LLM_PROVIDER"] = "openai"
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="service", required=True)
+    llm = sub.add_parser("llm")
+    llm.add_argument("--port", type=int, default=8765)
+    llm.add_argument("--latency-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(llm_app(args.latency_ms), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
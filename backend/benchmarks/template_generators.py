@@ -0,0 +1,103 @@
+"""
+Template generator throughput benchmark.
+
+Measures items/second for every synchronous template generator in
+``app.services.content_generator`` (no AI, no database), in English and Greek.
+
+    python benchmarks/template_generators.py                 # current tree
+    python benchmarks/template_generators.py --baseline HEAD~1
+
+With ``--baseline`` the generator module is also loaded as it was at the given
+git revision and both columns are printed side by side.
+"""
+
+import argparse
+import inspect
+import random
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services import content_generator  # noqa: E402
+
+MODULE_PATH = Path(content_generator.__file__).resolve()
+
+# Every synchronous template generator in the registry (async ones read passage history)
+GENERATORS = sorted({spec.template.__name__ for spec in content_generator.GENERATORS.values() if not spec.is_async})
+
+
+def load_at_revision(rev: str) -> types.ModuleType:
+    """Load content_generator.py as it was at a git revision, resolving data files from this tree."""
+    rel = MODULE_PATH.relative_to(BACKEND_DIR.parent).as_posix()
+    source = subprocess.run(
+        ["git", "show", f"{rev}:{rel}"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    module = types.ModuleType(f"content_generator_{rev}")
+    module.__file__ = str(MODULE_PATH)
+    exec(compile(source, str(MODULE_PATH), "exec"), module.__dict__)
+    return module
+
+
+def items_per_second(module, fn, lang: str, difficulty: int, count: int) -> float:
+    random.seed(0)
+    # Generators take a GenerationContext; revisions before it take the language.
+    context = getattr(module, "GenerationContext", None)
+    arg = context(lang=lang, seed=0) if context else lang
+    start = time.perf_counter()
+    items = fn(difficulty, count, arg)
+    return len(items) / (time.perf_counter() - start)
+
+
+def bench(modules: list, difficulty: int, count: int, rounds: int) -> list:
+    """Items/second per generator and language for each module, measured interleaved."""
+    results = [{} for _ in modules]
+    for name in GENERATORS:
+        fns = [getattr(m, name, None) for m in modules]
+        if any(fn is None or inspect.iscoroutinefunction(fn) for fn in fns):
+            continue
+        for lang in ("en", "el"):
+            best = [0.0] * len(fns)
+            for _ in range(rounds):
+                for i, fn in enumerate(fns):
+                    best[i] = max(best[i], items_per_second(modules[i], fn, lang, difficulty, count))
+            for i, rate in enumerate(best):
+                results[i].setdefault(name, {})[lang] = rate
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("--difficulty", type=int, default=5)
+    parser.add_argument("--count", type=int, default=500, help="items per generator call")
+    parser.add_argument("--rounds", type=int, default=7, help="best-of rounds per generator")
+    args = parser.parse_args()
+
+    modules = [content_generator]
+    if args.baseline:
+        modules.append(load_at_revision(args.baseline))
+    results = bench(modules, args.difficulty, args.count, args.rounds)
+    current = results[0]
+    baseline = results[1] if args.baseline else None
+
+    if baseline:
+        print(f"{'generator':26s} {'before en':>10s} {'after en':>10s} {'before el':>10s} {'after el':>10s} {'speedup':>8s}")
+    else:
+        print(f"{'generator':26s} {'en':>10s} {'el':>10s}")
+    for name, rates in current.items():
+        if baseline and name in baseline:
+            before = baseline[name]
+            speedup = (rates["en"] + rates["el"]) / (before["en"] + before["el"])
+            print(f"{name:26s} {before['en']:10.0f} {rates['en']:10.0f} "
+                  f"{before['el']:10.0f} {rates['el']:10.0f} {speedup:7.2f}x")
+        else:
+            print(f"{name:26s} {rates['en']:10.0f} {rates['el']:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Load test for the TTS endpoint with the edge-tts stand-in.
+
+Serves app.routers.tts in a small app (bench auth, empty temporary cache) and
+drives it with raw ASGI calls:
+
+  - identical: --concurrency simultaneous requests for one uncached clip
+    must start exactly one upstream synthesis and all get the full clip;
+    then the same again must be served from the cache with no synthesis
+  - first-byte: --clips uncached clips one after another, reporting time to
+    the first audio byte against time to the whole clip
+  - disconnect: a client that goes away after the first chunk must leave
+    neither the clip nor a temp file in the cache
+  - prefetch: the clips of one session per speaking game, played one at a
+    time by text (on demand) against played by tts_keys after the session
+    prefetcher ran (every play must be a cache hit); plus a key fetched
+    while its clip is still queued, here or by another worker's prefetcher
+  - batch: --batch-tokens sight-word-sprint tokens as one POST /batch against
+    as many single GETs (at most --browser-connections at a time, like a
+    browser on HTTP/1.1), uncached and then cached. The bench auth is
+    cheaper than Keycloak JWT verification, so the single requests' per
+    request overhead is understated here
+  - bundle: builds the static-content speech bundle with the stand-in
+    backend (--bundle-parallel at a time), then plays --bundle-plays bundled
+    clips against as many clips of the same size from the disk cache; a
+    bundled clip revalidated with its ETag must get a 304
+
+The stand-in sends its first chunk after --tts-latency-ms and the rest
+--chunk-interval-ms apart. Exits non-zero if a check fails.
+
+    python benchmarks/tts_load.py --concurrency 50 --tts-latency-ms 300 --chunk-interval-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Before app.services.tts_cache is imported: start from an empty cache
+os.environ["TTS_CACHE_DIR"] = tempfile.mkdtemp(prefix="eyeradar-tts-bench-")
+os.environ["TTS_BUNDLE_FILE"] = os.path.join(os.environ["TTS_CACHE_DIR"], "bundle", "speech.bundle")
+
+import standins  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.models import ExerciseItem  # noqa: E402
+from app.routers import tts  # noqa: E402
+from app.services import tts_bundle, tts_synthesis  # noqa: E402
+from app.services.content_generator import generate_exercise_items  # noqa: E402
+from app.services.tts_prefetch import TTSPrefetcher, prefetcher, speakable  # noqa: E402
+
+TOKEN = standins.bench_token("student", "bench-tts")
+SPEAKING_GAMES = ("sound_matching", "word_sound_match", "decoding_read_aloud", "word_image_match")
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(tts.router, prefix="/api/v1/tts")
+    standins.install_auth(app)
+    return app
+
+
+async def get(
+    app: FastAPI, query: str, disconnect_after: Optional[int] = None, path: str = "/api/v1/tts",
+    method: str = "GET", body: bytes = b"", collect: Optional[List[bytes]] = None,
+    headers: Sequence[Tuple[bytes, bytes]] = (),
+) -> Tuple[int, int, float, float]:
+    """(status, body bytes, seconds to first body byte, seconds to last) for one request.
+
+    With disconnect_after, the client goes away once it has that many bytes;
+    with collect, the body chunks are appended to it.
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {TOKEN}".encode()), *headers],
+    }
+    if body:
+        scope["headers"] += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    status, size, first = 500, 0, None
+    start = time.perf_counter()
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Streaming responses listen for a disconnect until they finish
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, size, first
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if first is None:
+                first = time.perf_counter() - start
+            size += len(message["body"])
+            if collect is not None:
+                collect.append(message["body"])
+            if disconnect_after is not None and size >= disconnect_after:
+                done.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+    total = time.perf_counter() - start
+    return status, size, first if first is not None else total, total
+
+
+async def identical(app: FastAPI, stream_counter, concurrency: int, clip_bytes: int) -> List[str]:
+    errors = []
+    query = "text=bench%20single%20flight&lang=en"
+    for phase, expected_streams in (("cold", 1), ("cached", 0)):
+        before = stream_counter.streams
+        start = time.perf_counter()
+        results = await asyncio.gather(*(get(app, query) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        streams = stream_counter.streams - before
+        statuses: Dict[int, int] = {}
+        for status, *_ in results:
+            statuses[status] = statuses.get(status, 0) + 1
+        latencies = [total for *_, total in results]
+        print(f"identical {phase:7s} {concurrency} requests in {elapsed * 1000:6.0f} ms  "
+              f"p50 {statistics.median(latencies) * 1000:6.1f} ms  "
+              f"upstream syntheses {streams}  statuses {statuses}")
+        if streams != expected_streams:
+            errors.append(f"identical {phase}: {streams} upstream syntheses, expected {expected_streams}")
+        short = [size for status, size, *_ in results if status != 200 or size != clip_bytes]
+        if short:
+            errors.append(f"identical {phase}: {len(short)} responses without the full clip")
+    return errors
+
+
+async def first_byte(app: FastAPI, clips: int, clip_bytes: int) -> List[str]:
+    errors = []
+    results = [await get(app, f"text=bench%20first%20byte%20{i}&lang=en") for i in range(clips)]
+    ttfb = [first for *_, first, _ in results]
+    total = [last for *_, last in results]
+    print(f"first-byte {clips} uncached clips  "
+          f"first byte p50 {statistics.median(ttfb) * 1000:6.1f} ms  "
+          f"whole clip p50 {statistics.median(total) * 1000:6.1f} ms")
+    short = [size for status, size, *_ in results if status != 200 or size != clip_bytes]
+    if short:
+        errors.append(f"first-byte: {len(short)} responses without the full clip")
+    return errors
+
+
+async def disconnect(app: FastAPI, chunk_bytes: int) -> List[str]:
+    errors = []
+    text = "bench disconnect"
+    key = tts.cache_key(text, tts_synthesis.voice_for("en"), "+0%")
+    status, size, *_ = await get(app, "text=bench%20disconnect&lang=en", disconnect_after=chunk_bytes)
+    await asyncio.sleep(0.2)  # let the cancelled synthesis clean up
+    left = sorted(p.name for p in tts.cache.directory.iterdir() if p.name.startswith(key))
+    print(f"disconnect after {size} bytes (status {status})  cache files left {left}")
+    if left:
+        errors.append(f"disconnect: partial clip left in the cache: {left}")
+    if tts_synthesis.running(key) is not None:
+        errors.append("disconnect: synthesis still in flight with no listener")
+    return errors
+
+
+async def _session_items(lang: str, items_per_game: int):
+    items = []
+    for game_id in SPEAKING_GAMES:
+        items += await generate_exercise_items(game_id=game_id, difficulty_level=3, item_count=items_per_game, lang=lang)
+    return items
+
+
+async def prefetch(app: FastAPI, stream_counter, items_per_game: int, clip_bytes: int) -> List[str]:
+    errors = []
+
+    # On demand: every first play waits for its synthesis
+    plays = [
+        (text, rate) for item in await _session_items("en", items_per_game)
+        for rate, texts in [speakable(item) or ("", [])] for text in texts
+    ]
+    on_demand = [await get(app, urlencode({"text": text, "lang": "en", "rate": rate})) for text, rate in plays]
+
+    # Prefetched: the session's clips are synthesized while the student reads the first screen
+    items = await _session_items("el", items_per_game)
+    queued = await prefetcher.annotate(items, "el")
+    prefetcher.start()
+    start = time.perf_counter()
+    while prefetcher._queue or tts_synthesis._inflight:
+        await asyncio.sleep(0.01)
+    warmed = time.perf_counter() - start
+    before = stream_counter.streams
+    keys = [key for item in items for key in item.extra_data.get("tts_keys", {}).values()]
+    prefetched = [await get(app, "", path=f"/api/v1/tts/clip/{key}") for key in keys]
+    await prefetcher.stop()
+
+    for name, results in (("on demand", on_demand), ("prefetched", prefetched)):
+        ttfb = [first for *_, first, _ in results]
+        total = [last for *_, last in results]
+        print(f"prefetch {name:10s} {len(results)} first plays  "
+              f"first byte p50 {statistics.median(ttfb) * 1000:6.1f} ms  "
+              f"whole clip p50 {statistics.median(total) * 1000:6.1f} ms")
+        short = [size for status, size, *_ in results if status != 200 or size != clip_bytes]
+        if short:
+            errors.append(f"prefetch {name}: {len(short)} plays without the full clip")
+    print(f"prefetch queued {queued} clips, warmed in {warmed * 1000:.0f} ms")
+    if stream_counter.streams != before:
+        errors.append(f"prefetch: {stream_counter.streams - before} syntheses while playing prefetched clips")
+
+    # A key played before a worker got to it (none running now) is synthesized on the spot
+    item = ExerciseItem(index=0, question="", correct_answer="", item_type="read_aloud",
+                        extra_data={"word": "bench claimed"})
+    await prefetcher.annotate([item], "el")
+    key = next(iter(item.extra_data["tts_keys"].values()))
+    status, size, *_ = await get(app, "", path=f"/api/v1/tts/clip/{key}")
+    print(f"prefetch claim of a queued key: status {status}, {size} bytes")
+    if status != 200 or size != clip_bytes:
+        errors.append(f"prefetch claim: status {status}, {size} bytes")
+
+    # Queued by another worker process (its own queue, the shared job files): still claimed here
+    other = TTSPrefetcher()
+    item = ExerciseItem(index=0, question="", correct_answer="", item_type="read_aloud",
+                        extra_data={"word": "bench other worker"})
+    await other.annotate([item], "el")
+    key = next(iter(item.extra_data["tts_keys"].values()))
+    status, size, *_ = await get(app, "", path=f"/api/v1/tts/clip/{key}")
+    print(f"prefetch claim of a key queued by another worker: status {status}, {size} bytes")
+    if status != 200 or size != clip_bytes:
+        errors.append(f"prefetch claim across workers: status {status}, {size} bytes")
+    status, *_ = await get(app, "", path=f"/api/v1/tts/clip/{'0' * 64}")
+    if status != 404:
+        errors.append(f"prefetch claim of an unknown key: status {status}")
+    return errors
+
+
+async def _tokens(lang: str, count: int) -> List[str]:
+    tokens: List[str] = []
+    while len(tokens) < count:
+        for item in await generate_exercise_items(game_id="sight_word_sprint", difficulty_level=3,
+                                                  item_count=10, lang=lang):
+            for token in [item.extra_data.get("display_item"), *item.options]:
+                if token and token not in tokens and len(tokens) < count:
+                    tokens.append(token)
+    return tokens
+
+
+async def batch(app: FastAPI, stream_counter, tokens: int, connections: int, clip_bytes: int) -> List[str]:
+    errors = []
+    single_tokens, batch_tokens = await _tokens("en", tokens), await _tokens("el", tokens)
+    limit = asyncio.Semaphore(connections)
+
+    async def single(token: str):
+        async with limit:
+            return await get(app, urlencode({"text": token, "lang": "en"}))
+
+    payload = json.dumps({"clips": [{"text": token, "lang": "el"} for token in batch_tokens]}).encode()
+    for phase in ("uncached", "cached"):
+        before = stream_counter.streams
+        start = time.perf_counter()
+        results = await asyncio.gather(*(single(token) for token in single_tokens))
+        singles = time.perf_counter() - start
+        single_streams = stream_counter.streams - before
+        if any(status != 200 or size != clip_bytes for status, size, *_ in results):
+            errors.append(f"batch {phase}: a single request without the full clip")
+
+        before = stream_counter.streams
+        chunks: List[bytes] = []
+        status, _, _, batched = await get(app, "", path="/api/v1/tts/batch", method="POST",
+                                          body=payload, collect=chunks)
+        batch_streams = stream_counter.streams - before
+        raw = b"".join(chunks)
+        head, _, audio = raw.partition(b"\n")
+        manifest = json.loads(head)["clips"] if status == 200 else []
+        complete = [c for c in manifest if c.get("length") == clip_bytes and c["offset"] + c["length"] <= len(audio)]
+        print(f"batch {phase:8s} {tokens} tokens  singles ({connections} at a time) {singles * 1000:6.0f} ms, "
+              f"{single_streams} syntheses  |  one batch {batched * 1000:6.0f} ms, {batch_streams} syntheses, "
+              f"{len(raw)} bytes")
+        if status != 200 or len(complete) != tokens:
+            errors.append(f"batch {phase}: status {status}, {len(complete)} of {tokens} clips in the manifest")
+    return errors
+
+
+async def bundle(app: FastAPI, stream_counter, plays: int, parallel: int) -> List[str]:
+    errors = []
+    start = time.perf_counter()
+    stats = await tts_bundle.build_bundle(tts_bundle.BUNDLE_FILE, standins.tts_backend, parallel)
+    built = time.perf_counter() - start
+    speech = tts_bundle.load()
+    print(f"bundle built in {built:.1f} s: {stats}, {speech.size / 1e6:.1f} MB")
+    if stats["failed"] or len(speech) != stats["clips"]:
+        errors.append(f"bundle: {stats['failed']} failed, {len(speech)} of {stats['clips']} clips indexed")
+
+    texts = tts_bundle.static_strings()["en"][:plays]
+    rate = tts_bundle.default_rates()[0]
+    clip_bytes = standins.TTS_BACKEND_BYTES
+    disk_keys = []
+    for i in range(plays):
+        key = tts.cache_key(f"bench disk {i}", tts_synthesis.voice_for("en"), rate)
+        await tts.cache.put(key, await standins.tts_backend("", "", rate))
+        disk_keys.append(key)
+
+    before = stream_counter.streams
+    bundled = [await get(app, urlencode({"text": text, "lang": "en", "rate": rate})) for text in texts]
+    from_disk = [await get(app, "", path=f"/api/v1/tts/clip/{key}") for key in disk_keys]
+    for name, results in (("bundle", bundled), ("disk cache", from_disk)):
+        total = [last for *_, last in results]
+        print(f"bundle {name:10s} {len(results)} plays  p50 {statistics.median(total) * 1e6:6.0f} us  "
+              f"p99 {sorted(total)[int(len(total) * 0.99) - 1] * 1e6:6.0f} us")
+        if any(status != 200 or size != clip_bytes for status, size, *_ in results):
+            errors.append(f"bundle {name}: a play without the full clip")
+    if stream_counter.streams != before:
+        errors.append(f"bundle: {stream_counter.streams - before} syntheses for bundled clips")
+
+    key = tts.cache_key(texts[0], tts_synthesis.voice_for("en"), rate)
+    status, size, *_ = await get(app, "", path=f"/api/v1/tts/clip/{key}",
+                                 headers=[(b"if-none-match", f'"{key[:32]}"'.encode())])
+    print(f"bundle revalidated with its ETag: status {status}, {size} bytes")
+    if status != 304 or size:
+        errors.append(f"bundle revalidation: status {status}, {size} bytes")
+    return errors
+
+
+async def run(args) -> List[str]:
+    chunks, chunk_bytes = 6, 4096
+    stream_counter = standins.install_tts(
+        args.tts_latency_ms, chunks=chunks, chunk_bytes=chunk_bytes, interval_ms=args.chunk_interval_ms,
+    )
+    app = _app()
+    errors = await identical(app, stream_counter, args.concurrency, chunks * chunk_bytes)
+    errors += await first_byte(app, args.clips, chunks * chunk_bytes)
+    errors += await disconnect(app, chunk_bytes)
+    errors += await prefetch(app, stream_counter, args.items, chunks * chunk_bytes)
+    errors += await batch(app, stream_counter, args.batch_tokens, args.browser_connections, chunks * chunk_bytes)
+    errors += await bundle(app, stream_counter, args.bundle_plays, args.bundle_parallel)
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tts-latency-ms", type=float, default=300)
+    parser.add_argument("--chunk-interval-ms", type=float, default=50)
+    parser.add_argument("--clips", type=int, default=10)
+    parser.add_argument("--batch-tokens", type=int, default=30)
+    parser.add_argument("--browser-connections", type=int, default=6)
+    parser.add_argument("--bundle-plays", type=int, default=200)
+    parser.add_argument("--bundle-parallel", type=int, default=64)
+    parser.add_argument("--items", type=int, default=5, help="items per speaking game in the prefetch scenario")
+    args = parser.parse_args()
+    errors = asyncio.run(run(args))
+    for error in errors:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,11 +17,12 @@ import logging
 import os
 import time
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 
-from app.database import init_db, close_db
+from app.database import init_db, close_db, pool_stats
 from app.routers import (
     account,
     adventures,
@@ -34,7 +35,11 @@ from app.routers import (
     students,
     tts,
 )
+from app.services import executors, instrumentation, metrics, tts_bundle
+from app.services.content_history import history as content_history
 from app.services.ollama_client import check_ollama
+from app.services.shop_catalog import catalog as shop_catalog
+from app.services.tts_prefetch import prefetcher as tts_prefetcher
 
 _log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
@@ -49,6 +54,9 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Initialize and cleanup application resources"""
     logger.info("Starting EyeRadar API — initializing database...")
+    executors.start()
+    instrumentation.loop_lag.start()
+    instrumentation.watchdog.start()
     try:
         await init_db()
         app.state.db_ready = True
@@ -90,8 +98,30 @@ async def lifespan(app: FastAPI):
             "Set OPENAI_API_KEY for cloud AI or start Ollama for local AI."
         )
 
+    # Write-behind flusher for per-student content history (anti-repetition)
+    content_history.start()
+
+    # Keep the cached shop catalog and owned items current across workers
+    shop_catalog.start()
+
+    # Synthesize the speech of new exercise sessions before the games play it
+    tts_prefetcher.start()
+
+    # Map the pre-built speech archive of the static content, if one was built
+    await executors.run_io("io", tts_bundle.load)
+
+    # Publish this worker's metrics so /metrics on any worker covers all of them
+    metrics.exporter.start()
+
     logger.info("EyeRadar API ready on port %s", os.getenv("PORT", "8000"))
     yield
+    await metrics.exporter.stop()
+    await content_history.stop()
+    await shop_catalog.stop()
+    await tts_prefetcher.stop()
+    instrumentation.watchdog.stop()
+    await instrumentation.loop_lag.stop()
+    executors.shutdown()
     await close_db()
     logger.info("Database pool closed.")
 
@@ -114,15 +144,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time outbound httpx calls (LLM providers, Keycloak) as dependency spans
+instrumentation.instrument_httpx()
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
+    trace = instrumentation.begin_request()
     start = time.perf_counter()
     response = await call_next(request)
-    elapsed_ms = (time.perf_counter() - start) * 1000
-    if request.url.path not in ("/health", "/"):
+    elapsed = time.perf_counter() - start
+    # Label by route template (/students/{student_id}), not the raw path
+    route = request.scope.get("route")
+    instrumentation.observe_request(
+        request.method,
+        getattr(route, "path", "unmatched"),
+        response.status_code,
+        trace.role,
+        elapsed,
+        instrumentation.content_length(request.scope["headers"]),
+        instrumentation.content_length(response.raw_headers),
+    )
+    if request.url.path not in ("/health", "/", "/metrics"):
         logger.info(
-            "%s %s %d %.0fms",
-            request.method, request.url.path, response.status_code, elapsed_ms,
+            "%s %s %d %.0fms %s",
+            request.method, request.url.path, response.status_code, elapsed * 1000, trace,
         )
     return response
 
@@ -156,14 +202,25 @@ async def root():
 @app.get("/health")
 async def health_check():
     db_ready = getattr(app.state, "db_ready", False)
+    pool = pool_stats()
+    # Saturation of this worker's pool: 1.0 means every connection is checked out
+    pool["saturation"] = round(pool["in_use"] / pool["max"], 3) if pool["max"] else 0.0
     return {
         "status": "healthy" if db_ready else "degraded",
         "db": "connected" if db_ready else "unavailable",
+        "db_pool": pool,
         "ai_provider": getattr(app.state, "ollama_status", {}).get("provider", "none"),
         "ai_status": getattr(app.state, "ollama_status", {}).get("status", "unknown"),
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics(scope: str = "all"):
+    """Prometheus text metrics, summed over all workers (scope=worker for this worker only)."""
+    body = metrics.REGISTRY.render() if scope == "worker" else await metrics.exporter.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 @app.get("/ai-status")
 async def ai_status():
     """Check the status of the LLM integration (OpenAI or Ollama)."""
@@ -17,6 +17,7 @@ import type { GameRendererProps } from "./shared";
  *   lang?: string            — BCP-47, defaults to "el-GR"
  *   show_hint_audio?: boolean — allow child to hear correct pronunciation after attempt
  *   max_attempts?: number    — max recording attempts (default 2)
+ *   tts_keys?: {...}         — text -> key for GET /tts/clip/{key} (prefetched audio)
  * }
  *
  * A word appears. The child presses the mic, reads it aloud, and STT
@@ -35,6 +36,7 @@ export default function ReadAloudGame({
     lang?: string;
     show_hint_audio?: boolean;
     max_attempts?: number;
+    tts_keys?: Record<string, string>;
   };
 
   const word = extra.word || item.question || "";
@@ -114,7 +116,7 @@ export default function ReadAloudGame({
   };
 
   const playPronunciation = async () => {
-    await tts.speak(word, { lang, rate: 0.6 });
+    await tts.speak(word, { lang, rate: 0.6, key: extra.tts_keys?.[word] });
   };
 
   const showResult = lastResult !== null;
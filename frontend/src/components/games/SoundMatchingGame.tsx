@@ -15,6 +15,7 @@ import type { GameRendererProps } from "./shared";
  *   word2: string       — second word (e.g. "κουτί")
  *   lang?: string       — BCP-47 lang tag, defaults to "el-GR"
  *   auto_play?: boolean — auto-play audio on mount
+ *   tts_keys?: {...}    — text -> key for GET /tts/clip/{key} (prefetched audio)
  * }
  *
  * The child hears two words via TTS, then decides Yes/No
@@ -32,6 +33,7 @@ export default function SoundMatchingGame({
     word2: string;
     lang?: string;
     auto_play?: boolean;
+    tts_keys?: Record<string, string>;
   };
 
   const word1 = extra.word1 || item.options?.[0] || "";
@@ -47,9 +49,9 @@ export default function SoundMatchingGame({
     if (playing) return;
     setPlaying(true);
     try {
-      await tts.speak(word1, { lang, rate: 0.75 });
+      await tts.speak(word1, { lang, rate: 0.75, key: extra.tts_keys?.[word1] });
       await new Promise((r) => setTimeout(r, 600));
-      await tts.speak(word2, { lang, rate: 0.75 });
+      await tts.speak(word2, { lang, rate: 0.75, key: extra.tts_keys?.[word2] });
     } finally {
       setPlaying(false);
       setPlayed(true);
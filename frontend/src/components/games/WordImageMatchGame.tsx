@@ -26,6 +26,7 @@ export default function WordImageMatchGame({
     word_options?: string[];
     lang?: string;
     auto_play?: boolean;
+    tts_keys?: Record<string, string>;
   };
 
   const mode = extra.mode || "word_to_image";
@@ -66,7 +67,7 @@ export default function WordImageMatchGame({
     if (playingTTS) return;
     setPlayingTTS(true);
     try {
-      await tts.speak(word, { lang, rate: 0.75 });
+      await tts.speak(word, { lang, rate: 0.75, key: extra.tts_keys?.[word] });
     } finally {
       setPlayingTTS(false);
     }
@@ -14,6 +14,7 @@ import { SubmitButton, AnswerOption, HintSection, type GameRendererProps } from
  *   target_word: string   — the word shown on top
  *   lang?: string         — BCP-47, defaults to "el-GR"
  *   auto_play?: boolean   — auto-play target word TTS on mount
+ *   tts_keys?: {...}      — text -> key for GET /tts/clip/{key} (prefetched audio)
  * }
  *
  * A word is shown above. The child picks which of 3 (or more) option words
@@ -33,6 +34,7 @@ export default function WordSoundMatchGame({
     target_word?: string;
     lang?: string;
     auto_play?: boolean;
+    tts_keys?: Record<string, string>;
   };
 
   const targetWord = extra.target_word || item.question;
@@ -45,7 +47,7 @@ export default function WordSoundMatchGame({
     if (playingTarget) return;
     setPlayingTarget(true);
     try {
-      await tts.speak(targetWord, { lang, rate: 0.75 });
+      await tts.speak(targetWord, { lang, rate: 0.75, key: extra.tts_keys?.[targetWord] });
     } finally {
       setPlayingTarget(false);
     }
@@ -55,7 +57,7 @@ export default function WordSoundMatchGame({
     if (playingOption !== null) return;
     setPlayingOption(idx);
     try {
-      await tts.speak(word, { lang, rate: 0.75 });
+      await tts.speak(word, { lang, rate: 0.75, key: extra.tts_keys?.[word] });
     } finally {
       setPlayingOption(null);
     }
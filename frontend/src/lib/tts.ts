@@ -1,6 +1,8 @@
 type TTSOptions = {
   lang?: string;
   rate?: number | string;
+  /** Cache key from an exercise item's extra_data.tts_keys — audio the server already prepared */
+  key?: string;
 };
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000/api/v1";
@@ -36,7 +38,8 @@ class TTSManager {
       const url = `${API_BASE}/tts?${params.toString()}`;
 
       try {
-        const res = await fetch(url);
+        let res = opts.key ? await fetch(`${API_BASE}/tts/clip/${opts.key}`) : null;
+        if (!res?.ok) res = await fetch(url);
         if (!res.ok) throw new Error(`TTS request failed: ${res.status}`);
         const blob = await res.blob();
         audioUrl = URL.createObjectURL(blob);